@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark for the AO API.
+
+Drives the FastAPI app in-process with many concurrent clients issuing a mixed
+read load (public catalog lists and details plus the authenticated my-content
+view) and prints per-endpoint and overall latency percentiles as JSON. With
+--writes, that share of the requests updates rent apartments, sale apartments
+and parts instead, so the read latencies are measured under write traffic.
+
+The load only uses endpoints that exist on every revision of the API, so the
+same command can be run before and after a change and the reports compared:
+
+    git checkout <before> && python benchmarks/concurrency.py > before.json
+    git checkout <after>  && python benchmarks/concurrency.py > after.json
+
+Point DATABASE_URL at MySQL to measure real network round trips; the default is
+a throwaway SQLite file. The response cache is disabled so every request hits
+the database.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1], formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="Total requests to issue")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent in-flight requests")
+    parser.add_argument("--apartments", type=int, default=200, help="Rent and sale apartments to seed")
+    parser.add_argument("--parts-per-apartment", type=int, default=5, help="Parts seeded per rent apartment")
+    parser.add_argument("--database-url", default=None, help="Defaults to DATABASE_URL or a temporary SQLite file")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the request mix")
+    parser.add_argument("--writes", type=float, default=0.0, help="Share of the requests that are updates, 0 to 1")
+    return parser.parse_args()
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies):
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 2),
+        "max_ms": round(values[-1] * 1000, 2) if values else 0.0,
+    }
+
+
+def seed_database(apartments: int, parts_per_apartment: int):
+    """Bulk-insert an admin plus rent/sale apartments and parts. Returns (email, password)."""
+    from database import SessionLocal, engine, Base
+    from dependencies import get_password_hash
+    from models import Admin, AdminRoleEnum, ApartmentRent, ApartmentSale, ApartmentPart
+    from models.enums import BathroomTypeEnum, FurnishedEnum, BalconyEnum, PartStatusEnum
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    email, password = "bench@example.com", "bench-password"
+
+    db = SessionLocal()
+    try:
+        admin = Admin(
+            full_name="Benchmark Admin",
+            email=email,
+            phone="+200000000000",
+            role=AdminRoleEnum.super_admin,
+            password=get_password_hash(password),
+        )
+        db.add(admin)
+        db.commit()
+
+        listing = dict(
+            location="maadi",
+            address="1 Benchmark Street, Cairo",
+            area=80,
+            number="B-1",
+            price=5000,
+            bedrooms=2,
+            bathrooms=BathroomTypeEnum.private,
+            description="Benchmark listing with sea view and balcony",
+            facilities_amenities="Elevator, Security",
+            contact_number=admin.phone,
+            listed_by_admin_id=admin.id,
+        )
+        db.bulk_insert_mappings(ApartmentRent, [
+            dict(listing, name=f"Rent apartment {i}", floor=i % 12, total_parts=parts_per_apartment)
+            for i in range(apartments)
+        ])
+        db.bulk_insert_mappings(ApartmentSale, [
+            dict(listing, name=f"Sale apartment {i}") for i in range(apartments)
+        ])
+        db.commit()
+
+        rent_ids = [row[0] for row in db.query(ApartmentRent.id).all()]
+        db.bulk_insert_mappings(ApartmentPart, [
+            dict(
+                apartment_id=apartment_id,
+                status=PartStatusEnum.available,
+                title=f"Studio {apartment_id}-{n}",
+                area=25 + n,
+                floor=apartment_id % 12,
+                monthly_price=2000 + 250 * n,
+                bedrooms=1,
+                bathrooms=BathroomTypeEnum.private,
+                furnished=FurnishedEnum.yes if n % 2 else FurnishedEnum.no,
+                balcony=BalconyEnum.no,
+                created_by_admin_id=admin.id,
+            )
+            for apartment_id in rent_ids
+            for n in range(parts_per_apartment)
+        ])
+        db.commit()
+    finally:
+        db.close()
+    return email, password
+
+
+async def run_load(app, args, email, password):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        login = await client.post("/api/v1/auth/login", data={"username": email, "password": password})
+        login.raise_for_status()
+        auth = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        apartments = args.apartments
+        parts = apartments * args.parts_per_apartment
+        rng = random.Random(args.seed)
+        # (name, weight, request factory returning (method, url, headers, json))
+        reads = [
+            ("list_sale", 15, lambda: ("GET", "/api/v1/apartments/sale?limit=50", None, None)),
+            ("list_rent", 15, lambda: ("GET", "/api/v1/apartments/rent?limit=50", None, None)),
+            ("list_parts", 20, lambda: ("GET", "/api/v1/apartments/parts?limit=100", None, None)),
+            ("rent_detail", 20, lambda: ("GET", f"/api/v1/apartments/rent/{rng.randint(1, apartments)}", None, None)),
+            ("part_detail", 20, lambda: ("GET", f"/api/v1/apartments/parts/{rng.randint(1, parts)}", None, None)),
+            ("my_content", 10, lambda: ("GET", "/api/v1/apartments/my-content?limit=50", auth, None)),
+        ]
+        writes = [
+            ("update_rent", 40, lambda: (
+                "PUT", f"/api/v1/apartments/rent/{rng.randint(1, apartments)}", auth, {"price": rng.randint(3000, 9000)},
+            )),
+            ("update_sale", 20, lambda: (
+                "PUT", f"/api/v1/apartments/sale/{rng.randint(1, apartments)}", auth, {"price": rng.randint(3000, 9000)},
+            )),
+            ("update_part", 40, lambda: (
+                "PUT", f"/api/v1/apartments/parts/{rng.randint(1, parts)}", auth, {"monthly_price": rng.randint(1500, 4000)},
+            )),
+        ]
+        mix = [(name, weight * (1 - args.writes), factory) for name, weight, factory in reads]
+        if args.writes:
+            mix += [(name, weight * args.writes, factory) for name, weight, factory in writes]
+        names = [name for name, _, _ in mix]
+        weights = [weight for _, weight, _ in mix]
+        factories = {name: factory for name, _, factory in mix}
+        plan = [rng.choices(names, weights)[0] for _ in range(args.requests)]
+
+        latencies = defaultdict(list)
+        errors = defaultdict(int)
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def one(name):
+            method, url, headers, body = factories[name]()
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, url, headers=headers, json=body)
+                    ok = response.status_code == 200
+                except Exception:
+                    # e.g. pool checkout timeouts when the event loop is blocked
+                    ok = False
+                latencies[name].append(time.perf_counter() - started)
+                if not ok:
+                    errors[name] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(name) for name in plan))
+        elapsed = time.perf_counter() - started
+
+    overall = [value for values in latencies.values() for value in values]
+    return {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "writes": args.writes,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(args.requests / elapsed, 1),
+        "overall": summarize(overall),
+        "endpoints": {name: summarize(values) for name, values in sorted(latencies.items())},
+        "errors": dict(errors),
+    }
+
+
+def main():
+    args = parse_args()
+    database_url = args.database_url or os.getenv("DATABASE_URL")
+    if not database_url:
+        database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+
+    email, password = seed_database(args.apartments, args.parts_per_apartment)
+
+    import main as app_module
+
+    report = asyncio.run(run_load(app_module.app, args, email, password))
+    report["database"] = database_url.split("://")[0]
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Import throughput benchmark for the AO API.
+
+Writes a CSV or JSONL file of generated sale or rent listings (by default
+100k rows, a few of them invalid on purpose), imports it with the streaming
+importer and reports rows per second, the failed row count and the peak
+resident memory of the process. The file is generated on disk row by row,
+so the peak reflects the importer, not the test data.
+
+With --baseline N the first N rows are also created one at a time through
+the create_apartment_* crud functions, as a row-by-row script using the
+existing code would do, for comparison.
+
+    python benchmarks/imports.py --rows 100000
+    python benchmarks/imports.py --rows 100000 --format jsonl --baseline 5000
+
+Like concurrency.py this recreates all tables in the target database.
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+LOCATIONS = ("maadi", "mokkattam")
+FIELDS = ("name", "location", "address", "area", "number", "price", "bedrooms", "bathrooms", "description", "floor", "total_parts")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1], formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="Rows in the generated file")
+    parser.add_argument("--entity", choices=["sale", "rent"], default="rent", help="Listing type to import")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    parser.add_argument("--batch-size", type=int, default=None, help="Defaults to IMPORT_BATCH_SIZE")
+    parser.add_argument("--baseline", type=int, default=0, help="Also create this many rows one at a time")
+    parser.add_argument("--database-url", default=None, help="Defaults to DATABASE_URL or a temporary SQLite file")
+    return parser.parse_args()
+
+
+def generate_rows(count: int):
+    rng = random.Random(7)
+    for i in range(count):
+        row = {
+            "name": f"Imported listing {i}",
+            "location": rng.choice(LOCATIONS),
+            "address": f"{i} Import Street, Cairo",
+            "area": f"{rng.randint(30, 200)}.00",
+            "number": f"I-{i}",
+            "price": f"{rng.randint(2000, 50000)}.00",
+            "bedrooms": str(rng.randint(1, 4)),
+            "bathrooms": rng.choice(("private", "shared")),
+            "description": "Generated for the import benchmark",
+            "floor": str(rng.randint(0, 20)),
+            "total_parts": str(rng.randint(1, 6)),
+        }
+        if i % 1000 == 999:
+            row["bedrooms"] = "many"  # one invalid row per thousand
+        yield row
+
+
+def write_file(path: str, fmt: str, count: int) -> None:
+    with open(path, "w", newline="") as f:
+        if fmt == "csv":
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            for row in generate_rows(count):
+                writer.writerow(row)
+        else:
+            for row in generate_rows(count):
+                f.write(json.dumps(row) + "\n")
+
+
+def seed_admin():
+    from database import SessionLocal, engine, Base
+    from dependencies import get_password_hash
+    from models import Admin, AdminRoleEnum
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        admin = Admin(
+            full_name="Import Admin",
+            email="import@example.com",
+            phone="+200000000001",
+            role=AdminRoleEnum.super_admin,
+            password=get_password_hash("import-password"),
+        )
+        db.add(admin)
+        db.commit()
+        return admin.id
+    finally:
+        db.close()
+
+
+def run_baseline(entity: str, count: int, admin_id: int) -> float:
+    from database import SessionLocal
+    from models import Admin
+    from crud import create_apartment_sale, create_apartment_rent
+    from schemas import ApartmentSaleCreate, ApartmentRentCreate
+
+    db = SessionLocal()
+    try:
+        admin = db.get(Admin, admin_id)
+        started = time.perf_counter()
+        for row in generate_rows(count):
+            if row["bedrooms"] == "many":
+                continue
+            if entity == "sale":
+                create_apartment_sale(db, ApartmentSaleCreate.model_validate(row), admin.id, admin.phone)
+            else:
+                create_apartment_rent(db, ApartmentRentCreate.model_validate(row), admin.id, admin.phone)
+        return time.perf_counter() - started
+    finally:
+        db.close()
+
+
+def run_import(entity: str, path: str, fmt: str, admin_id: int, batch_size):
+    from database import SessionLocal
+    from models import Admin
+    from services.importer import IMPORT_BATCH_SIZE, import_listings
+
+    db = SessionLocal()
+    try:
+        admin = db.get(Admin, admin_id)
+        started = time.perf_counter()
+        with open(path, "rb") as f:
+            report = import_listings(db, entity, f, fmt, admin, batch_size=batch_size or IMPORT_BATCH_SIZE)
+        return report, time.perf_counter() - started
+    finally:
+        db.close()
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp()
+    database_url = args.database_url or os.getenv("DATABASE_URL")
+    if not database_url:
+        database_url = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["DATABASE_URL"] = database_url
+
+    path = os.path.join(workdir, f"listings.{args.format}")
+    write_file(path, args.format, args.rows)
+    admin_id = seed_admin()
+
+    report = {"database": database_url.split("://")[0], "format": args.format, "entity": args.entity}
+    if args.baseline:
+        elapsed = run_baseline(args.entity, args.baseline, admin_id)
+        report["baseline_rows"] = args.baseline
+        report["baseline_rows_per_s"] = round(args.baseline / elapsed)
+
+    rss_before = peak_rss_mb()
+    result, elapsed = run_import(args.entity, path, args.format, admin_id, args.batch_size)
+    report.update({
+        "rows": args.rows,
+        "file_mb": round(os.path.getsize(path) / 1024 / 1024, 1),
+        "imported": result["imported"],
+        "failed": result["failed"],
+        "elapsed_s": round(elapsed, 2),
+        "rows_per_s": round(args.rows / elapsed),
+        "peak_rss_mb_before_import": round(rss_before, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    })
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
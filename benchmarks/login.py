@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Login throughput benchmark for the AO API.
+
+Fires concurrent POST /auth/login requests (half by email, half by a
+differently formatted phone number) at the in-process app. It prints
+throughput, latency percentiles and the worst event loop stall seen while
+the logins were in flight as JSON. A blocked loop shows up as a loop lag
+close to the bcrypt cost multiplied by the number of queued logins.
+
+    python benchmarks/login.py --requests 200 --concurrency 20
+
+Like concurrency.py this recreates all tables in the target database.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from concurrency import summarize  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1], formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Total logins to issue")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent in-flight logins")
+    parser.add_argument("--admins", type=int, default=50, help="Admins to seed")
+    parser.add_argument("--database-url", default=None, help="Defaults to DATABASE_URL or a temporary SQLite file")
+    return parser.parse_args()
+
+
+def seed_admins(count: int):
+    """Insert `count` admins sharing one password hash. Returns [(email, phone)], password."""
+    from database import SessionLocal, engine, Base
+    from dependencies import get_password_hash
+    from models import Admin, AdminRoleEnum
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    password = "bench-password"
+    hashed = get_password_hash(password)
+
+    db = SessionLocal()
+    try:
+        admins = [
+            Admin(
+                full_name=f"Benchmark Admin {i}",
+                email=f"bench{i}@example.com",
+                phone=f"+20100{i:07d}",
+                role=AdminRoleEnum.studio_rental,
+                password=hashed,
+            )
+            for i in range(count)
+        ]
+        db.add_all(admins)
+        db.commit()
+        return [(admin.email, admin.phone) for admin in admins], password
+    finally:
+        db.close()
+
+
+def format_phone(phone: str) -> str:
+    """'+201000000007' -> '+20 100 000-0007', as a user might type it."""
+    return f"{phone[:3]} {phone[3:6]} {phone[6:9]}-{phone[9:]}"
+
+
+async def run_load(app, args, credentials, password):
+    import httpx
+
+    max_lag = 0.0
+    done = asyncio.Event()
+
+    async def watch_loop():
+        # Sleeps 5ms at a time; any extra delay is time the loop spent blocked
+        nonlocal max_lag
+        interval = 0.005
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            max_lag = max(max_lag, time.perf_counter() - started - interval)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        latencies = []
+        errors = 0
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def one(i):
+            nonlocal errors
+            email, phone = credentials[i % len(credentials)]
+            username = email if i % 2 == 0 else format_phone(phone)
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.post("/api/v1/auth/login", data={"username": username, "password": password})
+                    ok = response.status_code == 200
+                except Exception:
+                    ok = False
+                latencies.append(time.perf_counter() - started)
+                if not ok:
+                    errors += 1
+
+        watcher = asyncio.create_task(watch_loop())
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await watcher
+
+    return {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(args.requests / elapsed, 1),
+        "latency": summarize(latencies),
+        "max_event_loop_lag_ms": round(max_lag * 1000, 2),
+        "errors": errors,
+    }
+
+
+def main():
+    args = parse_args()
+    database_url = args.database_url or os.getenv("DATABASE_URL")
+    if not database_url:
+        database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    os.environ["DATABASE_URL"] = database_url
+
+    credentials, password = seed_admins(args.admins)
+
+    import main as app_module
+
+    report = asyncio.run(run_load(app_module.app, args, credentials, password))
+    report["database"] = database_url.split("://")[0]
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
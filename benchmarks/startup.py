@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Startup budget check for the AO API.
+
+Starts the app in fresh Python processes and measures how long `import main`
+takes, how long the lifespan startup takes, and the latency of the first
+requests (/health, then the first database-backed list). It also counts the
+schema statements (CREATE/ALTER/DROP) run while starting and serving, which
+must be zero, and checks that importing the app created no engine. The
+median of --runs processes is compared with the budgets; the script exits
+with status 1 when one is exceeded, so it can gate a deployment.
+
+    python benchmarks/startup.py --runs 5
+    python benchmarks/startup.py --import-budget-ms 1500 --first-request-budget-ms 150
+
+The default is a temporary SQLite database initialized with init_db.py;
+point --database-url at an initialized MySQL database to include the
+network round trips of the first connection.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DDL_PREFIXES = ("CREATE", "ALTER", "DROP")
+FIRST_DB_REQUEST = "/api/v1/apartments/rent?limit=20"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1], formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes to start; the median is checked")
+    parser.add_argument("--import-budget-ms", type=float, default=2000, help="Budget for `import main`")
+    parser.add_argument("--startup-budget-ms", type=float, default=250, help="Budget for the lifespan startup")
+    parser.add_argument("--first-request-budget-ms", type=float, default=250, help="Budget for the first database-backed request")
+    parser.add_argument("--database-url", default=None, help="Defaults to a temporary SQLite file initialized with init_db.py")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+async def serve_first_requests(app) -> dict:
+    """Run the lifespan startup and the first requests. Returns their timings and the statements run."""
+    import httpx
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    statements = []
+    event.listen(Engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+
+    timings = {}
+    started = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        timings["startup_ms"] = (time.perf_counter() - started) * 1000
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name, url in (("health_ms", "/health"), ("first_request_ms", FIRST_DB_REQUEST), ("second_request_ms", FIRST_DB_REQUEST)):
+                started = time.perf_counter()
+                response = await client.get(url)
+                timings[name] = (time.perf_counter() - started) * 1000
+                if response.status_code != 200:
+                    raise RuntimeError(f"GET {url} returned {response.status_code}")
+
+    timings["statements"] = len(statements)
+    timings["ddl_statements"] = sum(1 for statement in statements if statement.lstrip().upper().startswith(DDL_PREFIXES))
+    return timings
+
+
+def child():
+    """One measured startup, in this fresh process. Prints its timings as JSON."""
+    started = time.perf_counter()
+    import main as app_module
+    import_ms = (time.perf_counter() - started) * 1000
+
+    import database
+
+    engine_on_import = database._engine is not None or database._async_engine is not None
+    report = {"import_ms": import_ms, "engine_on_import": engine_on_import}
+    report.update(asyncio.run(serve_first_requests(app_module.app)))
+    print(json.dumps(report))
+
+
+def run_once(env) -> dict:
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child"], cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"App startup failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    args = parse_args()
+    if args.child:
+        child()
+        return
+
+    env = dict(os.environ)
+    workdir = tempfile.mkdtemp()
+    env.update(
+        SCHEDULER_ENABLED="false",
+        RESPONSE_CACHE_ENABLED="false",
+        STORAGE_BACKEND="local",
+        UPLOADS_DIR=os.path.join(workdir, "uploads"),
+    )
+    database_url = args.database_url
+    if not database_url:
+        database_url = f"sqlite:///{os.path.join(workdir, 'startup.db')}"
+        env["DATABASE_URL"] = database_url
+        subprocess.run([sys.executable, "init_db.py"], cwd=ROOT, env=env, check=True, capture_output=True)
+    env["DATABASE_URL"] = database_url
+
+    try:
+        runs = [run_once(env) for _ in range(args.runs)]
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    keys = ("import_ms", "startup_ms", "health_ms", "first_request_ms", "second_request_ms")
+    report = {
+        "runs": args.runs,
+        "database": database_url.split("://")[0],
+        "median": {key: round(statistics.median(run[key] for run in runs), 1) for key in keys},
+        "max": {key: round(max(run[key] for run in runs), 1) for key in keys},
+        "statements": max(run["statements"] for run in runs),
+        "ddl_statements": max(run["ddl_statements"] for run in runs),
+        "engine_on_import": any(run["engine_on_import"] for run in runs),
+    }
+    print(json.dumps(report, indent=2))
+
+    failures = []
+    budgets = (
+        ("import_ms", args.import_budget_ms),
+        ("startup_ms", args.startup_budget_ms),
+        ("first_request_ms", args.first_request_budget_ms),
+    )
+    for key, budget in budgets:
+        value = report["median"][key]
+        if value > budget:
+            failures.append(f"{key} {value} ms is over its budget of {budget:.0f} ms")
+        else:
+            print(f"✓ {key} {value} ms (budget {budget:.0f} ms)")
+    if report["ddl_statements"]:
+        failures.append(f"{report['ddl_statements']} schema statement(s) ran on startup")
+    if report["engine_on_import"]:
+        failures.append("importing the app created a database engine")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("\n✅ Startup is within its budgets")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,521 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the hot endpoints of the AO API.
+
+Seeds a database at a fixed scale (1k, 100k or 1M listings, studios and
+contracts) with bulk inserts, then runs each scenario in turn - catalog
+lists and details, my-content, login, photo upload and contract creation -
+against the app in-process and/or behind a real uvicorn server. It prints a
+JSON report of throughput and p50/p95/p99 latency per scenario, together with
+the commit, dataset and settings it was measured with.
+
+Seeding is deterministic, so reports of different commits are comparable:
+
+    python benchmarks/suite.py --scale 100k --database-url sqlite:////tmp/bench100k.db --output base.json
+    git checkout <change>
+    python benchmarks/suite.py --scale 100k --database-url sqlite:////tmp/bench100k.db --reuse --compare base.json
+
+--reuse keeps an already seeded database (seeding 1M rows takes minutes) and
+only removes what the previous run wrote. Without it all tables are
+recreated. The response cache and the scheduler are disabled so every
+request does its real work.
+
+Requests taking longer than --timeout count as errors, and a scenario is
+cut short once a whole wave of requests (--concurrency of them) has timed
+out, instead of stalling the run (e.g. when a blocking call on the event
+loop waits for an exhausted connection pool).
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from concurrency import summarize  # noqa: E402
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+MODES = ("inprocess", "uvicorn")
+# Reads first, then the scenarios that write; upload last as it leaves variant jobs running
+SCENARIOS = (
+    "list_sale", "list_rent", "list_parts", "rent_detail", "part_detail", "my_content",
+    "login", "create_contract", "upload",
+)
+# Studios seeded without a contract, for create_contract to rent out
+FREE_PARTS = 5_000
+EMAIL, PASSWORD = "bench@example.com", "bench-password"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1], formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="1k", help="Listings, studios and contracts to seed")
+    parser.add_argument("--mode", choices=MODES + ("both",), default="both", help="Drive the app in-process, over uvicorn, or both")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated subset of: " + ", ".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=300, help="Measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per scenario before the measured ones")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent in-flight requests")
+    parser.add_argument("--timeout", type=float, default=30, help="Seconds before a request counts as an error")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--database-url", default=None, help="Defaults to DATABASE_URL or a temporary SQLite file")
+    parser.add_argument("--reuse", action="store_true", help="Keep a database already seeded at this scale")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="Rows per bulk insert while seeding")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the data and the request mix")
+    parser.add_argument("--output", default=None, help="Also write the report to this file")
+    parser.add_argument("--compare", default=None, help="A previous report to compare against")
+    args = parser.parse_args()
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    args.modes = MODES if args.mode == "both" else (args.mode,)
+    return args
+
+
+def dataset_size(scale: str):
+    """Row counts for a scale: listings split between rent and sale, two studios per rent apartment."""
+    total = SCALES[scale]
+    rent = total // 2
+    return {
+        "rent_apartments": rent,
+        "sale_apartments": total - rent,
+        "apartment_parts": total + FREE_PARTS,
+        "rental_contracts": total,
+    }
+
+
+def _insert(db, table, rows, batch_size: int) -> None:
+    """Insert `rows` in batches, keeping only the columns this revision's table has."""
+    from sqlalchemy import insert
+
+    columns = set(table.c.keys())
+    batch = []
+    for row in rows:
+        batch.append({key: value for key, value in row.items() if key in columns})
+        if len(batch) >= batch_size:
+            db.execute(insert(table), batch)
+            batch = []
+    if batch:
+        db.execute(insert(table), batch)
+    db.commit()
+
+
+def seed_database(size, batch_size: int, seed: int) -> None:
+    """Recreate all tables and fill them with the deterministic dataset of `size`."""
+    from database import SessionLocal, engine, Base
+    from dependencies import get_password_hash
+    from models import Admin, AdminRoleEnum, ApartmentRent, ApartmentSale, ApartmentPart, RentalContract
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(seed)
+    locations = ("maadi", "mokkattam")
+    today = date(2026, 1, 1)
+
+    db = SessionLocal()
+    try:
+        admin = Admin(
+            full_name="Benchmark Admin",
+            email=EMAIL,
+            phone="+200000000000",
+            role=AdminRoleEnum.super_admin,
+            password=get_password_hash(PASSWORD),
+        )
+        db.add(admin)
+        db.commit()
+
+        def listing(i: int):
+            return dict(
+                name=f"Benchmark apartment {i}",
+                location=locations[i % 2],
+                address=f"{i} Benchmark Street, Cairo",
+                area=rng.randint(40, 250),
+                number=f"B-{i}",
+                price=rng.randint(2_000, 60_000),
+                bedrooms=rng.randint(1, 4),
+                bathrooms="private" if i % 3 else "shared",
+                description="Benchmark listing with balcony, elevator and sea view",
+                facilities_amenities="Elevator, Security, Parking",
+                location_on_map=None,
+                latitude=29.95 + rng.random() * 0.1,
+                longitude=31.20 + rng.random() * 0.1,
+                floor=i % 15,
+                total_parts=2,
+                contact_number=admin.phone,
+                listed_by_admin_id=admin.id,
+            )
+
+        _insert(db, ApartmentRent.__table__, (listing(i) for i in range(size["rent_apartments"])), batch_size)
+        _insert(db, ApartmentSale.__table__, (listing(i) for i in range(size["sale_apartments"])), batch_size)
+
+        rented = size["rental_contracts"]
+        _insert(db, ApartmentPart.__table__, (
+            dict(
+                apartment_id=1 + i % size["rent_apartments"],
+                status="rented" if i < rented and i % 4 else "available",
+                title=f"Studio {i}",
+                area=20 + i % 30,
+                floor=i % 15,
+                monthly_price=1_500 + 50 * (i % 60),
+                bedrooms=1,
+                bathrooms="private",
+                furnished="yes" if i % 2 else "no",
+                balcony="no",
+                created_by_admin_id=admin.id,
+            )
+            for i in range(size["apartment_parts"])
+        ), batch_size)
+
+        def contract(i: int):
+            start = today - timedelta(days=i % 400)
+            return dict(
+                apartment_part_id=i + 1,
+                customer_name=f"Customer {i}",
+                customer_phone=f"+2010{i:08d}",
+                customer_id_number=f"{i:014d}",
+                how_did_customer_find_us="facebook",
+                paid_deposit=1_000,
+                warrant_amount=500,
+                rent_start_date=start,
+                rent_end_date=start + timedelta(days=180 + i % 365),
+                rent_period=6 + i % 12,
+                commission=250,
+                rent_price=1_500 + 50 * (i % 60),
+                # One in four contracts is a finished one
+                is_active=bool(i % 4),
+                created_by_admin_id=admin.id,
+            )
+
+        _insert(db, RentalContract.__table__, (contract(i) for i in range(rented)), batch_size)
+    finally:
+        db.close()
+
+
+def is_seeded(size) -> bool:
+    """Whether the database holds the dataset of `size` (ignoring rows a previous run added)."""
+    from sqlalchemy import func, inspect, select
+    from database import SessionLocal, engine
+    from models import ApartmentRent, ApartmentSale, ApartmentPart
+
+    if "apartment_parts" not in inspect(engine).get_table_names():
+        return False
+    db = SessionLocal()
+    try:
+        return (
+            db.scalar(select(func.count()).select_from(ApartmentRent)) == size["rent_apartments"]
+            and db.scalar(select(func.count()).select_from(ApartmentSale)) == size["sale_apartments"]
+            and db.scalar(select(func.count()).select_from(ApartmentPart)) == size["apartment_parts"]
+        )
+    finally:
+        db.close()
+
+
+def reset_run_rows(size) -> None:
+    """Remove the contracts and photos a run created, so the next run starts from the seeded state."""
+    from sqlalchemy import delete, inspect, update
+    from database import SessionLocal, engine
+    from models import ApartmentPart, RentalContract
+
+    tables = set(inspect(engine).get_table_names())
+    db = SessionLocal()
+    try:
+        db.execute(delete(RentalContract).where(RentalContract.id > size["rental_contracts"]))
+        db.execute(
+            update(ApartmentPart)
+            .where(ApartmentPart.id > size["rental_contracts"])
+            .values(status="available")
+        )
+        # The seed has no photos; everything in these tables came from upload runs
+        for table in ("photos", "stored_objects"):
+            if table in tables:
+                db.execute(delete(ApartmentPart.metadata.tables[table]))
+        db.commit()
+    finally:
+        db.close()
+
+
+def make_image(index: int) -> bytes:
+    """A small JPEG whose content differs per index, so uploads are not deduplicated."""
+    from PIL import Image
+
+    image = Image.new("RGB", (640, 480), ((index * 37) % 256, (index * 91) % 256, (index * 53) % 256))
+    image.putpixel((index % 640, (index // 640) % 480), (255, 255, 255))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def build_requests(name: str, count: int, size, rng: random.Random, first_free_part: int):
+    """`count` request specs (method, url, kwargs, needs_auth) for scenario `name`."""
+    rent = size["rent_apartments"]
+    sale = size["sale_apartments"]
+    parts = size["apartment_parts"]
+    pages = 20
+    specs = []
+    for i in range(count):
+        if name == "list_sale":
+            specs.append(("GET", f"/api/v1/apartments/sale?limit=50&skip={50 * rng.randrange(pages)}", {}, False))
+        elif name == "list_rent":
+            specs.append(("GET", f"/api/v1/apartments/rent?limit=50&skip={50 * rng.randrange(pages)}", {}, False))
+        elif name == "list_parts":
+            specs.append(("GET", f"/api/v1/apartments/parts?limit=100&skip={100 * rng.randrange(pages)}", {}, False))
+        elif name == "rent_detail":
+            specs.append(("GET", f"/api/v1/apartments/rent/{rng.randint(1, rent)}", {}, False))
+        elif name == "part_detail":
+            specs.append(("GET", f"/api/v1/apartments/parts/{rng.randint(1, parts)}", {}, False))
+        elif name == "my_content":
+            specs.append(("GET", "/api/v1/apartments/my-content?limit=50", {}, True))
+        elif name == "login":
+            specs.append(("POST", "/api/v1/auth/login", {"data": {"username": EMAIL, "password": PASSWORD}}, False))
+        elif name == "create_contract":
+            specs.append(("POST", "/api/v1/rental-contracts/", {"json": {
+                "apartment_part_id": first_free_part + i,
+                "customer_name": f"Benchmark customer {i}",
+                "customer_phone": "+201000000000",
+                "customer_id_number": f"{i:014d}",
+                "how_did_customer_find_us": "facebook",
+                "paid_deposit": 1000,
+                "warrant_amount": 500,
+                "rent_start_date": "2026-02-01",
+                "rent_end_date": "2026-08-01",
+                "rent_period": 6,
+                "commission": 250,
+                "rent_price": 2000,
+            }}, True))
+        elif name == "upload":
+            specs.append(("POST", "/api/v1/uploads/photos", {
+                "data": {"entity_id": str(rng.randint(1, sale)), "entity_type": "sale"},
+                "files": [("files", (f"bench{i}.jpg", make_image(i), "image/jpeg"))],
+            }, True))
+    return specs
+
+
+async def run_scenario(client, auth, name: str, args, size, rng: random.Random, first_free_part: int):
+    """Warm up, then issue the measured requests of one scenario. Returns its stats."""
+    import httpx
+
+    total = args.warmup + args.requests
+    if name == "create_contract":
+        # Every contract needs a studio of its own
+        total = min(total, FREE_PARTS - (first_free_part - size["rental_contracts"] - 1))
+    specs = build_requests(name, total, size, rng, first_free_part)
+    warmup, measured = specs[:min(args.warmup, len(specs) // 2)], specs[min(args.warmup, len(specs) // 2):]
+
+    latencies = []
+    errors = 0
+    timeouts = 0
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(spec, record: bool):
+        nonlocal errors, timeouts
+        method, url, kwargs, needs_auth = spec
+        async with semaphore:
+            if timeouts >= args.concurrency:
+                return
+            started = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(
+                    client.request(method, url, headers=auth if needs_auth else None, **kwargs), args.timeout
+                )
+                ok = response.status_code == 200
+            except (asyncio.TimeoutError, httpx.TimeoutException):
+                timeouts += 1
+                ok = False
+            except Exception:
+                ok = False
+            if record:
+                latencies.append(time.perf_counter() - started)
+                if not ok:
+                    errors += 1
+
+    await asyncio.gather(*(one(spec, False) for spec in warmup))
+    started = time.perf_counter()
+    await asyncio.gather(*(one(spec, True) for spec in measured))
+    elapsed = time.perf_counter() - started
+    stats = {
+        "requests": len(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round((len(latencies) - errors) / elapsed, 1) if elapsed else 0.0,
+        "errors": errors,
+        "timeouts": timeouts,
+    }
+    if len(latencies) < len(measured):
+        stats["aborted"] = True
+    stats.update(summarize(latencies))
+    return stats, len(specs)
+
+
+async def run_suite(client, args, size):
+    login = await client.post("/api/v1/auth/login", data={"username": EMAIL, "password": PASSWORD})
+    login.raise_for_status()
+    auth = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    rng = random.Random(args.seed)
+    first_free_part = size["rental_contracts"] + 1
+    results = {}
+    for name in SCENARIOS:
+        if name not in args.scenarios:
+            continue
+        results[name], issued = await run_scenario(client, auth, name, args, size, rng, first_free_part)
+        if name == "create_contract":
+            first_free_part += issued
+    return results
+
+
+async def run_inprocess(args, size):
+    import httpx
+    import main as app_module
+
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout) as client:
+        return await run_suite(client, args, size)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_uvicorn(args, size):
+    import httpx
+
+    port = _free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(args.workers), "--log-level", "warning",
+        ],
+        cwd=ROOT,
+        env=dict(os.environ),
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+            deadline = time.monotonic() + 60
+            while True:
+                try:
+                    if (await client.get("/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if server.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("uvicorn did not start")
+                await asyncio.sleep(0.2)
+            return await run_suite(client, args, size)
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def environment(args, database_url: str, size):
+    """What a report was measured with, so two reports can be checked for comparability."""
+    def git(*command):
+        try:
+            return subprocess.run(["git", *command], cwd=ROOT, capture_output=True, text=True, timeout=30).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ""
+
+    import sqlalchemy
+    import fastapi
+
+    return {
+        "commit": git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "fastapi": fastapi.__version__,
+        "sqlalchemy": sqlalchemy.__version__,
+        "database": database_url.split("://")[0],
+        "scale": args.scale,
+        "dataset": size,
+        "seed": args.seed,
+        "requests": args.requests,
+        "warmup": args.warmup,
+        "concurrency": args.concurrency,
+        "timeout_s": args.timeout,
+        "uvicorn_workers": args.workers,
+    }
+
+
+def compare(report, baseline):
+    """Percent change of throughput and p50/p95/p99 per scenario against `baseline` (negative latency is better)."""
+    def change(new, old):
+        return round((new - old) / old * 100, 1) if old else None
+
+    comparison = {"baseline_commit": baseline.get("environment", {}).get("commit")}
+    for key in ("database", "scale", "requests", "concurrency", "uvicorn_workers"):
+        if baseline.get("environment", {}).get(key) != report["environment"].get(key):
+            comparison.setdefault("warnings", []).append(f"{key} differs from the baseline")
+    for mode, scenarios in report["results"].items():
+        for name, stats in scenarios.items():
+            old = baseline.get("results", {}).get(mode, {}).get(name)
+            if not old:
+                continue
+            comparison.setdefault(mode, {})[name] = {
+                "throughput_pct": change(stats["throughput_rps"], old["throughput_rps"]),
+                "p50_pct": change(stats["p50_ms"], old["p50_ms"]),
+                "p95_pct": change(stats["p95_ms"], old["p95_ms"]),
+                "p99_pct": change(stats["p99_ms"], old["p99_ms"]),
+            }
+    return comparison
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp()
+    database_url = args.database_url or os.getenv("DATABASE_URL")
+    if not database_url:
+        database_url = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+    os.environ["SCHEDULER_ENABLED"] = "false"
+    os.environ["QUERY_INSPECTOR"] = "off"
+    os.environ["STORAGE_BACKEND"] = "local"
+    os.environ["UPLOADS_DIR"] = os.path.join(workdir, "uploads")
+
+    size = dataset_size(args.scale)
+    if args.reuse and is_seeded(size):
+        print(f"✓ Reusing the {args.scale} dataset", file=sys.stderr)
+    else:
+        started = time.perf_counter()
+        seed_database(size, args.batch_size, args.seed)
+        print(f"✓ Seeded the {args.scale} dataset in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+    report = {"environment": environment(args, database_url, size), "results": {}}
+    for mode in args.modes:
+        reset_run_rows(size)
+        runner = run_inprocess if mode == "inprocess" else run_uvicorn
+        report["results"][mode] = asyncio.run(runner(args, size))
+        print(f"✓ Finished the {mode} run", file=sys.stderr)
+    reset_run_rows(size)
+
+    if args.compare:
+        with open(args.compare) as f:
+            report["comparison"] = compare(report, json.load(f))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
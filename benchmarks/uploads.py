@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Upload memory benchmark for the AO API.
+
+Posts one multi-file photo upload (by default ten 8 MB files) to the in-process
+app and reports the peak Python heap allocation measured with tracemalloc,
+along with the elapsed time. Buffering each file with `await file.read()`
+shows up as a peak close to the total upload size; streaming keeps it near a
+few chunks.
+
+With --repeat N the same photo set is uploaded to N different apartments, as
+an agent does for every studio in a building, and the report adds the time of
+the repeated uploads and the bytes stored on disk.
+
+    python benchmarks/uploads.py --files 10 --size-mb 8
+    python benchmarks/uploads.py --files 10 --size-mb 2 --repeat 20
+
+Like concurrency.py this recreates all tables in the target database. Files
+go to a temporary UPLOADS_DIR.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1], formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=10, help="Files per upload request")
+    parser.add_argument("--size-mb", type=float, default=8, help="Size of each file in MB")
+    parser.add_argument("--repeat", type=int, default=1, help="Upload the same files to this many apartments")
+    parser.add_argument("--database-url", default=None, help="Defaults to DATABASE_URL or a temporary SQLite file")
+    return parser.parse_args()
+
+
+def seed_database(apartments: int):
+    """Create an admin and rent apartments. Returns (email, password, apartment_ids)."""
+    from database import SessionLocal, engine, Base
+    from dependencies import get_password_hash
+    from models import Admin, AdminRoleEnum, ApartmentRent
+    from models.enums import BathroomTypeEnum
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    email, password = "bench@example.com", "bench-password"
+
+    db = SessionLocal()
+    try:
+        admin = Admin(
+            full_name="Benchmark Admin",
+            email=email,
+            phone="+200000000000",
+            role=AdminRoleEnum.super_admin,
+            password=get_password_hash(password),
+        )
+        db.add(admin)
+        db.commit()
+        rows = [ApartmentRent(
+            name=f"Upload benchmark {i}",
+            location="maadi",
+            address="1 Benchmark Street, Cairo",
+            area=80,
+            number="B-1",
+            price=5000,
+            bedrooms=2,
+            bathrooms=BathroomTypeEnum.private,
+            floor=1,
+            total_parts=1,
+            contact_number=admin.phone,
+            listed_by_admin_id=admin.id,
+        ) for i in range(apartments)]
+        db.add_all(rows)
+        db.commit()
+        return email, password, [row.id for row in rows]
+    finally:
+        db.close()
+
+
+def make_files(directory: str, count: int, size: int):
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"photo{i}.jpg")
+        with open(path, "wb") as f:
+            remaining = size
+            while remaining:
+                block = min(remaining, 1024 * 1024)
+                f.write(os.urandom(block))
+                remaining -= block
+        paths.append(path)
+    return paths
+
+
+async def run_upload(app, email, password, apartment_ids, paths):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        login = await client.post("/api/v1/auth/login", data={"username": email, "password": password})
+        login.raise_for_status()
+        auth = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        async def upload(apartment_id):
+            handles = [open(path, "rb") for path in paths]
+            try:
+                files = [("files", (os.path.basename(h.name), h, "image/jpeg")) for h in handles]
+                started = time.perf_counter()
+                response = await client.post(
+                    "/api/v1/uploads/photos",
+                    data={"entity_id": str(apartment_id), "entity_type": "rent"},
+                    files=files,
+                    headers=auth,
+                )
+                return response.status_code, time.perf_counter() - started
+            finally:
+                for h in handles:
+                    h.close()
+
+        tracemalloc.start()
+        status, elapsed = await upload(apartment_ids[0])
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        repeated = []
+        for apartment_id in apartment_ids[1:]:
+            repeat_status, repeat_elapsed = await upload(apartment_id)
+            status = max(status, repeat_status)
+            repeated.append(repeat_elapsed)
+    return status, elapsed, peak, repeated
+
+
+def directory_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp()
+    database_url = args.database_url or os.getenv("DATABASE_URL")
+    if not database_url:
+        database_url = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["STORAGE_BACKEND"] = "local"
+    os.environ["UPLOADS_DIR"] = os.path.join(workdir, "uploads")
+    os.environ.setdefault("MAX_UPLOAD_FILE_BYTES", str(int(args.size_mb * 1024 * 1024) + 1))
+
+    email, password, apartment_ids = seed_database(max(1, args.repeat))
+    size = int(args.size_mb * 1024 * 1024)
+    paths = make_files(workdir, args.files, size)
+
+    import main as app_module
+
+    status, elapsed, peak, repeated = asyncio.run(run_upload(app_module.app, email, password, apartment_ids, paths))
+    report = {
+        "status": status,
+        "files": args.files,
+        "file_size_mb": args.size_mb,
+        "total_mb": round(args.files * size / 1024 / 1024, 1),
+        "elapsed_s": round(elapsed, 3),
+        "peak_heap_mb": round(peak / 1024 / 1024, 1),
+        "database": database_url.split("://")[0],
+    }
+    if repeated:
+        report["repeat_uploads"] = len(repeated)
+        report["repeat_mean_elapsed_s"] = round(sum(repeated) / len(repeated), 3)
+        report["stored_mb"] = round(directory_size(os.environ["UPLOADS_DIR"]) / 1024 / 1024, 1)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
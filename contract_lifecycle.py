@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Contract lifecycle script.
+Runs the job the API workers schedule every CONTRACT_JOB_INTERVAL_SECONDS:
+studios whose contract ends within the given number of days are marked
+upcoming_end, and contracts past their rent_end_date are deactivated with
+their studios made available again. Useful after importing old contracts or
+when the scheduler is disabled (SCHEDULER_ENABLED=false).
+"""
+
+import argparse
+import sys
+
+from services.scheduler import CONTRACT_UPCOMING_END_DAYS, run_contract_lifecycle
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Update studio and contract statuses from contract end dates.")
+    parser.add_argument("--days", type=int, default=CONTRACT_UPCOMING_END_DAYS, help="Mark studios upcoming_end this many days before the contract ends")
+    args = parser.parse_args()
+    try:
+        report = run_contract_lifecycle(args.days)
+        print(f"✓ {report['upcoming_end']} studio(s) marked upcoming_end")
+        print(f"✓ {report['extended']} studio(s) back to rented after a contract extension")
+        print(f"✓ {report['expired']} expired contract(s) deactivated and their studios made available")
+        print(f"\n✅ Contract lifecycle completed in {report['duration_ms']} ms")
+    except Exception as e:
+        print(f"❌ Contract lifecycle failed: {e}")
+        sys.exit(1)
@@ -9,6 +9,7 @@ from sqlalchemy.orm import Session
 from database import SessionLocal, engine, Base
 from models import Admin, AdminRoleEnum
 from dependencies import get_password_hash
+from crud.admins import get_admin_by_phone
 from decouple import config
 
 def create_super_admin():
@@ -53,6 +54,11 @@ def create_super_admin():
             print("❌ Phone cannot be empty")
             return
         
+        # Check if phone already exists, however it is written
+        if get_admin_by_phone(db, phone):
+            print("❌ Admin with this phone number already exists!")
+            return
+        
         password = getpass("Enter admin password: ")
         if len(password) < 6:
             print("❌ Password must be at least 6 characters")
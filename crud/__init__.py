@@ -8,6 +8,8 @@ from .admins import (
     get_admin_by_phone,
     get_admin_by_username,
     authenticate_admin,
+    get_admin_by_username_async,
+    authenticate_admin_async,
     verify_admin_password,
     update_admin_email,
     update_admin_password,
@@ -20,24 +22,40 @@ from .apartments_sale import (
     update_apartment_sale,
     delete_apartment_sale,
     get_apartments_sale_by_admin,
+    get_apartment_sale_async,
+    get_apartments_sale_async,
 )
 
 from .apartments_rent import (
     get_apartments_rent,
     get_apartment_rent,
+    get_apartment_rent_with_parts,
     create_apartment_rent,
     update_apartment_rent,
     delete_apartment_rent,
     get_apartments_rent_by_admin,
     get_apartments_with_parts_by_admin,
+    get_apartment_rent_async,
+    get_apartment_rent_with_parts_async,
+    get_apartments_rent_async,
 )
 
 from .apartment_parts import (
     get_apartment_parts,
     get_apartment_part,
+    search_apartment_parts,
+    search_available_apartment_parts,
+    get_apartment_part_facets,
     create_apartment_part,
     update_apartment_part,
     delete_apartment_part,
+    create_apartment_parts_bulk,
+    update_apartment_parts_bulk,
+    get_apartment_part_async,
+    get_apartment_parts_async,
+    search_apartment_parts_async,
+    search_available_apartment_parts_async,
+    get_apartment_part_facets_async,
 )
 
 from .rental_contracts import (
@@ -49,11 +67,31 @@ from .rental_contracts import (
     update_rental_contract,
     delete_rental_contract,
     get_expiring_contracts,
+    apply_contract_lifecycle,
+)
+
+from .stats import (
+    get_stats_overview,
+    get_stats_overview_cached,
 )
 
 from .utils import (
     get_admin_phone_for_whatsapp,
 )
 
+from .geo import (
+    GeoQuery,
+    parse_geo_query,
+)
+
+from .pagination import (
+    NEXT_CURSOR_HEADER,
+    encode_cursor,
+    decode_cursor,
+    get_next_cursor,
+    parse_cursor,
+    cursor_headers,
+)
+
 
 
@@ -1,8 +1,14 @@
+from typing import Optional
+from sqlalchemy import case, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from models import Admin
+from models.admin import normalize_phone
 from schemas.admin import AdminCreate, AdminUpdate
-from dependencies import get_password_hash
+from dependencies import get_password_hash_in_pool
+from .pagination import paginate
 
 
 def get_admin(db: Session, admin_id: int):
@@ -14,25 +20,56 @@ def get_admin_by_email(db: Session, email: str):
 
 
 def get_admin_by_phone(db: Session, phone: str):
-    return db.query(Admin).filter(Admin.phone == phone).first()
+    return db.query(Admin).filter(Admin.phone_normalized == normalize_phone(phone)).first()
+
+
+def _admin_by_username_statement(username: str):
+    """One query matching email or normalized phone, preferring an email match."""
+    conditions = [Admin.email == username]
+    phone = normalize_phone(username)
+    if "@" not in username and phone.lstrip("+"):
+        conditions.append(Admin.phone_normalized == phone)
+    return (
+        select(Admin)
+        .where(or_(*conditions))
+        .order_by(case((Admin.email == username, 0), else_=1))
+        .limit(1)
+    )
 
 
 def get_admin_by_username(db: Session, username: str):
     """Get admin by email or phone."""
-    # Try email first
-    admin = get_admin_by_email(db, username)
-    if admin:
-        return admin
-    # Try phone
-    return get_admin_by_phone(db, username)
+    return db.execute(_admin_by_username_statement(username)).scalars().first()
+
+
+async def get_admin_by_username_async(db: AsyncSession, username: str):
+    result = await db.execute(_admin_by_username_statement(username))
+    return result.scalars().first()
+
 
+def get_admins(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    return paginate(db.query(Admin), Admin.id, skip=skip, limit=limit, cursor=cursor)
 
-def get_admins(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Admin).offset(skip).limit(limit).all()
+
+def _check_phone_available(db: Session, phone: str, admin_id: Optional[int] = None) -> None:
+    """Raise ValueError if another admin has this phone number, however it is written."""
+    existing = get_admin_by_phone(db, phone)
+    if existing and existing.id != admin_id:
+        raise ValueError("Phone number already registered")
+
+
+def _commit_admin(db: Session) -> None:
+    """Commit, turning a concurrent admin's duplicate email or phone into ValueError."""
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise ValueError("Email or phone number already registered")
 
 
 def create_admin(db: Session, admin: AdminCreate):
-    hashed_password = get_password_hash(admin.password)
+    _check_phone_available(db, admin.phone)
+    hashed_password = get_password_hash_in_pool(admin.password)
     db_admin = Admin(
         full_name=admin.full_name,
         email=admin.email,
@@ -41,7 +78,7 @@ def create_admin(db: Session, admin: AdminCreate):
         password=hashed_password
     )
     db.add(db_admin)
-    db.commit()
+    _commit_admin(db)
     db.refresh(db_admin)
     return db_admin
 
@@ -50,11 +87,13 @@ def update_admin(db: Session, admin_id: int, admin: AdminUpdate):
     db_admin = db.query(Admin).filter(Admin.id == admin_id).first()
     if db_admin:
         update_data = admin.dict(exclude_unset=True)
+        if update_data.get("phone") is not None:
+            _check_phone_available(db, update_data["phone"], admin_id)
         if "password" in update_data:
-            update_data["password"] = get_password_hash(update_data["password"])
+            update_data["password"] = get_password_hash_in_pool(update_data["password"])
         for field, value in update_data.items():
             setattr(db_admin, field, value)
-        db.commit()
+        _commit_admin(db)
         db.refresh(db_admin)
     return db_admin
 
@@ -78,6 +117,17 @@ def authenticate_admin(db: Session, username: str, password: str):
     return admin
 
 
+async def authenticate_admin_async(db: AsyncSession, username: str, password: str):
+    """Like `authenticate_admin`, but the bcrypt check runs in the password thread pool."""
+    from dependencies import verify_password_async
+    admin = await get_admin_by_username_async(db, username)
+    if not admin:
+        return False
+    if not await verify_password_async(password, admin.password):
+        return False
+    return admin
+
+
 def verify_admin_password(db: Session, admin_id: int, password: str):
     """Verify admin's current password."""
     from dependencies import verify_password
@@ -106,12 +156,11 @@ def update_admin_email(db: Session, admin_id: int, new_email: str):
 
 def update_admin_password(db: Session, admin_id: int, new_password: str):
     """Update admin's password."""
-    from dependencies import get_password_hash
     admin = get_admin(db, admin_id)
     if not admin:
         return None
     
-    admin.password = get_password_hash(new_password)
+    admin.password = get_password_hash_in_pool(new_password)
     db.commit()
     db.refresh(admin)
     return admin
@@ -1,10 +1,23 @@
-from typing import Optional
-import json
+from datetime import date
+from typing import List, Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy import case, exists, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
-from models import ApartmentPart, ApartmentRent, PartStatusEnum
-from schemas.apartment_part import ApartmentPartCreate, ApartmentPartUpdate
+from models import ApartmentPart, ApartmentRent, RentalContract, PartStatusEnum
+from models.enums import BathroomTypeEnum, FurnishedEnum, BalconyEnum
+from schemas.apartment_part import ApartmentPartCreate, ApartmentPartUpdate, ApartmentPartBulkUpdateItem, ApartmentPartSearchFilters
+from .bulk import insert_returning_ids
+from .geo import GeoQuery, geo_search
+from .pagination import paginate, paginate_statement
+from .photos import set_photo_urls, insert_entity_photos, delete_entity_photos
+from services.cache import invalidate_part
+
+# Lower bounds of the monthly price facet buckets; the last bucket is open-ended
+PRICE_BUCKET_BOUNDS = (0, 2000, 3000, 4000, 5000, 7500, 10000)
+# Most parts one bulk create/update request may carry
+MAX_BULK_PARTS = 200
 
 
 def get_apartment_part(db: Session, part_id: int):
@@ -16,20 +29,143 @@ def get_apartment_parts(
     apartment_id: Optional[int] = None,
     skip: int = 0,
     limit: int = 100,
-    status: Optional[PartStatusEnum] = None
+    status: Optional[PartStatusEnum] = None,
+    cursor: Optional[str] = None
 ):
-    query = db.query(ApartmentPart)
+    query = db.query(ApartmentPart).options(selectinload(ApartmentPart.photos))
     if apartment_id:
         query = query.filter(ApartmentPart.apartment_id == apartment_id)
     if status:
         query = query.filter(ApartmentPart.status == status)
-    return query.offset(skip).limit(limit).all()
+    return paginate(query, ApartmentPart.id, skip=skip, limit=limit, cursor=cursor)
+
+
+def _apply_search_filters(query, filters: ApartmentPartSearchFilters):
+    if filters.status:
+        query = query.filter(ApartmentPart.status == PartStatusEnum(filters.status.value))
+    if filters.min_price is not None:
+        query = query.filter(ApartmentPart.monthly_price >= filters.min_price)
+    if filters.max_price is not None:
+        query = query.filter(ApartmentPart.monthly_price <= filters.max_price)
+    if filters.min_area is not None:
+        query = query.filter(ApartmentPart.area >= filters.min_area)
+    if filters.max_area is not None:
+        query = query.filter(ApartmentPart.area <= filters.max_area)
+    if filters.bedrooms is not None:
+        query = query.filter(ApartmentPart.bedrooms == filters.bedrooms)
+    if filters.floor is not None:
+        query = query.filter(ApartmentPart.floor == filters.floor)
+    if filters.furnished:
+        query = query.filter(ApartmentPart.furnished == FurnishedEnum(filters.furnished.value))
+    if filters.balcony:
+        query = query.filter(ApartmentPart.balcony == BalconyEnum(filters.balcony.value))
+    if filters.bathrooms:
+        query = query.filter(ApartmentPart.bathrooms == BathroomTypeEnum(filters.bathrooms.value))
+    return query
+
+
+def _free_between(available_from: date, available_to: date):
+    """Parts with no active contract overlapping [available_from, available_to] (both days included).
+
+    A NOT EXISTS per part, answered from the (apartment_part_id, rent_start_date,
+    rent_end_date) index on rental_contracts.
+    """
+    if available_from > available_to:
+        raise ValueError("'from' must not be after 'to'")
+    return ~exists().where(
+        RentalContract.apartment_part_id == ApartmentPart.id,
+        RentalContract.is_active == True,
+        RentalContract.rent_start_date <= available_to,
+        RentalContract.rent_end_date >= available_from,
+    )
+
+
+def search_apartment_parts(
+    db: Session,
+    filters: ApartmentPartSearchFilters,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None
+):
+    """Search parts by price, area, bedrooms, floor and amenity filters."""
+    query = _apply_search_filters(db.query(ApartmentPart).options(selectinload(ApartmentPart.photos)), filters)
+    return paginate(query, ApartmentPart.id, skip=skip, limit=limit, cursor=cursor)
+
+
+def search_available_apartment_parts(
+    db: Session,
+    available_from: date,
+    available_to: date,
+    filters: ApartmentPartSearchFilters,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None
+):
+    """Parts free for the whole date range that also match the search filters."""
+    query = db.query(ApartmentPart).options(selectinload(ApartmentPart.photos)).filter(_free_between(available_from, available_to))
+    return paginate(_apply_search_filters(query, filters), ApartmentPart.id, skip=skip, limit=limit, cursor=cursor)
+
+
+def _facets_statement(filters: ApartmentPartSearchFilters):
+    price_bucket = case(
+        *[
+            (ApartmentPart.monthly_price < upper, index)
+            for index, upper in enumerate(PRICE_BUCKET_BOUNDS[1:])
+        ],
+        else_=len(PRICE_BUCKET_BOUNDS) - 1,
+    )
+    stmt = select(
+        ApartmentPart.furnished,
+        ApartmentPart.balcony,
+        ApartmentPart.bathrooms,
+        price_bucket,
+        func.count(ApartmentPart.id),
+    )
+    return _apply_search_filters(stmt, filters).group_by(
+        ApartmentPart.furnished, ApartmentPart.balcony, ApartmentPart.bathrooms, price_bucket
+    )
+
+
+def _fold_facets(rows):
+    furnished = {member.value: 0 for member in FurnishedEnum}
+    balcony = {member.value: 0 for member in BalconyEnum}
+    bathrooms = {member.value: 0 for member in BathroomTypeEnum}
+    bucket_counts = [0] * len(PRICE_BUCKET_BOUNDS)
+    total = 0
+    for furnished_value, balcony_value, bathrooms_value, bucket, count in rows:
+        furnished[furnished_value.value] += count
+        balcony[balcony_value.value] += count
+        bathrooms[bathrooms_value.value] += count
+        bucket_counts[bucket] += count
+        total += count
+
+    price_buckets = []
+    for index, lower in enumerate(PRICE_BUCKET_BOUNDS):
+        upper = PRICE_BUCKET_BOUNDS[index + 1] if index + 1 < len(PRICE_BUCKET_BOUNDS) else None
+        price_buckets.append({"min_price": lower, "max_price": upper, "count": bucket_counts[index]})
+
+    return {
+        "total": total,
+        "furnished": furnished,
+        "balcony": balcony,
+        "bathrooms": bathrooms,
+        "price_buckets": price_buckets,
+    }
+
+
+def get_apartment_part_facets(db: Session, filters: ApartmentPartSearchFilters):
+    """Count matching parts per furnished/balcony/bathrooms value and price bucket.
+
+    All facets come from a single GROUP BY over the filtered rows; the handful of
+    grouped rows is then folded into per-facet counts.
+    """
+    return _fold_facets(db.execute(_facets_statement(filters)).all())
 
 
 def create_apartment_part(db: Session, part: ApartmentPartCreate, admin_id: int, apartment_id: int, current_admin_role: str = None):
     from models import AdminRoleEnum
-    # Get the apartment to inherit the floor
-    apartment = db.query(ApartmentRent).filter(ApartmentRent.id == apartment_id).first()
+    # Get the apartment to inherit the floor (locked like in create_apartment_parts_bulk)
+    apartment = db.query(ApartmentRent).filter(ApartmentRent.id == apartment_id).with_for_update().first()
     if not apartment:
         raise ValueError(f"Apartment with id {apartment_id} not found")
     
@@ -42,9 +178,8 @@ def create_apartment_part(db: Session, part: ApartmentPartCreate, admin_id: int,
     part_data = part.dict()
     part_data['floor'] = apartment.floor  # Inherit floor from apartment
     
-    # Convert photos_url list to JSON string
-    if part_data.get('photos_url'):
-        part_data['photos_url'] = json.dumps(part_data['photos_url'])
+    # Photos are rows in the photos table, added once the part has an id
+    photos = part_data.pop('photos_url', None)
     
     db_part = ApartmentPart(
         apartment_id=apartment_id,
@@ -52,8 +187,11 @@ def create_apartment_part(db: Session, part: ApartmentPartCreate, admin_id: int,
         created_by_admin_id=admin_id
     )
     db.add(db_part)
+    db.flush()
+    set_photo_urls(db, "part", db_part.id, photos)
     db.commit()
     db.refresh(db_part)
+    invalidate_part(apartment_id)
     return db_part
 
 
@@ -70,14 +208,14 @@ def update_apartment_part(db: Session, part_id: int, part: ApartmentPartUpdate,
             raise ValueError("Only the admin who created the apartment can update its parts")
         
         update_data = part.dict(exclude_unset=True)
+        if 'photos_url' in update_data:
+            set_photo_urls(db, "part", part_id, update_data.pop('photos_url'))
         
         for field, value in update_data.items():
-            if field == 'photos_url' and value is not None:
-                setattr(db_part, field, json.dumps(value))
-            else:
-                setattr(db_part, field, value)
+            setattr(db_part, field, value)
         db.commit()
         db.refresh(db_part)
+        invalidate_part(db_part.apartment_id, part_id)
     return db_part
 
 
@@ -93,9 +231,166 @@ def delete_apartment_part(db: Session, part_id: int, current_admin_id: int = Non
         if current_admin_role != AdminRoleEnum.super_admin.value and current_admin_id and apartment and apartment.listed_by_admin_id != current_admin_id:
             raise ValueError("Only the admin who created the apartment can delete its parts")
         
+        db_part.photos  # loaded now so the deleted object can still be returned
+        delete_entity_photos(db, "part", [part_id])
         db.delete(db_part)
         db.commit()
+        invalidate_part(db_part.apartment_id, part_id)
     return db_part
 
 
 
+def _get_parts_with_photos(db: Session, part_ids: List[int]):
+    """Load parts in the order of `part_ids`, photos included (two queries)."""
+    parts = db.query(ApartmentPart).options(selectinload(ApartmentPart.photos)).filter(ApartmentPart.id.in_(part_ids)).all()
+    by_id = {part.id: part for part in parts}
+    return [by_id[part_id] for part_id in part_ids if part_id in by_id]
+
+
+def create_apartment_parts_bulk(db: Session, parts: List[ApartmentPartCreate], admin_id: int, apartment_id: int, current_admin_role: str = None):
+    """Create many parts of one apartment in a single transaction.
+
+    The apartment and its ownership are checked once, all rows go out in one
+    executemany INSERT and their photos in another. Returns the created parts
+    in request order.
+    """
+    from models import AdminRoleEnum
+    if not parts:
+        raise ValueError("At least one part is required")
+    if len(parts) > MAX_BULK_PARTS:
+        raise ValueError(f"At most {MAX_BULK_PARTS} parts can be created at once")
+
+    # Locked so part creates for this apartment run one at a time (see insert_returning_ids)
+    apartment = db.query(ApartmentRent).filter(ApartmentRent.id == apartment_id).with_for_update().first()
+    if not apartment:
+        raise ValueError(f"Apartment with id {apartment_id} not found")
+    if current_admin_role != AdminRoleEnum.super_admin.value and apartment.listed_by_admin_id != admin_id:
+        raise ValueError("Only the admin who created the apartment can create parts for it")
+
+    rows = []
+    photos = []
+    for part in parts:
+        part_data = part.dict()
+        photos.append(part_data.pop('photos_url', None))
+        part_data['floor'] = apartment.floor  # Inherit floor from apartment
+        part_data['apartment_id'] = apartment_id
+        part_data['created_by_admin_id'] = admin_id
+        rows.append(part_data)
+    part_ids = insert_returning_ids(db, ApartmentPart, rows, ApartmentPart.apartment_id == apartment_id)
+    insert_entity_photos(db, "part", {part_id: urls for part_id, urls in zip(part_ids, photos) if urls})
+    db.commit()
+    invalidate_part(apartment_id)
+    return _get_parts_with_photos(db, part_ids)
+
+
+def update_apartment_parts_bulk(db: Session, parts: List[ApartmentPartBulkUpdateItem], current_admin_id: int = None, current_admin_role: str = None):
+    """Update many parts, possibly of different apartments, in a single transaction.
+
+    Ownership of all the parts is checked with one query and the column
+    changes are written with executemany (ORM bulk UPDATE by primary key).
+    Returns the updated parts in request order.
+    """
+    from models import AdminRoleEnum
+    if not parts:
+        raise ValueError("At least one part is required")
+    if len(parts) > MAX_BULK_PARTS:
+        raise ValueError(f"At most {MAX_BULK_PARTS} parts can be updated at once")
+    part_ids = [part.id for part in parts]
+    if len(set(part_ids)) != len(part_ids):
+        raise ValueError("Each part may only appear once")
+
+    owners = dict(
+        db.query(ApartmentPart.id, ApartmentRent.listed_by_admin_id)
+        .join(ApartmentRent, ApartmentRent.id == ApartmentPart.apartment_id)
+        .filter(ApartmentPart.id.in_(part_ids))
+        .all()
+    )
+    missing = [part_id for part_id in part_ids if part_id not in owners]
+    if missing:
+        raise ValueError(f"Apartment parts not found: {missing}")
+    if current_admin_role != AdminRoleEnum.super_admin.value and current_admin_id and any(
+        owner != current_admin_id for owner in owners.values()
+    ):
+        raise ValueError("Only the admin who created the apartment can update its parts")
+
+    rows = []
+    for part in parts:
+        update_data = part.dict(exclude_unset=True)
+        if 'photos_url' in update_data:
+            set_photo_urls(db, "part", part.id, update_data.pop('photos_url'))
+        if len(update_data) > 1:
+            rows.append(update_data)
+    if rows:
+        # Rows with the same set of fields share one executemany
+        db.execute(update(ApartmentPart), rows)
+    db.commit()
+
+    updated = _get_parts_with_photos(db, part_ids)
+    for part in updated:
+        invalidate_part(part.apartment_id, part.id)
+    return updated
+
+
+# ----- Async read path (used by the public async routes) -----
+
+async def get_apartment_part_async(db: AsyncSession, part_id: int):
+    return await db.get(ApartmentPart, part_id, options=[selectinload(ApartmentPart.photos)])
+
+
+async def get_apartment_parts_async(
+    db: AsyncSession,
+    apartment_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 100,
+    status: Optional[PartStatusEnum] = None,
+    cursor: Optional[str] = None,
+    geo: Optional[GeoQuery] = None
+):
+    """Async counterpart of `get_apartment_parts`, plus map search on the parts' apartments (see get_apartments_rent_async)."""
+    stmt = select(ApartmentPart).options(selectinload(ApartmentPart.photos))
+    if apartment_id:
+        stmt = stmt.where(ApartmentPart.apartment_id == apartment_id)
+    if status:
+        stmt = stmt.where(ApartmentPart.status == status)
+    if geo:
+        stmt = geo_search(stmt.join(ApartmentRent, ApartmentRent.id == ApartmentPart.apartment_id), ApartmentRent, geo, db.bind.dialect.name)
+    if geo and geo.near:
+        if cursor:
+            raise ValueError("cursor cannot be combined with near; use skip/limit")
+        stmt = stmt.order_by(ApartmentPart.id).offset(skip).limit(limit)
+    else:
+        stmt = paginate_statement(stmt, ApartmentPart.id, skip=skip, limit=limit, cursor=cursor)
+    return (await db.execute(stmt)).scalars().all()
+
+
+async def search_apartment_parts_async(
+    db: AsyncSession,
+    filters: ApartmentPartSearchFilters,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None
+):
+    """Async counterpart of `search_apartment_parts`."""
+    stmt = _apply_search_filters(select(ApartmentPart).options(selectinload(ApartmentPart.photos)), filters)
+    stmt = paginate_statement(stmt, ApartmentPart.id, skip=skip, limit=limit, cursor=cursor)
+    return (await db.execute(stmt)).scalars().all()
+
+
+async def search_available_apartment_parts_async(
+    db: AsyncSession,
+    available_from: date,
+    available_to: date,
+    filters: ApartmentPartSearchFilters,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None
+):
+    """Async counterpart of `search_available_apartment_parts`."""
+    stmt = select(ApartmentPart).options(selectinload(ApartmentPart.photos)).where(_free_between(available_from, available_to))
+    stmt = paginate_statement(_apply_search_filters(stmt, filters), ApartmentPart.id, skip=skip, limit=limit, cursor=cursor)
+    return (await db.execute(stmt)).scalars().all()
+
+
+async def get_apartment_part_facets_async(db: AsyncSession, filters: ApartmentPartSearchFilters):
+    """Async counterpart of `get_apartment_part_facets`."""
+    return _fold_facets((await db.execute(_facets_statement(filters))).all())
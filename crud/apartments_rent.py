@@ -1,85 +1,64 @@
-from sqlalchemy.orm import Session
-import json
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
-from models import ApartmentRent
+from models import ApartmentRent, ApartmentPart
 from schemas.apartment_rent import ApartmentRentCreate, ApartmentRentUpdate
+from .pagination import paginate, paginate_statement
+from .search import fulltext_search
+from .geo import GeoQuery, geo_search
+from .photos import set_photo_urls, delete_entity_photos
+from services.geo import fill_coordinates
+from services.cache import invalidate_rent, invalidate_part
 
 
 def get_apartment_rent(db: Session, apartment_id: int):
     return db.query(ApartmentRent).filter(ApartmentRent.id == apartment_id).first()
 
 
-def get_apartments_rent(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(ApartmentRent).offset(skip).limit(limit).all()
+def get_apartment_rent_with_parts(db: Session, apartment_id: int):
+    """Get a rent apartment with its parts eagerly loaded (two queries, no lazy loads during serialization)."""
+    return (
+        db.query(ApartmentRent)
+        .options(
+            selectinload(ApartmentRent.photos),
+            selectinload(ApartmentRent.apartment_parts).selectinload(ApartmentPart.photos),
+        )
+        .filter(ApartmentRent.id == apartment_id)
+        .first()
+    )
+
+
+def get_apartments_rent(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, q: Optional[str] = None):
+    """List apartments; with `q`, only full-text matches ordered by relevance (skip/limit paging only)."""
+    if q:
+        if cursor:
+            raise ValueError("cursor cannot be combined with q; use skip/limit")
+        return fulltext_search(db.query(ApartmentRent).options(selectinload(ApartmentRent.photos)), ApartmentRent, q).offset(skip).limit(limit).all()
+    return paginate(db.query(ApartmentRent).options(selectinload(ApartmentRent.photos)), ApartmentRent.id, skip=skip, limit=limit, cursor=cursor)
 
 
 def get_apartments_rent_by_admin(db: Session, admin_id: int, skip: int = 0, limit: int = 100):
     """Get apartments created by a specific admin."""
-    return db.query(ApartmentRent).filter(ApartmentRent.listed_by_admin_id == admin_id).offset(skip).limit(limit).all()
+    return db.query(ApartmentRent).options(selectinload(ApartmentRent.photos)).filter(ApartmentRent.listed_by_admin_id == admin_id).offset(skip).limit(limit).all()
 
 
 def get_apartments_with_parts_by_admin(db: Session, admin_id: int, admin_role: str = None, skip: int = 0, limit: int = 100):
-    """Get apartments with their parts created by a specific admin. If admin is super_admin, return all apartments."""
-    from models import ApartmentPart, AdminRoleEnum
-    
+    """Get apartments with their parts created by a specific admin. If admin is super_admin, return all apartments.
+
+    Parts are batch-loaded with a single extra query, so the query count does not grow with the number of apartments.
+    """
+    from models import AdminRoleEnum
+
+    query = db.query(ApartmentRent).options(
+        selectinload(ApartmentRent.photos),
+        selectinload(ApartmentRent.apartment_parts).selectinload(ApartmentPart.photos),
+    )
     # If admin is super_admin, get all apartments, otherwise get only admin's apartments
-    if admin_role == AdminRoleEnum.super_admin.value:
-        apartments = db.query(ApartmentRent).offset(skip).limit(limit).all()
-    else:
-        apartments = db.query(ApartmentRent).filter(ApartmentRent.listed_by_admin_id == admin_id).offset(skip).limit(limit).all()
-    
-    # For each apartment, get its parts
-    result = []
-    for apartment in apartments:
-        apartment_dict = {
-            "id": apartment.id,
-            "name": apartment.name,
-            "location": apartment.location,
-            "address": apartment.address,
-            "area": apartment.area,
-            "number": apartment.number,
-            "price": apartment.price,
-            "bedrooms": apartment.bedrooms,
-            "bathrooms": apartment.bathrooms,
-            "description": apartment.description,
-            "photos_url": apartment.photos_url,
-            "location_on_map": apartment.location_on_map,
-            "facilities_amenities": apartment.facilities_amenities,
-            "floor": apartment.floor,
-            "total_parts": apartment.total_parts,
-            "contact_number": apartment.contact_number,
-            "listed_by_admin_id": apartment.listed_by_admin_id,
-            "created_at": apartment.created_at,
-            "updated_at": apartment.updated_at,
-            "apartment_parts": []
-        }
-        
-        # Get parts for this apartment
-        parts = db.query(ApartmentPart).filter(ApartmentPart.apartment_id == apartment.id).all()
-        for part in parts:
-            part_dict = {
-                "id": part.id,
-                "apartment_id": part.apartment_id,
-                "status": part.status,
-                "title": part.title,
-                "area": part.area,
-                "floor": part.floor,
-                "monthly_price": part.monthly_price,
-                "bedrooms": part.bedrooms,
-                "bathrooms": part.bathrooms,
-                "furnished": part.furnished,
-                "balcony": part.balcony,
-                "description": part.description,
-                "photos_url": part.photos_url,
-                "created_by_admin_id": part.created_by_admin_id,
-                "created_at": part.created_at,
-                "updated_at": part.updated_at
-            }
-            apartment_dict["apartment_parts"].append(part_dict)
-        
-        result.append(apartment_dict)
-    
-    return result
+    if admin_role != AdminRoleEnum.super_admin.value:
+        query = query.filter(ApartmentRent.listed_by_admin_id == admin_id)
+    return query.order_by(ApartmentRent.id).offset(skip).limit(limit).all()
 
 
 def create_apartment_rent(db: Session, apartment: ApartmentRentCreate, listed_by_admin_id: int, admin_phone: str):
@@ -87,14 +66,18 @@ def create_apartment_rent(db: Session, apartment: ApartmentRentCreate, listed_by
     apartment_data['listed_by_admin_id'] = listed_by_admin_id
     apartment_data['contact_number'] = admin_phone
     
-    # Convert photos_url list to JSON string
-    if apartment_data.get('photos_url'):
-        apartment_data['photos_url'] = json.dumps(apartment_data['photos_url'])
+    fill_coordinates(apartment_data)
+    
+    # Photos are rows in the photos table, added once the apartment has an id
+    photos = apartment_data.pop('photos_url', None)
     
     db_apartment = ApartmentRent(**apartment_data)
     db.add(db_apartment)
+    db.flush()
+    set_photo_urls(db, "rent", db_apartment.id, photos)
     db.commit()
     db.refresh(db_apartment)
+    invalidate_rent()
     return db_apartment
 
 
@@ -107,14 +90,14 @@ def update_apartment_rent(db: Session, apartment_id: int, apartment: ApartmentRe
         if current_admin_role != AdminRoleEnum.super_admin.value and current_admin_id and db_apartment.listed_by_admin_id != current_admin_id:
             raise ValueError("Only the admin who created the apartment can update it")
         
-        update_data = apartment.dict(exclude_unset=True)
+        update_data = fill_coordinates(apartment.dict(exclude_unset=True))
+        if 'photos_url' in update_data:
+            set_photo_urls(db, "rent", apartment_id, update_data.pop('photos_url'))
         for field, value in update_data.items():
-            if field == 'photos_url' and value is not None:
-                setattr(db_apartment, field, json.dumps(value))
-            else:
-                setattr(db_apartment, field, value)
+            setattr(db_apartment, field, value)
         db.commit()
         db.refresh(db_apartment)
+        invalidate_rent(apartment_id)
     return db_apartment
 
 
@@ -127,8 +110,61 @@ def delete_apartment_rent(db: Session, apartment_id: int, current_admin_id: int
         if current_admin_role != AdminRoleEnum.super_admin.value and current_admin_id and db_apartment.listed_by_admin_id != current_admin_id:
             raise ValueError("Only the admin who created the apartment can delete it")
         
+        # Parts (and their photos) are deleted with the apartment
+        db_apartment.photos  # loaded now so the deleted object can still be returned
+        delete_entity_photos(db, "rent", [apartment_id])
+        delete_entity_photos(db, "part", [part.id for part in db_apartment.apartment_parts])
         db.delete(db_apartment)
         db.commit()
+        invalidate_rent(apartment_id)
+        invalidate_part(apartment_id)
     return db_apartment
 
 
+# ----- Async read path (used by the public async routes) -----
+
+async def get_apartment_rent_async(db: AsyncSession, apartment_id: int):
+    return await db.get(ApartmentRent, apartment_id, options=[selectinload(ApartmentRent.photos)])
+
+
+async def get_apartment_rent_with_parts_async(db: AsyncSession, apartment_id: int):
+    """Async counterpart of `get_apartment_rent_with_parts`."""
+    stmt = (
+        select(ApartmentRent)
+        .options(
+            selectinload(ApartmentRent.photos),
+            selectinload(ApartmentRent.apartment_parts).selectinload(ApartmentPart.photos),
+        )
+        .where(ApartmentRent.id == apartment_id)
+    )
+    return (await db.execute(stmt)).scalars().first()
+
+
+async def get_apartments_rent_async(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    q: Optional[str] = None,
+    geo: Optional[GeoQuery] = None
+):
+    """Async counterpart of `get_apartments_rent`, plus map search.
+
+    With `geo`, only apartments in the area are listed, nearest first when it
+    has a `near` point (skip/limit paging only, and not together with `q`).
+    """
+    dialect = db.bind.dialect.name
+    stmt = select(ApartmentRent).options(selectinload(ApartmentRent.photos))
+    if geo:
+        stmt = geo_search(stmt, ApartmentRent, geo, dialect)
+    if q or (geo and geo.near):
+        if cursor:
+            raise ValueError(f"cursor cannot be combined with {'q' if q else 'near'}; use skip/limit")
+        if q:
+            if geo and geo.near:
+                raise ValueError("q cannot be combined with near")
+            stmt = fulltext_search(stmt, ApartmentRent, q, dialect=dialect)
+        stmt = stmt.offset(skip).limit(limit)
+    else:
+        stmt = paginate_statement(stmt, ApartmentRent.id, skip=skip, limit=limit, cursor=cursor)
+    return (await db.execute(stmt)).scalars().all()
@@ -1,16 +1,29 @@
-from sqlalchemy.orm import Session
-import json
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
 from models import ApartmentSale
 from schemas.apartment_sale import ApartmentSaleCreate, ApartmentSaleUpdate
+from .pagination import paginate, paginate_statement
+from .search import fulltext_search
+from .geo import GeoQuery, geo_search
+from .photos import set_photo_urls, delete_entity_photos
+from services.geo import fill_coordinates
+from services.cache import invalidate_sale
 
 
 def get_apartment_sale(db: Session, apartment_id: int):
     return db.query(ApartmentSale).filter(ApartmentSale.id == apartment_id).first()
 
 
-def get_apartments_sale(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(ApartmentSale).offset(skip).limit(limit).all()
+def get_apartments_sale(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, q: Optional[str] = None):
+    """List apartments; with `q`, only full-text matches ordered by relevance (skip/limit paging only)."""
+    if q:
+        if cursor:
+            raise ValueError("cursor cannot be combined with q; use skip/limit")
+        return fulltext_search(db.query(ApartmentSale).options(selectinload(ApartmentSale.photos)), ApartmentSale, q).offset(skip).limit(limit).all()
+    return paginate(db.query(ApartmentSale).options(selectinload(ApartmentSale.photos)), ApartmentSale.id, skip=skip, limit=limit, cursor=cursor)
 
 
 def get_apartments_sale_by_admin(db: Session, admin_id: int, admin_role: str = None, skip: int = 0, limit: int = 100):
@@ -19,9 +32,9 @@ def get_apartments_sale_by_admin(db: Session, admin_id: int, admin_role: str = N
     
     # If admin is super_admin, get all apartments, otherwise get only admin's apartments
     if admin_role == AdminRoleEnum.super_admin.value:
-        return db.query(ApartmentSale).offset(skip).limit(limit).all()
+        return db.query(ApartmentSale).options(selectinload(ApartmentSale.photos)).offset(skip).limit(limit).all()
     else:
-        return db.query(ApartmentSale).filter(ApartmentSale.listed_by_admin_id == admin_id).offset(skip).limit(limit).all()
+        return db.query(ApartmentSale).options(selectinload(ApartmentSale.photos)).filter(ApartmentSale.listed_by_admin_id == admin_id).offset(skip).limit(limit).all()
 
 
 def create_apartment_sale(db: Session, apartment: ApartmentSaleCreate, admin_id: int, admin_phone: str):
@@ -29,14 +42,18 @@ def create_apartment_sale(db: Session, apartment: ApartmentSaleCreate, admin_id:
     apartment_data['listed_by_admin_id'] = admin_id
     apartment_data['contact_number'] = admin_phone
     
-    # Convert photos_url list to JSON string
-    if apartment_data.get('photos_url'):
-        apartment_data['photos_url'] = json.dumps(apartment_data['photos_url'])
+    fill_coordinates(apartment_data)
+    
+    # Photos are rows in the photos table, added once the apartment has an id
+    photos = apartment_data.pop('photos_url', None)
     
     db_apartment = ApartmentSale(**apartment_data)
     db.add(db_apartment)
+    db.flush()
+    set_photo_urls(db, "sale", db_apartment.id, photos)
     db.commit()
     db.refresh(db_apartment)
+    invalidate_sale()
     return db_apartment
 
 
@@ -49,14 +66,14 @@ def update_apartment_sale(db: Session, apartment_id: int, apartment: ApartmentSa
         if current_admin_role != AdminRoleEnum.super_admin.value and current_admin_id and db_apartment.listed_by_admin_id != current_admin_id:
             raise ValueError("Only the admin who created the apartment can update it")
         
-        update_data = apartment.dict(exclude_unset=True)
+        update_data = fill_coordinates(apartment.dict(exclude_unset=True))
+        if 'photos_url' in update_data:
+            set_photo_urls(db, "sale", apartment_id, update_data.pop('photos_url'))
         for field, value in update_data.items():
-            if field == 'photos_url' and value is not None:
-                setattr(db_apartment, field, json.dumps(value))
-            else:
-                setattr(db_apartment, field, value)
+            setattr(db_apartment, field, value)
         db.commit()
         db.refresh(db_apartment)
+        invalidate_sale(apartment_id)
     return db_apartment
 
 
@@ -69,8 +86,45 @@ def delete_apartment_sale(db: Session, apartment_id: int, current_admin_id: int
         if current_admin_role != AdminRoleEnum.super_admin.value and current_admin_id and db_apartment.listed_by_admin_id != current_admin_id:
             raise ValueError("Only the admin who created the apartment can delete it")
         
+        db_apartment.photos  # loaded now so the deleted object can still be returned
+        delete_entity_photos(db, "sale", [apartment_id])
         db.delete(db_apartment)
         db.commit()
+        invalidate_sale(apartment_id)
     return db_apartment
 
 
+# ----- Async read path (used by the public async routes) -----
+
+async def get_apartment_sale_async(db: AsyncSession, apartment_id: int):
+    return await db.get(ApartmentSale, apartment_id, options=[selectinload(ApartmentSale.photos)])
+
+
+async def get_apartments_sale_async(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    q: Optional[str] = None,
+    geo: Optional[GeoQuery] = None
+):
+    """Async counterpart of `get_apartments_sale`, plus map search.
+
+    With `geo`, only apartments in the area are listed, nearest first when it
+    has a `near` point (skip/limit paging only, and not together with `q`).
+    """
+    dialect = db.bind.dialect.name
+    stmt = select(ApartmentSale).options(selectinload(ApartmentSale.photos))
+    if geo:
+        stmt = geo_search(stmt, ApartmentSale, geo, dialect)
+    if q or (geo and geo.near):
+        if cursor:
+            raise ValueError(f"cursor cannot be combined with {'q' if q else 'near'}; use skip/limit")
+        if q:
+            if geo and geo.near:
+                raise ValueError("q cannot be combined with near")
+            stmt = fulltext_search(stmt, ApartmentSale, q, dialect=dialect)
+        stmt = stmt.offset(skip).limit(limit)
+    else:
+        stmt = paginate_statement(stmt, ApartmentSale.id, skip=skip, limit=limit, cursor=cursor)
+    return (await db.execute(stmt)).scalars().all()
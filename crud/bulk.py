@@ -0,0 +1,40 @@
+from typing import Dict, List, Sequence
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+
+class _ReadbackMismatch(Exception):
+    """Raised inside the savepoint to roll the executemany back."""
+
+
+def insert_returning_ids(db: Session, model, rows: Sequence[Dict], *scope) -> List[int]:
+    """Insert `rows` with one executemany and return their new ids in row order.
+
+    MySQL has no INSERT ... RETURNING, so the ids are read back as the rows
+    matching `scope` (e.g. `ApartmentPart.apartment_id == 3`) above the
+    table's highest id before the insert; auto-increment ids follow the order
+    of the rows in one statement. Callers lock the row that owns the scope
+    so no other insert lands in it meanwhile. If one does anyway, the
+    readback finds more rows than were sent and the batch is inserted again
+    through the ORM, one row at a time, which returns the ids directly.
+    """
+    if not rows:
+        return []
+    id_column = model.__table__.c.id
+    last_id = db.query(func.max(id_column)).scalar() or 0
+    try:
+        with db.begin_nested():
+            db.execute(insert(model), list(rows))
+            ids = [
+                row_id for (row_id,) in
+                db.query(id_column).filter(id_column > last_id, *scope).order_by(id_column)
+            ]
+            if len(ids) != len(rows):
+                raise _ReadbackMismatch()
+        return ids
+    except _ReadbackMismatch:
+        instances = [model(**row) for row in rows]
+        db.add_all(instances)
+        db.flush()
+        return [instance.id for instance in instances]
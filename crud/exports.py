@@ -0,0 +1,104 @@
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models import ApartmentSale, ApartmentRent, ApartmentPart, RentalContract, PartStatusEnum, Photo
+from .photos import PHOTO_ENTITY_TYPES
+from .search import fulltext_search
+
+EXPORT_MODELS = {
+    "sale": ApartmentSale,
+    "rent": ApartmentRent,
+    "part": ApartmentPart,
+    "contract": RentalContract,
+}
+# Filters of the matching list endpoints
+EXPORT_FILTERS = {
+    "sale": {"q"},
+    "rent": {"q"},
+    "part": {"apartment_id", "status"},
+    "contract": {"apartment_id", "is_active"},
+}
+
+
+def get_export_columns(entity_type: str) -> List[str]:
+    """Column names of an export: the table's columns, plus photos_url for listings."""
+    columns = [column.name for column in EXPORT_MODELS[entity_type].__table__.columns]
+    if entity_type in PHOTO_ENTITY_TYPES:
+        columns.append("photos_url")
+    return columns
+
+
+def build_export_statement(
+    entity_type: str,
+    dialect: str,
+    q: Optional[str] = None,
+    apartment_id: Optional[int] = None,
+    status: Optional[PartStatusEnum] = None,
+    is_active: Optional[bool] = None,
+):
+    """Select the plain columns of every row to export. Raises ValueError for filters the entity does not have.
+
+    Rows come back as tuples rather than ORM objects, so nothing is kept in
+    the session while they stream.
+    """
+    given = {
+        name for name, value in
+        {"q": q, "apartment_id": apartment_id, "status": status, "is_active": is_active}.items()
+        if value is not None
+    }
+    unsupported = given - EXPORT_FILTERS[entity_type]
+    if unsupported:
+        raise ValueError(f"{', '.join(sorted(unsupported))} cannot be used to filter {entity_type} exports")
+
+    Model = EXPORT_MODELS[entity_type]
+    stmt = select(*Model.__table__.columns)
+    if entity_type == "contract":
+        if apartment_id:
+            stmt = stmt.join(ApartmentPart, ApartmentPart.id == RentalContract.apartment_part_id).where(
+                ApartmentPart.apartment_id == apartment_id
+            )
+        if is_active is not None:
+            stmt = stmt.where(RentalContract.is_active == is_active)
+    elif entity_type == "part":
+        if apartment_id:
+            stmt = stmt.where(ApartmentPart.apartment_id == apartment_id)
+        if status:
+            stmt = stmt.where(ApartmentPart.status == status)
+    elif q:
+        # Same ranking as the list endpoints' search
+        return fulltext_search(stmt, Model, q, dialect=dialect)
+    return stmt.order_by(Model.id)
+
+
+def iter_export_rows(db: Session, photos_db: Session, entity_type: str, stmt, batch_size: int) -> Iterator[Dict]:
+    """Yield the rows of `stmt` as dicts, fetching `batch_size` rows at a time.
+
+    The rows are read through a server-side cursor (`yield_per`), so memory use
+    does not grow with the number of rows. A streaming MySQL connection cannot
+    run other queries until the result is consumed, which is why the photos of
+    each batch are looked up in one query on `photos_db`.
+    """
+    result = db.execute(stmt.execution_options(yield_per=batch_size))
+    for partition in result.mappings().partitions():
+        rows = [dict(row) for row in partition]
+        if entity_type in PHOTO_ENTITY_TYPES:
+            urls = _get_photo_urls(photos_db, entity_type, [row["id"] for row in rows])
+            for row in rows:
+                row["photos_url"] = urls.get(row["id"])
+        yield from rows
+
+
+def _get_photo_urls(db: Session, entity_type: str, entity_ids: Sequence[int]) -> Dict[int, List[str]]:
+    urls: Dict[int, List[str]] = {}
+    photos = (
+        db.query(Photo.entity_id, Photo.url)
+        .filter(Photo.entity_type == entity_type, Photo.entity_id.in_(entity_ids))
+        .order_by(Photo.entity_id, Photo.position, Photo.id)
+    )
+    for entity_id, url in photos:
+        urls.setdefault(entity_id, []).append(url)
+    # Only needed for this batch; do not hold the read transaction open between batches
+    db.rollback()
+    return urls
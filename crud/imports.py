@@ -0,0 +1,99 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from models import Admin, AdminRoleEnum, ApartmentRent, ApartmentSale, ApartmentPart
+from .bulk import insert_returning_ids
+from .photos import insert_entity_photos
+from services.cache import invalidate_sale, invalidate_rent, invalidate_part
+from services.geo import fill_coordinates
+
+# (row number in the source file, apartment id for parts or None, validated record)
+ImportRecord = Tuple[int, Optional[int], BaseModel]
+
+LISTING_MODELS = {"sale": ApartmentSale, "rent": ApartmentRent}
+
+
+def import_listings_batch(db: Session, entity_type: str, records: Sequence[ImportRecord], admin: Admin) -> List[Dict]:
+    """Insert one batch of validated import records and commit. Returns the rows that failed.
+
+    The batch goes out as one executemany. If the database rejects it, the
+    rows are retried one at a time so only the offending ones are reported.
+    """
+    errors: List[Dict] = []
+    try:
+        with db.begin_nested():
+            apartment_ids = _insert_records(db, entity_type, records, admin, errors)
+    except SQLAlchemyError:
+        errors = []
+        apartment_ids = set()
+        for record in records:
+            try:
+                with db.begin_nested():
+                    apartment_ids |= _insert_records(db, entity_type, [record], admin, errors)
+            except SQLAlchemyError as e:
+                errors.append({"row": record[0], "errors": [str(getattr(e, "orig", e))]})
+    db.commit()
+
+    if entity_type == "sale":
+        invalidate_sale()
+    elif entity_type == "rent":
+        invalidate_rent()
+    else:
+        for apartment_id in apartment_ids:
+            invalidate_part(apartment_id)
+    return errors
+
+
+def _insert_records(db: Session, entity_type: str, records: Sequence[ImportRecord], admin: Admin, errors: List[Dict]) -> set:
+    """Insert `records`, appending rows that cannot be imported to `errors`. Returns the parts' apartment ids."""
+    if entity_type == "part":
+        return _insert_parts(db, records, admin, errors)
+
+    Model = LISTING_MODELS[entity_type]
+    # Locked so this admin's listings are inserted one batch at a time (see insert_returning_ids)
+    db.query(Admin.id).filter(Admin.id == admin.id).with_for_update().first()
+    rows = []
+    photos = []
+    for _, _, record in records:
+        data = fill_coordinates(record.dict())
+        photos.append(data.pop('photos_url', None))
+        data['listed_by_admin_id'] = admin.id
+        data['contact_number'] = admin.phone
+        rows.append(data)
+    ids = insert_returning_ids(db, Model, rows, Model.listed_by_admin_id == admin.id)
+    insert_entity_photos(db, entity_type, {entity_id: urls for entity_id, urls in zip(ids, photos) if urls})
+    return set()
+
+
+def _insert_parts(db: Session, records: Sequence[ImportRecord], admin: Admin, errors: List[Dict]) -> set:
+    wanted = {apartment_id for _, apartment_id, _ in records}
+    # Locked so parts of these apartments are inserted one batch at a time (see insert_returning_ids)
+    apartments = {
+        apartment.id: apartment for apartment in
+        db.query(ApartmentRent).filter(ApartmentRent.id.in_(wanted)).with_for_update()
+    }
+
+    rows = []
+    photos = []
+    for row_number, apartment_id, record in records:
+        apartment = apartments.get(apartment_id)
+        if apartment is None:
+            errors.append({"row": row_number, "errors": [f"apartment_id: apartment {apartment_id} not found"]})
+            continue
+        if admin.role != AdminRoleEnum.super_admin and apartment.listed_by_admin_id != admin.id:
+            errors.append({"row": row_number, "errors": ["apartment_id: only the admin who created the apartment can create parts for it"]})
+            continue
+        data = record.dict()
+        photos.append(data.pop('photos_url', None))
+        data['floor'] = apartment.floor  # Inherit floor from apartment
+        data['apartment_id'] = apartment_id
+        data['created_by_admin_id'] = admin.id
+        rows.append(data)
+
+    apartment_ids = {row['apartment_id'] for row in rows}
+    ids = insert_returning_ids(db, ApartmentPart, rows, ApartmentPart.apartment_id.in_(apartment_ids))
+    insert_entity_photos(db, "part", {part_id: urls for part_id, urls in zip(ids, photos) if urls})
+    return apartment_ids
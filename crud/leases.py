@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models import JobLease
+
+
+def acquire_lease(db: Session, name: str, owner: str, seconds: float, now: Optional[datetime] = None) -> bool:
+    """Take or renew the lease `name` for `seconds`. Returns False if another owner holds it.
+
+    The conditional UPDATE (or the INSERT of a lease that does not exist yet)
+    is atomic in the database, so of several workers asking at once exactly
+    one gets the lease.
+    """
+    now = now or datetime.utcnow()
+    expires_at = now + timedelta(seconds=seconds)
+    taken = db.execute(
+        update(JobLease)
+        .where(JobLease.name == name, or_(JobLease.owner == owner, JobLease.expires_at <= now))
+        .values(owner=owner, expires_at=expires_at)
+    ).rowcount
+    if taken:
+        db.commit()
+        return True
+    if db.get(JobLease, name) is not None:
+        db.rollback()
+        return False
+    try:
+        db.add(JobLease(name=name, owner=owner, expires_at=expires_at))
+        db.commit()
+        return True
+    except IntegrityError:
+        # Another worker created it first
+        db.rollback()
+        return False
+
+
+def record_lease_run(db: Session, name: str, owner: str, started_at: datetime, duration_ms: int) -> None:
+    """Store when the lease holder last ran the job and how long it took."""
+    db.execute(
+        update(JobLease)
+        .where(JobLease.name == name, JobLease.owner == owner)
+        .values(last_run_at=started_at, last_duration_ms=duration_ms)
+    )
+    db.commit()
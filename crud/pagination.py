@@ -0,0 +1,69 @@
+from typing import Dict, List, Optional
+import base64
+import json
+
+from fastapi import HTTPException, Query as QueryParam
+from sqlalchemy.orm import Query
+
+
+# Response header carrying the cursor for the next page of a list endpoint
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(last_id: int) -> str:
+    """Encode the id of the last row of a page into an opaque cursor."""
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a cursor produced by `encode_cursor`. Raises ValueError if malformed."""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return int(data["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def parse_cursor(
+    cursor: Optional[str] = QueryParam(None, description=f"Opaque cursor from the {NEXT_CURSOR_HEADER} header; overrides skip"),
+) -> Optional[str]:
+    """Route dependency for the `cursor` query parameter: a malformed cursor is a 400."""
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return cursor
+
+
+def paginate_statement(query, id_column, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    """Apply keyset pagination when a cursor is given, otherwise fall back to skip/limit.
+
+    Both modes order on the primary key so a cursor taken from an offset page
+    continues exactly where that page stopped. Works on both ORM `Query` objects
+    and 2.0-style `select()` statements (used by the async session).
+    """
+    query = query.order_by(id_column)
+    if cursor:
+        return query.filter(id_column > decode_cursor(cursor)).limit(limit)
+    return query.offset(skip).limit(limit)
+
+
+def paginate(query: Query, id_column, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List:
+    """Run `paginate_statement` on a sync ORM query."""
+    return paginate_statement(query, id_column, skip=skip, limit=limit, cursor=cursor).all()
+
+
+def get_next_cursor(items: List, limit: int) -> Optional[str]:
+    """Return the cursor for the page after `items`, or None if this was the last page."""
+    if limit and len(items) == limit:
+        return encode_cursor(items[-1].id)
+    return None
+
+
+def cursor_headers(items: List, limit: int) -> Dict[str, str]:
+    """Response headers for a page: the next page's cursor, if there is one."""
+    next_cursor = get_next_cursor(items, limit)
+    return {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
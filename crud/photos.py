@@ -0,0 +1,201 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import json
+
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models import Photo, ApartmentRent, ApartmentSale, ApartmentPart
+from .stored_objects import get_object_keys, get_object_variants, retain_objects, release_objects
+
+# Entity types that own photos (same names as the upload endpoint)
+PHOTO_ENTITY_TYPES = ("rent", "sale", "part")
+PHOTO_OWNER_MODELS = {"rent": ApartmentRent, "sale": ApartmentSale, "part": ApartmentPart}
+
+
+def get_photos(db: Session, entity_type: str, entity_id: int) -> List[Photo]:
+    return (
+        db.query(Photo)
+        .filter(Photo.entity_type == entity_type, Photo.entity_id == entity_id)
+        .order_by(Photo.position, Photo.id)
+        .all()
+    )
+
+
+def get_photo(db: Session, entity_type: str, entity_id: int, photo_id: int) -> Optional[Photo]:
+    return (
+        db.query(Photo)
+        .filter(Photo.id == photo_id, Photo.entity_type == entity_type, Photo.entity_id == entity_id)
+        .first()
+    )
+
+
+def append_photos(db: Session, entity_type: str, entity_id: int, photos: Sequence[Dict]) -> List[Photo]:
+    """Add photos after the entity's current last one. Returns the rows that were added.
+
+    Each item has a `url` and optionally `key`, `content_type` and `size_bytes`.
+    URLs the entity already lists are skipped, so existing rows are never rewritten.
+    """
+    # Locked so concurrent uploads to one entity number their photos one after the other
+    Owner = PHOTO_OWNER_MODELS[entity_type]
+    db.query(Owner.id).filter(Owner.id == entity_id).with_for_update().first()
+    # A locking read, so it sees the photos a concurrent upload committed while this one waited
+    current = (
+        db.query(Photo.url, Photo.position)
+        .filter(Photo.entity_type == entity_type, Photo.entity_id == entity_id)
+        .with_for_update()
+        .all()
+    )
+    existing = {url for url, _ in current}
+    position = max((position for _, position in current), default=-1)
+
+    items = [item for item in photos if item.get("url")]
+    keys = get_object_keys(db, [item["url"] for item in items])
+    variants = get_object_variants(db, keys)
+
+    added: List[Photo] = []
+    for item in items:
+        url = item["url"]
+        if url in existing:
+            continue
+        existing.add(url)
+        photo = Photo(
+            entity_type=entity_type,
+            entity_id=entity_id,
+            position=position + 1,
+            key=item.get("key") or keys.get(url),
+            url=url,
+            content_type=item.get("content_type"),
+            size_bytes=item.get("size_bytes"),
+            variants=json.dumps(variants[url]) if url in variants else None,
+        )
+        try:
+            # Savepoint: the entity may have got this URL meanwhile (uq_photos_entity_url); it is then already attached
+            with db.begin_nested():
+                db.add(photo)
+        except IntegrityError:
+            continue
+        position += 1
+        added.append(photo)
+    retain_objects(db, [photo.url for photo in added])
+    return added
+
+
+def insert_entity_photos(db: Session, entity_type: str, urls_by_entity: Dict[int, Sequence[str]]) -> None:
+    """Add the photos of entities that have none yet (bulk creates), in one batch."""
+    rows = []
+    for entity_id, urls in urls_by_entity.items():
+        for url in dict.fromkeys(url for url in urls or [] if url):
+            rows.append((entity_id, url))
+    if not rows:
+        return
+    keys = get_object_keys(db, [url for _, url in rows])
+    variants = get_object_variants(db, keys)
+
+    positions: Dict[int, int] = {}
+    photos = []
+    for entity_id, url in rows:
+        position = positions.get(entity_id, 0)
+        positions[entity_id] = position + 1
+        photos.append({
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "position": position,
+            "key": keys.get(url),
+            "url": url,
+            "content_type": None,
+            "size_bytes": None,
+            "variants": json.dumps(variants[url]) if url in variants else None,
+        })
+    # The new rows' ids are not needed, so they go out as one executemany
+    db.execute(insert(Photo), photos)
+    retain_objects(db, [url for _, url in rows])
+
+
+def set_photo_urls(db: Session, entity_type: str, entity_id: int, urls: Optional[Iterable[str]]) -> None:
+    """Make the entity's photos exactly `urls`, in that order (used by create/update with photos_url).
+
+    Only rows that are removed, added or moved are touched.
+    """
+    wanted: List[str] = []
+    for url in urls or []:
+        if url and url not in wanted:
+            wanted.append(url)
+
+    current = get_photos(db, entity_type, entity_id)
+    removed = [photo for photo in current if photo.url not in wanted]
+    delete_photos(db, removed)
+
+    by_url = {photo.url: photo for photo in current if photo.url in wanted}
+    missing = [{"url": url} for url in wanted if url not in by_url]
+    if missing:
+        # Appended after the kept rows; the position pass below puts them in place
+        for photo in append_photos(db, entity_type, entity_id, missing):
+            by_url[photo.url] = photo
+        db.flush()
+
+    _write_positions(db, [by_url[url] for url in wanted])
+
+
+def reorder_photos(db: Session, entity_type: str, entity_id: int, photo_ids: Sequence[int]) -> List[Photo]:
+    """Put the entity's photos in the order of `photo_ids`, which must list each of them once."""
+    current = get_photos(db, entity_type, entity_id)
+    if sorted(photo_ids) != sorted(photo.id for photo in current):
+        raise ValueError("photo_ids must list every photo of the entity exactly once")
+    by_id = {photo.id: photo for photo in current}
+    ordered = [by_id[photo_id] for photo_id in photo_ids]
+    _write_positions(db, ordered)
+    return ordered
+
+
+def _write_positions(db: Session, ordered: Sequence[Photo]) -> None:
+    """Number `ordered` 0..n-1, updating only the rows whose position changes (one executemany)."""
+    moved = [(photo, index) for index, photo in enumerate(ordered) if photo.position != index]
+    if moved:
+        db.flush()
+        # ORM bulk UPDATE by primary key; it bypasses the identity map, so expire what it wrote
+        db.execute(update(Photo), [{"id": photo.id, "position": index} for photo, index in moved])
+        for photo, _ in moved:
+            db.expire(photo, ["position"])
+
+
+def delete_photos(db: Session, photos: Sequence[Photo]) -> None:
+    """Delete the given photo rows and release their stored objects."""
+    if not photos:
+        return
+    release_objects(db, [photo.url for photo in photos])
+    db.query(Photo).filter(Photo.id.in_([photo.id for photo in photos])).delete(synchronize_session=False)
+    for photo in photos:
+        if photo in db:
+            db.expunge(photo)
+
+
+def delete_entity_photos(db: Session, entity_type: str, entity_ids: Iterable[int]) -> None:
+    """Delete every photo of the given entities (called when the entities are deleted)."""
+    entity_ids = list(entity_ids)
+    if not entity_ids:
+        return
+    urls = [
+        url for (url,) in db.query(Photo.url).filter(Photo.entity_type == entity_type, Photo.entity_id.in_(entity_ids))
+    ]
+    release_objects(db, urls)
+    # Default synchronization detaches photo rows already loaded with the entity instead of expiring them
+    db.query(Photo).filter(Photo.entity_type == entity_type, Photo.entity_id.in_(entity_ids)).delete()
+
+
+def set_photo_variants(db: Session, variants_by_url: Dict[str, Dict[str, str]]) -> Set[Tuple[str, int]]:
+    """Record generated variants on every photo row showing these URLs.
+
+    Returns the (entity_type, entity_id) of every entity whose photos changed:
+    uploads are content-addressed, so several listings can show the same URL.
+    """
+    if not variants_by_url:
+        return set()
+    owners = set(
+        db.query(Photo.entity_type, Photo.entity_id).filter(Photo.url.in_(list(variants_by_url))).distinct().all()
+    )
+    for url, variants in variants_by_url.items():
+        db.query(Photo).filter(Photo.url == url).update(
+            {Photo.variants: json.dumps(variants)}, synchronize_session=False
+        )
+    return {(entity_type, entity_id) for entity_type, entity_id in owners}
@@ -1,9 +1,13 @@
-from typing import Optional, List
+from datetime import date, timedelta
+from typing import Dict, Optional, List
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, or_, update
 
 from models import RentalContract
 from schemas.rental_contract import RentalContractCreate, RentalContractUpdate
+from .pagination import paginate
+from .stored_objects import retain_objects, release_objects, replace_object_references
+from services.cache import invalidate_part, invalidate_contract
 
 
 def get_rental_contract(db: Session, contract_id: int):
@@ -19,7 +23,8 @@ def get_rental_contracts(
     apartment_id: Optional[int] = None,
     is_active: Optional[bool] = None,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    cursor: Optional[str] = None
 ):
     query = db.query(RentalContract)
     if apartment_id:
@@ -28,7 +33,7 @@ def get_rental_contracts(
         )
     if is_active is not None:
         query = query.filter(RentalContract.is_active == is_active)
-    return query.offset(skip).limit(limit).all()
+    return paginate(query, RentalContract.id, skip=skip, limit=limit, cursor=cursor)
 
 
 def create_rental_contract(db: Session, contract: RentalContractCreate, created_by_admin_id: int, current_admin_role: str = None):
@@ -53,12 +58,15 @@ def create_rental_contract(db: Session, contract: RentalContractCreate, created_
     # Create the rental contract
     db_contract = RentalContract(**contract.dict(), created_by_admin_id=created_by_admin_id)
     db.add(db_contract)
+    retain_objects(db, [db_contract.contract_url, db_contract.customer_id_url])
     
     # Update the apartment part status to 'rented'
     apartment_part.status = PartStatusEnum.rented
     
     db.commit()
     db.refresh(db_contract)
+    invalidate_part(apartment_part.apartment_id, apartment_part.id)
+    invalidate_contract()
     return db_contract
 
 
@@ -66,10 +74,13 @@ def update_rental_contract(db: Session, contract_id: int, contract: RentalContra
     db_contract = db.query(RentalContract).filter(RentalContract.id == contract_id).first()
     if db_contract:
         update_data = contract.dict(exclude_unset=True)
+        old_documents = [db_contract.contract_url, db_contract.customer_id_url]
         for field, value in update_data.items():
             setattr(db_contract, field, value)
+        replace_object_references(db, old_documents, [db_contract.contract_url, db_contract.customer_id_url])
         db.commit()
         db.refresh(db_contract)
+        invalidate_contract()
     return db_contract
 
 
@@ -82,8 +93,12 @@ def delete_rental_contract(db: Session, contract_id: int):
         if apartment_part:
             apartment_part.status = PartStatusEnum.available
         
+        release_objects(db, [db_contract.contract_url, db_contract.customer_id_url])
         db.delete(db_contract)
         db.commit()
+        if apartment_part:
+            invalidate_part(apartment_part.apartment_id, apartment_part.id)
+        invalidate_contract()
     return db_contract
 
 
@@ -109,12 +124,84 @@ def get_rental_contracts_by_studio_ordered(
 
 def get_expiring_contracts(db: Session, days_ahead: int = 30):
     """Get rental contracts expiring within specified days."""
-    from datetime import date, timedelta
     expiry_date = date.today() + timedelta(days=days_ahead)
     return db.query(RentalContract).filter(
         and_(
-            RentalContract.contract_end_date <= expiry_date,
-            RentalContract.contract_end_date >= date.today(),
+            RentalContract.rent_end_date <= expiry_date,
+            RentalContract.rent_end_date >= date.today(),
             RentalContract.is_active == True
         )
     ).all()
+
+
+def apply_contract_lifecycle(db: Session, upcoming_days: int = 30, today: Optional[date] = None) -> Dict[str, int]:
+    """Move studios and contracts along as contract end dates pass, in a few set-based statements.
+
+    - rented studios whose active contract ends within `upcoming_days` become upcoming_end
+      (and go back to rented if the contract was extended);
+    - active contracts whose rent_end_date has passed are deactivated and their studios
+      become available again.
+
+    Returns how many rows each transition touched.
+    """
+    from models import ApartmentPart, PartStatusEnum
+
+    today = today or date.today()
+    soon = today + timedelta(days=upcoming_days)
+    active = and_(RentalContract.apartment_part_id == ApartmentPart.id, RentalContract.is_active == True)
+    expired = and_(active, RentalContract.rent_end_date < today)
+    ending = and_(
+        active,
+        RentalContract.rent_end_date >= today,
+        RentalContract.rent_end_date <= soon,
+        ApartmentPart.status == PartStatusEnum.rented,
+    )
+    extended = and_(active, RentalContract.rent_end_date > soon, ApartmentPart.status == PartStatusEnum.upcoming_end)
+
+    # Lock the rows about to change and note them for the report and cache invalidation
+    changing = (
+        db.query(ApartmentPart.id, ApartmentPart.apartment_id, RentalContract.rent_end_date < today, ApartmentPart.status)
+        .join(RentalContract, RentalContract.apartment_part_id == ApartmentPart.id)
+        .filter(or_(expired, ending, extended))
+        .with_for_update()
+        .all()
+    )
+    report = {"upcoming_end": 0, "extended": 0, "expired": 0}
+    for _, _, is_expired, status in changing:
+        if is_expired:
+            report["expired"] += 1
+        elif status == PartStatusEnum.rented:
+            report["upcoming_end"] += 1
+        else:
+            report["extended"] += 1
+    if not changing:
+        db.rollback()
+        return report
+
+    parts = ApartmentPart.__table__
+    contracts = RentalContract.__table__
+    if report["upcoming_end"]:
+        db.execute(update(parts).where(ending).values(status=PartStatusEnum.upcoming_end))
+    if report["extended"]:
+        db.execute(update(parts).where(extended).values(status=PartStatusEnum.rented))
+    if report["expired"]:
+        if db.get_bind().dialect.name == "mysql":
+            # UPDATE ... JOIN setting both tables, so the contract and its studio change in one statement
+            db.execute(
+                update(contracts).where(expired)
+                .values({contracts.c.is_active: False, parts.c.status: PartStatusEnum.available})
+            )
+        else:
+            # Other databases update one table per statement: free the studios while their contracts still read active
+            db.execute(update(parts).where(expired).values(status=PartStatusEnum.available))
+            db.execute(
+                update(contracts)
+                .where(contracts.c.is_active == True, contracts.c.rent_end_date < today)
+                .values(is_active=False)
+            )
+    db.commit()
+
+    for part_id, apartment_id, _, _ in changing:
+        invalidate_part(apartment_id, part_id)
+    invalidate_contract()
+    return report
@@ -0,0 +1,56 @@
+import re
+from typing import Optional
+
+from sqlalchemy import Float, Integer, false, or_, text
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Query
+
+from models.fulltext import FULLTEXT_COLUMNS, fts_table_name
+
+
+def fulltext_search(query: Query, model, q: str, dialect: Optional[str] = None) -> Query:
+    """Restrict `query` to rows of `model` matching `q`, most relevant first.
+
+    MySQL uses the FULLTEXT index in natural language mode and SQLite the FTS5
+    mirror table; any other dialect falls back to a LIKE scan. `query` may also
+    be a `select()` statement, in which case `dialect` must be given.
+    """
+    if dialect is None:
+        dialect = query.session.get_bind().dialect.name
+    if dialect == "mysql":
+        return _mysql_search(query, model, q)
+    if dialect == "sqlite":
+        return _sqlite_search(query, model, q)
+    return _like_search(query, model, q)
+
+
+def _mysql_search(query: Query, model, q: str) -> Query:
+    relevance = match(
+        *[getattr(model, column) for column in FULLTEXT_COLUMNS],
+        against=q,
+    ).in_natural_language_mode()
+    return query.filter(relevance).order_by(relevance.desc(), model.id)
+
+
+def _sqlite_search(query: Query, model, q: str) -> Query:
+    # Quote every word so user input cannot hit FTS5 query syntax, and OR them
+    # together to rank like MySQL's natural language mode.
+    terms = re.findall(r"\w+", q)
+    if not terms:
+        return query.filter(false())
+    fts = fts_table_name(model.__tablename__)
+    ranked = (
+        text(f"SELECT rowid AS id, bm25({fts}) AS rank FROM {fts} WHERE {fts} MATCH :terms")
+        .bindparams(terms=" OR ".join(f'"{term}"' for term in terms))
+        .columns(id=Integer, rank=Float)
+        .subquery()
+    )
+    # bm25() is lower for better matches
+    return query.join(ranked, model.id == ranked.c.id).order_by(ranked.c.rank, model.id)
+
+
+def _like_search(query: Query, model, q: str) -> Query:
+    pattern = f"%{q}%"
+    return query.filter(
+        or_(*[getattr(model, column).ilike(pattern) for column in FULLTEXT_COLUMNS])
+    ).order_by(model.id)
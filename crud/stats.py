@@ -0,0 +1,107 @@
+from decimal import Decimal
+from typing import Dict, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models import Admin, AdminRoleEnum, ApartmentRent, ApartmentSale, ApartmentPart, RentalContract, PartStatusEnum
+from schemas.stats import StatsOverviewResponse
+from services.cache import get_or_build, STATS_CACHE_TTL_SECONDS
+
+# Writes to any of these evict the cached aggregates (see services/cache.py)
+STATS_CACHE_TAGS = ("sale", "rent", "part", "contract")
+
+
+def _empty_stats() -> Dict:
+    return {
+        "rent_apartments": 0,
+        "sale_apartments": 0,
+        "studios": {"total": 0, **{status.value: 0 for status in PartStatusEnum}},
+        "active_contracts": 0,
+        "active_contracts_rent": Decimal("0"),
+    }
+
+
+def _add_stats(total: Dict, stats: Dict) -> None:
+    for field in ("rent_apartments", "sale_apartments", "active_contracts", "active_contracts_rent"):
+        total[field] += stats[field]
+    for status, count in stats["studios"].items():
+        total["studios"][status] += count
+
+
+def _set_occupancy(stats: Dict) -> Dict:
+    studios = stats["studios"]
+    occupied = studios[PartStatusEnum.rented.value] + studios[PartStatusEnum.upcoming_end.value]
+    stats["occupancy_rate"] = round(occupied / studios["total"], 4) if studios["total"] else 0.0
+    return stats
+
+
+def get_stats_overview(db: Session, admin_id: Optional[int] = None) -> Dict:
+    """Count listings, studios by status and active contracts per owning admin, in four grouped queries.
+
+    Studios and contracts belong to the admin who listed their apartment, as
+    in the ownership checks. With `admin_id`, only that admin's content is
+    counted; without it, everything.
+    """
+    owner = ApartmentRent.listed_by_admin_id
+
+    def scoped(query, column):
+        return query.filter(column == admin_id) if admin_id is not None else query
+
+    by_admin: Dict[int, Dict] = {}
+
+    def stats_for(owner_id: int) -> Dict:
+        return by_admin.setdefault(owner_id, _empty_stats())
+
+    rent_counts = scoped(db.query(owner, func.count(ApartmentRent.id)), owner).group_by(owner)
+    for owner_id, count in rent_counts:
+        stats_for(owner_id)["rent_apartments"] = count
+
+    sale_owner = ApartmentSale.listed_by_admin_id
+    sale_counts = scoped(db.query(sale_owner, func.count(ApartmentSale.id)), sale_owner).group_by(sale_owner)
+    for owner_id, count in sale_counts:
+        stats_for(owner_id)["sale_apartments"] = count
+
+    part_counts = scoped(
+        db.query(owner, ApartmentPart.status, func.count(ApartmentPart.id))
+        .join(ApartmentRent, ApartmentRent.id == ApartmentPart.apartment_id),
+        owner,
+    ).group_by(owner, ApartmentPart.status)
+    for owner_id, status, count in part_counts:
+        studios = stats_for(owner_id)["studios"]
+        studios[status.value] = count
+        studios["total"] += count
+
+    contract_totals = scoped(
+        db.query(owner, func.count(RentalContract.id), func.coalesce(func.sum(RentalContract.rent_price), 0))
+        .join(ApartmentPart, ApartmentPart.id == RentalContract.apartment_part_id)
+        .join(ApartmentRent, ApartmentRent.id == ApartmentPart.apartment_id)
+        .filter(RentalContract.is_active == True),
+        owner,
+    ).group_by(owner)
+    for owner_id, count, rent in contract_totals:
+        stats = stats_for(owner_id)
+        stats["active_contracts"] = count
+        stats["active_contracts_rent"] = Decimal(rent)
+
+    names = dict(db.query(Admin.id, Admin.full_name).filter(Admin.id.in_(list(by_admin)))) if by_admin else {}
+    overview = _empty_stats()
+    rows = []
+    for owner_id in sorted(by_admin):
+        stats = by_admin[owner_id]
+        _add_stats(overview, stats)
+        rows.append({"admin_id": owner_id, "admin_name": names.get(owner_id), **_set_occupancy(stats)})
+    overview["by_admin"] = rows
+    return _set_occupancy(overview)
+
+
+def get_stats_overview_cached(db: Session, admin: Admin) -> StatsOverviewResponse:
+    """`get_stats_overview` for what `admin` can see (everything for the super admin), from the response cache."""
+    admin_id = None if admin.role == AdminRoleEnum.super_admin else admin.id
+    return get_or_build(
+        f"stats:overview:{admin_id if admin_id is not None else 'all'}",
+        StatsOverviewResponse,
+        tags=STATS_CACHE_TAGS,
+        build=lambda: get_stats_overview(db, admin_id),
+        ttl_seconds=STATS_CACHE_TTL_SECONDS,
+    )
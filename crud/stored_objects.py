@@ -0,0 +1,96 @@
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+import json
+
+from sqlalchemy import case, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models import StoredObject
+
+
+def register_objects(db: Session, saved: Iterable[Tuple[str, str]]) -> None:
+    """Make sure every saved (key, url) has a StoredObject row, starting at zero references.
+
+    An existing row gets its updated_at bumped, restarting the grace period of
+    gc_storage.py so it cannot delete the object before the upload references it.
+    """
+    for key, url in saved:
+        if db.query(StoredObject).filter(StoredObject.url == url).update(
+            {StoredObject.updated_at: func.now()}, synchronize_session=False
+        ):
+            continue
+        try:
+            # Savepoint: a concurrent upload of the same bytes may insert the row first
+            with db.begin_nested():
+                db.add(StoredObject(key=key, url=url, ref_count=0))
+        except IntegrityError:
+            pass
+
+
+def _references_by_count(urls: Iterable[Optional[str]]) -> Dict[int, List[str]]:
+    """Group URLs by how many references each gains or loses, e.g. {1: [a, b], 2: [c]}."""
+    groups: Dict[int, List[str]] = {}
+    for url, count in Counter(u for u in urls if u).items():
+        groups.setdefault(count, []).append(url)
+    return groups
+
+
+def retain_objects(db: Session, urls: Iterable[Optional[str]]) -> None:
+    """Add one reference per occurrence in `urls`; URLs not in storage are ignored."""
+    for count, group in _references_by_count(urls).items():
+        db.query(StoredObject).filter(StoredObject.url.in_(group)).update(
+            {StoredObject.ref_count: StoredObject.ref_count + count, StoredObject.updated_at: func.now()},
+            synchronize_session=False,
+        )
+
+
+def release_objects(db: Session, urls: Iterable[Optional[str]]) -> None:
+    """Drop one reference per occurrence in `urls`, never going below zero."""
+    for count, group in _references_by_count(urls).items():
+        db.query(StoredObject).filter(StoredObject.url.in_(group), StoredObject.ref_count > 0).update(
+            {
+                StoredObject.ref_count: case((StoredObject.ref_count > count, StoredObject.ref_count - count), else_=0),
+                StoredObject.updated_at: func.now(),
+            },
+            synchronize_session=False,
+        )
+
+
+def replace_object_references(db: Session, old_urls: Iterable[Optional[str]], new_urls: Iterable[Optional[str]]) -> None:
+    """Move references from `old_urls` to `new_urls`, leaving URLs present in both untouched."""
+    old_counts, new_counts = Counter(u for u in old_urls if u), Counter(u for u in new_urls if u)
+    release_objects(db, (old_counts - new_counts).elements())
+    retain_objects(db, (new_counts - old_counts).elements())
+
+
+def get_object_keys(db: Session, urls: Iterable[str]) -> Dict[str, str]:
+    """Storage keys of the stored objects among `urls`."""
+    rows = db.query(StoredObject.url, StoredObject.key).filter(StoredObject.url.in_(set(urls))).all()
+    return dict(rows)
+
+
+def get_object_variants(db: Session, urls: Iterable[str]) -> Dict[str, Dict[str, str]]:
+    """Previously generated photo variants of stored objects, keyed by object URL."""
+    rows = db.query(StoredObject.url, StoredObject.variants).filter(
+        StoredObject.url.in_(set(urls)), StoredObject.variants.isnot(None)
+    ).all()
+    return {url: json.loads(variants) for url, variants in rows}
+
+
+def set_object_variants(db: Session, variants_by_url: Dict[str, Dict[str, str]]) -> None:
+    for url, variants in variants_by_url.items():
+        db.query(StoredObject).filter(StoredObject.url == url).update(
+            {StoredObject.variants: json.dumps(variants)}, synchronize_session=False
+        )
+
+
+def get_unreferenced_objects(db: Session, older_than, after_id: int = 0, limit: int = 500):
+    """Objects with no references whose count last changed before `older_than`, in id order."""
+    return (
+        db.query(StoredObject)
+        .filter(StoredObject.ref_count <= 0, StoredObject.updated_at < older_than, StoredObject.id > after_id)
+        .order_by(StoredObject.id)
+        .limit(limit)
+        .all()
+    )
@@ -4,7 +4,9 @@ from sqlalchemy.orm import Session
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 from decouple import config
+import asyncio
 
 from database import get_db
 from models import Admin, AdminRoleEnum
@@ -14,9 +16,12 @@ from schemas.auth import TokenData
 SECRET_KEY = config("SECRET_KEY", default="your-secret-key-change-in-production")
 ALGORITHM = config("ALGORITHM", default="HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = config("ACCESS_TOKEN_EXPIRE_MINUTES", default=30, cast=int)
+# bcrypt takes ~250ms of CPU per check; this bounds how many run at once off the event loop
+PASSWORD_HASH_WORKERS = config("PASSWORD_HASH_WORKERS", default=4, cast=int)
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
+password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
@@ -26,6 +31,15 @@ def get_password_hash(password: str) -> str:
     """Hash a password."""
     return pwd_context.hash(password)
 
+def get_password_hash_in_pool(password: str) -> str:
+    """Hash a password in the bounded password thread pool, waiting for it (sync routes and crud)."""
+    return password_executor.submit(get_password_hash, password).result()
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the bounded password thread pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, verify_password, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     """Create JWT access token."""
     to_encode = data.copy()
@@ -52,11 +66,16 @@ def authenticate_admin(db: Session, username: str, password: str):
         return False
     return admin
 
-async def get_current_admin(
+def get_current_admin(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ):
-    """Get current authenticated admin from JWT token."""
+    """Get current authenticated admin from JWT token.
+
+    A plain `def`, so FastAPI runs it in its threadpool: waiting for a
+    connection of a busy pool does not block the event loop. It shares the
+    route's session, so a request still holds a single connection.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -78,7 +97,7 @@ async def get_current_admin(
     except JWTError:
         raise credentials_exception
     
-    admin = db.query(Admin).filter(Admin.id == admin_id).first()
+    admin = db.get(Admin, admin_id)
     if admin is None:
         raise credentials_exception
     return admin
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Garbage collection script for uploaded files.
+Uploads are stored once per distinct content and reference counted. This
+script deletes stored objects (and their resized variants) that no entity has
+referenced for at least the grace period.
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime, timedelta
+
+from database import SessionLocal
+from models import StoredObject
+from crud.stored_objects import get_unreferenced_objects
+from services.images import derivative_key
+from services.storage import get_storage
+
+
+def collect_garbage(grace_hours: float, dry_run: bool = False) -> int:
+    """Delete unreferenced objects older than the grace period. Returns how many were deleted."""
+    storage = get_storage()
+    # updated_at is written by the database clock, which is expected to run in UTC
+    cutoff = datetime.utcnow() - timedelta(hours=grace_hours)
+    db = SessionLocal()
+    deleted = 0
+    last_id = 0
+    try:
+        while True:
+            batch = get_unreferenced_objects(db, cutoff, after_id=last_id)
+            if not batch:
+                break
+            for obj in batch:
+                last_id, key, variants = obj.id, obj.key, json.loads(obj.variants or "{}")
+                if dry_run:
+                    print(f"would delete {key}")
+                    deleted += 1
+                    continue
+                # Re-check the row in the DELETE itself so a reference taken or an upload
+                # registered since the scan wins
+                removed = db.query(StoredObject).filter(
+                    StoredObject.id == obj.id, StoredObject.ref_count <= 0, StoredObject.updated_at < cutoff
+                ).delete(synchronize_session=False)
+                db.commit()
+                if not removed:
+                    continue
+                storage.delete(key)
+                for variant in variants:
+                    storage.delete(derivative_key(key, variant))
+                print(f"✓ Deleted {key}")
+                deleted += 1
+    finally:
+        db.close()
+    return deleted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delete uploaded files no entity references anymore.")
+    parser.add_argument("--grace-hours", type=float, default=24, help="Only delete objects unreferenced for this long")
+    parser.add_argument("--dry-run", action="store_true", help="List the objects that would be deleted")
+    args = parser.parse_args()
+    try:
+        count = collect_garbage(args.grace_hours, args.dry_run)
+        print(f"\n✅ Storage garbage collection completed: {count} object(s) {'eligible' if args.dry_run else 'deleted'}")
+    except Exception as e:
+        print(f"❌ Garbage collection failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Import script for listings kept in spreadsheets.
+Streams a CSV (with a header row) or JSONL file of sale apartments, rent
+apartments or parts (studios) into the database in batches. Columns are the
+fields of the create endpoints; parts also need an apartment_id. Listings are
+owned by the given admin.
+
+With --checkpoint, the number of rows done is saved after every batch and an
+interrupted import continues from there when run again with the same file.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from database import SessionLocal
+from models import Admin
+from services.importer import IMPORT_SCHEMAS, IMPORT_BATCH_SIZE, detect_format, import_listings
+
+
+def read_checkpoint(path: str, source: str) -> int:
+    if not path or not os.path.exists(path):
+        return 0
+    with open(path) as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("source") != os.path.abspath(source):
+        raise ValueError(f"Checkpoint {path} belongs to {checkpoint.get('source')}")
+    return int(checkpoint.get("rows_processed", 0))
+
+
+def write_checkpoint(path: str, source: str, rows_processed: int) -> None:
+    # Written to a temporary file and renamed, so a crash never leaves half a checkpoint
+    with open(path + ".tmp", "w") as f:
+        json.dump({"source": os.path.abspath(source), "rows_processed": rows_processed}, f)
+    os.replace(path + ".tmp", path)
+
+
+def run_import(entity_type: str, path: str, admin_email: str, fmt: str = None, batch_size: int = IMPORT_BATCH_SIZE, checkpoint: str = None) -> dict:
+    fmt = fmt or detect_format(path)
+    if not fmt:
+        raise ValueError("Cannot tell the format from the file name; pass --format csv or --format jsonl")
+    start_row = read_checkpoint(checkpoint, path)
+    if start_row:
+        print(f"Resuming after row {start_row}")
+
+    def on_batch(rows_processed: int) -> None:
+        if checkpoint:
+            write_checkpoint(checkpoint, path, rows_processed)
+        print(f"✓ {rows_processed} rows processed")
+
+    db = SessionLocal()
+    try:
+        admin = db.query(Admin).filter(Admin.email == admin_email).first()
+        if not admin:
+            raise ValueError(f"No admin with email {admin_email}")
+        with open(path, "rb") as f:
+            return import_listings(db, entity_type, f, fmt, admin, start_row=start_row, batch_size=batch_size, on_batch=on_batch)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import listings from a CSV or JSONL file.")
+    parser.add_argument("entity_type", choices=sorted(IMPORT_SCHEMAS), help="What the rows are")
+    parser.add_argument("path", help="CSV or JSONL file")
+    parser.add_argument("--admin-email", required=True, help="Admin who will own the imported listings")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE, help="Rows per transaction")
+    parser.add_argument("--checkpoint", help="File recording progress, to resume an interrupted import")
+    args = parser.parse_args()
+    try:
+        report = run_import(args.entity_type, args.path, args.admin_email, args.format, args.batch_size, args.checkpoint)
+        for error in report["errors"]:
+            print(f"❌ Row {error['row']}: {'; '.join(error['errors'])}")
+        if report["failed"] > len(report["errors"]):
+            print(f"... and {report['failed'] - len(report['errors'])} more failed row(s)")
+        print(f"\n✅ Import completed: {report['imported']} imported, {report['failed']} failed")
+    except Exception as e:
+        print(f"❌ Import failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Database initialization script.
+This script creates the MySQL database if it does not exist yet and applies
+the pending migrations (see migrate.py). The API does neither on startup, so
+run it once per deployment, before starting the workers.
+"""
+
+import sys
+from sqlalchemy.engine import make_url
+from database import DATABASE_URL
+from migrate import print_timings, upgrade, SLOW_STATEMENT_MS
+
+
+def create_database_if_not_exists() -> None:
+    """Create the MySQL database of DATABASE_URL if it doesn't exist."""
+    url = make_url(DATABASE_URL)
+    if url.get_backend_name() != "mysql":
+        return
+    import pymysql
+
+    database = url.database or "real_estate_db"
+    # Connect to the MySQL server without selecting the database
+    connection = pymysql.connect(
+        host=url.host or "localhost",
+        port=url.port or 3306,
+        user=url.username or "",
+        password=url.password or "",
+        charset="utf8mb4",
+    )
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{database}` CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
+    finally:
+        connection.close()
+    print(f"✓ Database '{database}' created or already exists")
+
+
+def init_database():
+    try:
+        print("Initializing the database...")
+        create_database_if_not_exists()
+        print_timings(upgrade(), SLOW_STATEMENT_MS)
+        print("\n✅ Database initialized successfully!")
+    except Exception as e:
+        print(f"❌ Database initialization failed: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    init_database()
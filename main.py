@@ -1,4 +1,5 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
+from fastapi.responses import Response
 from fastapi.staticfiles import StaticFiles
 import os
 import logging
@@ -8,31 +9,52 @@ from contextlib import asynccontextmanager
 # Import routers
 from routers import auth, apartments, admins, rental_contracts
 from routers import uploads as uploads_router
-from database import engine, Base
+from routers import imports as imports_router
+from routers import exports as exports_router
+from routers import stats as stats_router
+from database import get_engine, dispose_async_engine
+from dependencies import get_current_super_admin
+from crud.pagination import NEXT_CURSOR_HEADER
+from services.cache import response_cache
+from services.images import shutdown_image_workers
+from services.storage import get_storage
+from services.scheduler import start_scheduler, stop_scheduler
+from services.metrics import MetricsMiddleware, PROMETHEUS_CONTENT_TYPE, install_query_hooks, render_metrics
+from services.query_inspector import QueryInspectorMiddleware, inspector_enabled
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def create_tables():
-    """Create all database tables."""
+# Serve uploaded files only when using local storage
+storage_backend = os.getenv("STORAGE_BACKEND", "local").strip().lower()
+uploads_dir = os.getenv("UPLOADS_DIR", "uploads")
+
+
+def warm_up():
+    """Create the connection pool and the storage backend before the first request.
+
+    Startup makes no schema changes (run `python init_db.py` for that). A
+    database that is not reachable yet is only logged: the pool connects
+    again on the first request.
+    """
+    if storage_backend == "local":
+        os.makedirs(uploads_dir, exist_ok=True)
+    get_storage()
     try:
-        Base.metadata.create_all(bind=engine)
-        logger.info("Database tables created successfully")
+        with get_engine().connect():
+            pass
     except Exception as e:
-        logger.error(f"Error creating database tables: {e}")
-        raise
+        logger.warning(f"Database not reachable on startup: {e}")
 
-# Create database tables on startup
-create_tables()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting AO API server...")
     try:
-        # Ensure tables are created on every startup
-        create_tables()
+        warm_up()
+        start_scheduler()
         logger.info("Server started successfully")
     except Exception as e:
         logger.error(f"Failed to start server: {e}")
@@ -40,6 +62,9 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     logger.info("Shutting down server...")
+    stop_scheduler()
+    await dispose_async_engine()
+    shutdown_image_workers()
     logger.info("Server shutdown complete")
 
 app = FastAPI(
@@ -56,21 +81,30 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+# Per-route latency, status and database cost, served at /metrics
+install_query_hooks()
+app.add_middleware(MetricsMiddleware)
+
+# Development only: N+1 and slow query reports (QUERY_INSPECTOR in database.py)
+if inspector_enabled():
+    app.add_middleware(QueryInspectorMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(apartments.router, prefix="/api/v1")
 app.include_router(admins.router, prefix="/api/v1")
 app.include_router(rental_contracts.router, prefix="/api/v1")
 app.include_router(uploads_router.router, prefix="/api/v1")
+app.include_router(imports_router.router, prefix="/api/v1")
+app.include_router(exports_router.router, prefix="/api/v1")
+app.include_router(stats_router.router, prefix="/api/v1")
 
-# Serve uploaded files only when using local storage
-storage_backend = os.getenv("STORAGE_BACKEND", "local").strip().lower()
+# The directory is created on startup (warm_up)
 if storage_backend == "local":
-    uploads_dir = os.getenv("UPLOADS_DIR", "uploads")
-    os.makedirs(uploads_dir, exist_ok=True)
-    app.mount("/uploads", StaticFiles(directory=uploads_dir), name="uploads")
+    app.mount("/uploads", StaticFiles(directory=uploads_dir, check_dir=False), name="uploads")
 
 @app.get("/")
 async def root():
@@ -84,6 +118,16 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "real-estate-api"}
 
+@app.get("/cache/stats", dependencies=[Depends(get_current_super_admin)])
+async def cache_stats():
+    """Hit/miss counters of the public catalog response cache (super admin only)."""
+    return response_cache.stats()
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Request, database and connection pool metrics of this worker in Prometheus text format."""
+    return Response(content=render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Database migration script.
+
+Runs the Alembic migrations in migrations/versions against DATABASE_URL and
+reports how long each revision and its slowest statements took, so a schema
+change that would hold a lock on the listings tables for long shows up on a
+staging copy before it reaches production.
+
+    python migrate.py upgrade                  # to the latest revision
+    python migrate.py upgrade --sql            # print the SQL instead, for review
+    python migrate.py upgrade --report migration.json
+    python migrate.py revision -m "add parking spots to apartments" --autogenerate
+    python migrate.py current | history | check
+    python migrate.py downgrade 0001
+
+A database created before migrations existed (by the API on startup) is
+adopted on its first upgrade: when it has every table and column of the
+baseline revision it is stamped with it and upgraded from there, otherwise
+the missing ones are listed. The later revisions check what they change, so
+indexes, columns and search triggers it already has are kept and the ones it
+lacks are created.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import List
+
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.pool import NullPool
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BASELINE_REVISION = "0001"
+# Statements slower than this are listed after an upgrade
+SLOW_STATEMENT_MS = 1000
+MAX_REPORTED_STATEMENT = 200
+
+
+class MigrationTimer:
+    """Times each applied revision and each statement it runs (hooked up in migrations/env.py)."""
+
+    def __init__(self):
+        self.steps: List[dict] = []
+        self._statements: List[tuple] = []
+        self._mark = time.perf_counter()
+
+    def start(self) -> None:
+        self._mark = time.perf_counter()
+
+    def before_statement(self, conn, cursor, statement, parameters, context, executemany):
+        context.migration_started = time.perf_counter()
+
+    def after_statement(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "migration_started", None)
+        if started is not None:
+            self._statements.append(((time.perf_counter() - started) * 1000, " ".join(statement.split())))
+
+    def version_applied(self, ctx, step, heads, run_args):
+        now = time.perf_counter()
+        script = step.up_revision
+        slowest = sorted(self._statements, reverse=True)[:5]
+        self.steps.append({
+            "revision": script.revision,
+            "description": (script.doc or "").strip(),
+            "direction": "stamp" if step.is_stamp else "upgrade" if step.is_upgrade else "downgrade",
+            "ms": round((now - self._mark) * 1000, 1),
+            "statements": len(self._statements),
+            "slowest": [{"ms": round(ms, 1), "sql": sql[:MAX_REPORTED_STATEMENT]} for ms, sql in slowest],
+        })
+        self._statements = []
+        self._mark = now
+
+
+def alembic_config() -> Config:
+    return Config(os.path.join(ROOT, "alembic.ini"))
+
+
+def missing_baseline_schema(connection, config: Config) -> List[str]:
+    """Tables and columns of the baseline revision that the database lacks."""
+    baseline = ScriptDirectory.from_config(config).get_revision(BASELINE_REVISION).module
+    inspector = inspect(connection)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table, columns in baseline.BASELINE_COLUMNS.items():
+        if table not in existing_tables:
+            missing.append(table)
+            continue
+        present = {column["name"] for column in inspector.get_columns(table)}
+        missing.extend(f"{table}.{column}" for column in columns if column not in present)
+    return missing
+
+
+def adopt_existing_database(config: Config) -> None:
+    """Stamp a database created before migrations with the baseline revision, if it has its schema."""
+    from database import DATABASE_URL
+
+    engine = create_engine(DATABASE_URL, poolclass=NullPool)
+    try:
+        with engine.connect() as connection:
+            tables = set(inspect(connection).get_table_names())
+            if "alembic_version" in tables or "admins" not in tables:
+                return
+            missing = missing_baseline_schema(connection, config)
+    finally:
+        engine.dispose()
+    if missing:
+        raise RuntimeError(
+            "The database predates migrations and lacks: " + ", ".join(missing)
+            + ". It was not created by this application; add them by hand, then upgrade again."
+        )
+    command.stamp(config, BASELINE_REVISION)
+    print(f"✓ Existing database has the baseline schema; stamped revision {BASELINE_REVISION}")
+
+
+def upgrade(revision: str = "head", sql: bool = False) -> MigrationTimer:
+    """Upgrade the database to `revision`. Returns the timings of the applied revisions."""
+    config = alembic_config()
+    timer = MigrationTimer()
+    config.attributes["timer"] = timer
+    if sql:
+        command.upgrade(config, revision, sql=True)
+        return timer
+    adopt_existing_database(config)
+    command.upgrade(config, revision)
+    return timer
+
+
+def downgrade(revision: str) -> MigrationTimer:
+    config = alembic_config()
+    timer = MigrationTimer()
+    config.attributes["timer"] = timer
+    command.downgrade(config, revision)
+    return timer
+
+
+def next_revision_id(config: Config) -> str:
+    """'0003' after '0002': revisions are numbered in the order they were written."""
+    numbers = [int(script.revision) for script in ScriptDirectory.from_config(config).walk_revisions() if script.revision.isdigit()]
+    return f"{max(numbers, default=0) + 1:04d}"
+
+
+def print_timings(timer: MigrationTimer, slow_ms: float) -> None:
+    if not timer.steps:
+        print("✓ Already up to date")
+        return
+    for step in timer.steps:
+        print(f"✓ {step['direction']} {step['revision']} ({step['description']}): {step['ms']} ms, {step['statements']} statement(s)")
+    slow = [(statement, step) for step in timer.steps for statement in step["slowest"] if statement["ms"] >= slow_ms]
+    for statement, step in slow:
+        print(f"⚠ {statement['ms']} ms in {step['revision']}: {statement['sql']}")
+    total = sum(step["ms"] for step in timer.steps)
+    print(f"\nTotal: {total:.0f} ms")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1], formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="action", required=True)
+
+    upgrade_parser = subparsers.add_parser("upgrade", help="Apply migrations")
+    upgrade_parser.add_argument("revision", nargs="?", default="head")
+    upgrade_parser.add_argument("--sql", action="store_true", help="Print the SQL instead of running it")
+    upgrade_parser.add_argument("--report", default=None, help="Also write the timings to this JSON file")
+    upgrade_parser.add_argument("--slow-ms", type=float, default=SLOW_STATEMENT_MS, help="List statements slower than this")
+
+    downgrade_parser = subparsers.add_parser("downgrade", help="Revert migrations down to a revision")
+    downgrade_parser.add_argument("revision")
+    downgrade_parser.add_argument("--slow-ms", type=float, default=SLOW_STATEMENT_MS, help="List statements slower than this")
+
+    revision_parser = subparsers.add_parser("revision", help="Create a new revision file")
+    revision_parser.add_argument("-m", "--message", required=True)
+    revision_parser.add_argument("--autogenerate", action="store_true", help="Fill it from the differences between the models and the database")
+
+    subparsers.add_parser("current", help="Show the revision of the database")
+    subparsers.add_parser("history", help="List the revisions")
+    subparsers.add_parser("check", help="Fail if the models have changes that no revision covers")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    config = alembic_config()
+    try:
+        if args.action == "upgrade":
+            timer = upgrade(args.revision, sql=args.sql)
+            if args.sql:
+                return
+            print_timings(timer, args.slow_ms)
+            if args.report:
+                with open(args.report, "w") as f:
+                    json.dump(timer.steps, f, indent=2)
+        elif args.action == "downgrade":
+            print_timings(downgrade(args.revision), args.slow_ms)
+        elif args.action == "revision":
+            command.revision(config, message=args.message, autogenerate=args.autogenerate, rev_id=next_revision_id(config))
+        elif args.action == "current":
+            command.current(config)
+        elif args.action == "history":
+            command.history(config)
+        elif args.action == "check":
+            command.check(config)
+            print("✓ The models match the latest revision")
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Alembic environment: migrates the database of DATABASE_URL to the schema of the `models` package."""
+
+from alembic import context
+from decouple import config
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import NullPool
+
+from database import DATABASE_URL, Base
+import models  # noqa: F401 - registers every table on Base.metadata
+
+# Seconds a schema change waits for the metadata lock of a busy table before
+# giving up (MySQL). While it waits, every new query on that table queues
+# behind it, so a long wait stalls the listings as surely as a long ALTER.
+MIGRATION_LOCK_WAIT_SECONDS = config("MIGRATION_LOCK_WAIT_SECONDS", default=10, cast=int)
+
+# Kept in sync by triggers and created along with their tables; not compared by autogenerate
+MIRROR_TABLE_SUFFIXES = ("_fts", "_rtree")
+DIALECT_ONLY_INDEX_PREFIXES = ("ft_", "sp_")
+# Replaced by the photos table (revision 0008) but not dropped yet
+LEGACY_COLUMNS = ("photos_url", "photo_srcsets")
+
+target_metadata = Base.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    if type_ == "table" and name and any(suffix in name for suffix in MIRROR_TABLE_SUFFIXES):
+        return False
+    if type_ == "index" and name and name.startswith(DIALECT_ONLY_INDEX_PREFIXES):
+        return False
+    if type_ == "column" and name == "geo_point":
+        return False
+    if type_ == "column" and reflected and compare_to is None and name in LEGACY_COLUMNS:
+        return False
+    return True
+
+
+def run_migrations_offline():
+    """Print the SQL of the migrations instead of running them (`--sql`)."""
+    context.configure(
+        url=DATABASE_URL,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        transaction_per_migration=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    engine = create_engine(DATABASE_URL, poolclass=NullPool)
+    # Set by migrate.py to time each revision and statement
+    timer = context.config.attributes.get("timer")
+    with engine.connect() as connection:
+        if connection.dialect.name == "mysql":
+            connection.execute(text(f"SET SESSION lock_wait_timeout = {MIGRATION_LOCK_WAIT_SECONDS}"))
+            connection.commit()
+        if timer is not None:
+            event.listen(connection, "before_cursor_execute", timer.before_statement)
+            event.listen(connection, "after_cursor_execute", timer.after_statement)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+            render_as_batch=connection.dialect.name == "sqlite",
+            # Each revision commits on its own, so a failure keeps the revisions before it
+            transaction_per_migration=True,
+            on_version_apply=timer.version_applied if timer is not None else (),
+        )
+        if timer is not None:
+            timer.start()
+        with context.begin_transaction():
+            context.run_migrations()
+    engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
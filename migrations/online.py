@@ -0,0 +1,174 @@
+"""Schema changes that keep large tables readable and writable while they run.
+
+On MySQL every ALTER names its algorithm and lock level, so a change that
+InnoDB cannot do online fails right away instead of silently copying the
+table under a lock: INSTANT only touches the data dictionary, INPLACE with
+LOCK=NONE rebuilds or indexes the table while reads and writes continue.
+Data changes go in primary key batches, each committed on its own, so no
+single transaction holds row locks on the whole table.
+
+On SQLite (local development) the plain Alembic operations are used.
+
+Revisions look before they change anything (existing_columns,
+existing_indexes, has_table), so they also complete a database that was
+brought partly up to date before migrations existed. With --sql they cannot
+look, and print every statement.
+"""
+
+import time
+from typing import Callable, Dict, Optional, Sequence
+
+from alembic import op
+from sqlalchemy import Column, inspect, text
+from sqlalchemy.schema import CreateColumn
+
+INSTANT = "INSTANT"
+INPLACE = "INPLACE"
+
+
+def _is_mysql() -> bool:
+    return op.get_context().dialect.name == "mysql"
+
+
+def is_offline() -> bool:
+    """True with --sql, where statements are printed and the database cannot be read."""
+    return op.get_context().as_sql
+
+
+def _online_clause(algorithm: str, separator: str = ", ") -> str:
+    # INSTANT changes take no lock; naming one is an error there
+    return f"ALGORITHM={algorithm}" if algorithm == INSTANT else f"ALGORITHM={algorithm}{separator}LOCK=NONE"
+
+
+def add_column(table: str, column: Column, algorithm: str = INSTANT) -> None:
+    """Add `column` to `table` (MySQL: INSTANT by default; nullable, or with a default)."""
+    if not _is_mysql():
+        op.add_column(table, column)
+        return
+    definition = CreateColumn(column).compile(dialect=op.get_context().dialect)
+    op.execute(f"ALTER TABLE {table} ADD COLUMN {definition}, {_online_clause(algorithm)}")
+
+
+def drop_column(table: str, column: str, algorithm: str = INPLACE) -> None:
+    """Drop `column` from `table`. MySQL 8.0.29+ can also drop columns with algorithm=INSTANT."""
+    if not _is_mysql():
+        # SQLite 3.35+ drops it in place; a batch operation would copy the
+        # table and lose the triggers of its search mirrors
+        op.drop_column(table, column)
+        return
+    op.execute(f"ALTER TABLE {table} DROP COLUMN {column}, {_online_clause(algorithm)}")
+
+
+def create_index(name: str, table: str, columns: Sequence[str], unique: bool = False) -> None:
+    """Build an index while the table keeps taking writes (MySQL: INPLACE, LOCK=NONE)."""
+    if not _is_mysql():
+        op.create_index(name, table, list(columns), unique=unique)
+        return
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    op.execute(f"CREATE {kind} {name} ON {table} ({', '.join(columns)}) {_online_clause(INPLACE, ' ')}")
+
+
+def drop_index(name: str, table: str) -> None:
+    if not _is_mysql():
+        op.drop_index(name, table_name=table)
+        return
+    op.execute(f"DROP INDEX {name} ON {table} {_online_clause(INPLACE, ' ')}")
+
+
+def batched_update(
+    table: str,
+    assignments: str,
+    where: Optional[str] = None,
+    params: Optional[Dict] = None,
+    batch_size: int = 1000,
+    pause_seconds: float = 0.0,
+) -> None:
+    """UPDATE `table` SET `assignments` [WHERE `where`] in primary key ranges of `batch_size`.
+
+    Each batch commits on its own; `pause_seconds` between batches lets
+    replicas catch up. With --sql a single UPDATE is printed instead.
+    """
+    condition = f" AND ({where})" if where else ""
+    if is_offline():
+        op.execute(f"UPDATE {table} SET {assignments}" + (f" WHERE {where}" if where else ""))
+        return
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        low, high = connection.execute(text(f"SELECT MIN(id), MAX(id) FROM {table}")).one()
+        if low is None:
+            return
+        for start in range(low, high + 1, batch_size):
+            connection.execute(
+                text(f"UPDATE {table} SET {assignments} WHERE id >= :batch_start AND id < :batch_end{condition}"),
+                {**(params or {}), "batch_start": start, "batch_end": start + batch_size},
+            )
+            if pause_seconds:
+                time.sleep(pause_seconds)
+
+
+def backfill(
+    table: str,
+    columns: Sequence[str],
+    compute: Callable[..., Optional[Dict]],
+    where: Optional[str] = None,
+    batch_size: int = 1000,
+) -> int:
+    """Set values computed in Python on the rows of `table`, in primary key batches.
+
+    `compute` gets each row (its id and `columns`) and returns the values to
+    set on it, or None to leave it alone. Each batch commits on its own.
+    With --sql only a comment is printed, since the values depend on the
+    rows. Returns how many rows were updated.
+    """
+    if is_offline():
+        op.get_context().impl.static_output(f"-- {table}: values computed from {', '.join(columns)} are filled in online only")
+        return 0
+    condition = f" AND ({where})" if where else ""
+    updated = 0
+    last_id = 0
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        while True:
+            rows = connection.execute(
+                text(f"SELECT id, {', '.join(columns)} FROM {table} WHERE id > :last_id{condition} ORDER BY id LIMIT {batch_size}"),
+                {"last_id": last_id},
+            ).all()
+            if not rows:
+                return updated
+            last_id = rows[-1].id
+            updates = []
+            for row in rows:
+                values = compute(row)
+                if values:
+                    updates.append({**values, "id": row.id})
+            if updates:
+                assignments = ", ".join(f"{name} = :{name}" for name in updates[0] if name != "id")
+                connection.execute(text(f"UPDATE {table} SET {assignments} WHERE id = :id"), updates)
+                updated += len(updates)
+
+
+def existing_columns(table: str) -> set:
+    """Column names of `table` in the database (empty with --sql, which cannot look)."""
+    if is_offline():
+        return set()
+    inspector = inspect(op.get_bind())
+    if not inspector.has_table(table):
+        return set()
+    return {column["name"] for column in inspector.get_columns(table)}
+
+
+def existing_indexes(table: str) -> set:
+    """Index names of `table` in the database (empty with --sql)."""
+    if is_offline():
+        return set()
+    inspector = inspect(op.get_bind())
+    if not inspector.has_table(table):
+        return set()
+    return {index["name"] for index in inspector.get_indexes(table)}
+
+
+def has_table(table: str) -> bool:
+    """Whether `table` exists (False with --sql). Also sees SQLite virtual tables."""
+    if is_offline():
+        return False
+    return inspect(op.get_bind()).has_table(table)
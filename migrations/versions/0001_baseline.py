@@ -0,0 +1,177 @@
+"""Baseline: the schema of the models before the query indexes, search, photos and coordinates
+
+The tables as the API created them on startup before any of the later
+revisions' changes, so a database of that time can be stamped with this
+revision and upgraded (see migrate.py).
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 05:00:13.171149
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# What a database needs to be stamped with this revision (migrate.py). Each
+# later revision checks what it changes, so the database may also have some
+# of their tables, columns and indexes already. photos_url is not required:
+# databases created after the photos table was introduced never had it.
+BASELINE_COLUMNS = {
+    "admins": ("id", "full_name", "email", "phone", "role", "password", "created_at", "updated_at"),
+    "apartment_rents": (
+        "id", "name", "location", "address", "area", "number", "price", "bedrooms", "bathrooms",
+        "description", "contact_number", "location_on_map", "facilities_amenities", "floor", "total_parts",
+        "listed_by_admin_id", "created_at", "updated_at",
+    ),
+    "apartment_sales": (
+        "id", "name", "location", "address", "area", "number", "price", "bedrooms", "bathrooms",
+        "description", "contact_number", "location_on_map", "facilities_amenities",
+        "listed_by_admin_id", "created_at", "updated_at",
+    ),
+    "apartment_parts": (
+        "id", "apartment_id", "status", "title", "area", "floor", "monthly_price", "bedrooms", "bathrooms",
+        "furnished", "balcony", "description", "created_by_admin_id", "created_at", "updated_at",
+    ),
+    "rental_contracts": (
+        "id", "apartment_part_id", "customer_name", "customer_phone", "customer_id_number",
+        "how_did_customer_find_us", "paid_deposit", "warrant_amount", "rent_start_date", "rent_end_date",
+        "rent_period", "contract_url", "customer_id_url", "commission", "rent_price", "is_active",
+        "created_by_admin_id", "created_at", "updated_at",
+    ),
+}
+
+
+def upgrade() -> None:
+    op.create_table('admins',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('full_name', sa.String(length=100), nullable=False),
+    sa.Column('email', sa.String(length=100), nullable=False),
+    sa.Column('phone', sa.String(length=20), nullable=False),
+    sa.Column('role', sa.Enum('super_admin', 'studio_rental', 'apartment_sale', name='adminroleenum'), nullable=False),
+    sa.Column('password', sa.String(length=255), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('email'),
+    sa.UniqueConstraint('phone')
+    )
+    op.create_index(op.f('ix_admins_id'), 'admins', ['id'], unique=False)
+
+    op.create_table('apartment_rents',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('location', sa.String(length=255), nullable=False),
+    sa.Column('address', sa.String(length=500), nullable=False),
+    sa.Column('area', sa.Numeric(precision=8, scale=2), nullable=False),
+    sa.Column('number', sa.String(length=50), nullable=False),
+    sa.Column('price', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('bedrooms', sa.Integer(), nullable=False),
+    sa.Column('bathrooms', sa.Enum('shared', 'private', name='bathroomtypeenum'), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('contact_number', sa.String(length=20), nullable=False),
+    sa.Column('photos_url', sa.Text(), nullable=True),
+    sa.Column('location_on_map', sa.String(length=500), nullable=True),
+    sa.Column('facilities_amenities', sa.Text(), nullable=True),
+    sa.Column('floor', sa.Integer(), nullable=False),
+    sa.Column('total_parts', sa.Integer(), nullable=False),
+    sa.Column('listed_by_admin_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['listed_by_admin_id'], ['admins.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_apartment_rents_id'), 'apartment_rents', ['id'], unique=False)
+
+    op.create_table('apartment_sales',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('location', sa.String(length=255), nullable=False),
+    sa.Column('address', sa.String(length=500), nullable=False),
+    sa.Column('area', sa.Numeric(precision=8, scale=2), nullable=False),
+    sa.Column('number', sa.String(length=50), nullable=False),
+    sa.Column('price', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('bedrooms', sa.Integer(), nullable=False),
+    sa.Column('bathrooms', sa.Enum('shared', 'private', name='bathroomtypeenum'), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('contact_number', sa.String(length=20), nullable=False),
+    sa.Column('photos_url', sa.Text(), nullable=True),
+    sa.Column('location_on_map', sa.String(length=500), nullable=True),
+    sa.Column('facilities_amenities', sa.Text(), nullable=True),
+    sa.Column('listed_by_admin_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['listed_by_admin_id'], ['admins.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_apartment_sales_id'), 'apartment_sales', ['id'], unique=False)
+
+    op.create_table('apartment_parts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('apartment_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Enum('available', 'rented', 'upcoming_end', name='partstatusenum'), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('area', sa.Numeric(precision=8, scale=2), nullable=False),
+    sa.Column('floor', sa.Integer(), nullable=False),
+    sa.Column('monthly_price', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('bedrooms', sa.Integer(), nullable=False),
+    sa.Column('bathrooms', sa.Enum('shared', 'private', name='bathroomtypeenum'), nullable=False),
+    sa.Column('furnished', sa.Enum('yes', 'no', name='furnishedenum'), nullable=False),
+    sa.Column('balcony', sa.Enum('yes', 'shared', 'no', name='balconyenum'), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('photos_url', sa.Text(), nullable=True),
+    sa.Column('created_by_admin_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['apartment_id'], ['apartment_rents.id'], ),
+    sa.ForeignKeyConstraint(['created_by_admin_id'], ['admins.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_apartment_parts_id'), 'apartment_parts', ['id'], unique=False)
+
+    op.create_table('rental_contracts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('apartment_part_id', sa.Integer(), nullable=False),
+    sa.Column('customer_name', sa.String(length=100), nullable=False),
+    sa.Column('customer_phone', sa.String(length=20), nullable=False),
+    sa.Column('customer_id_number', sa.String(length=50), nullable=False),
+    sa.Column('how_did_customer_find_us', sa.Enum('facebook', 'instagram', 'google', 'Bayut', 'Aqar map', 'Dubizzle', 'referral', 'walk_in', 'other', name='customersourceenum'), nullable=False),
+    sa.Column('paid_deposit', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('warrant_amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('rent_start_date', sa.Date(), nullable=False),
+    sa.Column('rent_end_date', sa.Date(), nullable=False),
+    sa.Column('rent_period', sa.Integer(), nullable=False),
+    sa.Column('contract_url', sa.String(length=500), nullable=True),
+    sa.Column('customer_id_url', sa.String(length=500), nullable=True),
+    sa.Column('commission', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('rent_price', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_by_admin_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['apartment_part_id'], ['apartment_parts.id'], ),
+    sa.ForeignKeyConstraint(['created_by_admin_id'], ['admins.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('apartment_part_id')
+    )
+    op.create_index(op.f('ix_rental_contracts_id'), 'rental_contracts', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_rental_contracts_id'), table_name='rental_contracts')
+    op.drop_table('rental_contracts')
+    op.drop_index(op.f('ix_apartment_parts_id'), table_name='apartment_parts')
+    op.drop_table('apartment_parts')
+    op.drop_index(op.f('ix_apartment_sales_id'), table_name='apartment_sales')
+    op.drop_table('apartment_sales')
+    op.drop_index(op.f('ix_apartment_rents_id'), table_name='apartment_rents')
+    op.drop_table('apartment_rents')
+    op.drop_index(op.f('ix_admins_id'), table_name='admins')
+    op.drop_table('admins')
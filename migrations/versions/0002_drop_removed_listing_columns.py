@@ -0,0 +1,39 @@
+"""Drop the listing columns removed from the models before migrations existed
+
+Replaces migrate_new_fields.py. Databases created from the models never had
+these columns; older ones may still have some of them, so each is dropped
+only where it exists, online (INPLACE, LOCK=NONE on MySQL).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 05:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from migrations.online import drop_column, existing_columns
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+REMOVED_COLUMNS = {
+    "apartment_sales": ("floor", "total_parts"),
+    "apartment_parts": ("studio_number", "rent_value"),
+    "rental_contracts": ("studio_number",),
+}
+
+
+def upgrade() -> None:
+    for table, columns in REMOVED_COLUMNS.items():
+        present = existing_columns(table)
+        for column in columns:
+            if column in present:
+                drop_column(table, column)
+
+
+def downgrade() -> None:
+    # The columns held nothing the application reads; they are not restored
+    pass
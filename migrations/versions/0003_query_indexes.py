@@ -0,0 +1,43 @@
+"""Secondary indexes of the hot list, filter and join queries
+
+Replaces migrate_add_indexes.py. Each index is built online (INPLACE,
+LOCK=NONE on MySQL) unless the database already has it; tests/test_query_plans.py
+checks that the CRUD queries use them.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 05:21:00.000000
+
+"""
+from typing import Sequence, Union
+
+from migrations.online import create_index, drop_index, existing_indexes
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_admins_role", "admins", ("role",)),
+    ("ix_apartment_parts_apartment_id_status", "apartment_parts", ("apartment_id", "status")),
+    ("ix_apartment_parts_status_monthly_price", "apartment_parts", ("status", "monthly_price")),
+    ("ix_apartment_parts_bedrooms_monthly_price", "apartment_parts", ("bedrooms", "monthly_price")),
+    ("ix_apartment_parts_floor_monthly_price", "apartment_parts", ("floor", "monthly_price")),
+    ("ix_apartment_rents_listed_by_admin_id", "apartment_rents", ("listed_by_admin_id",)),
+    ("ix_apartment_sales_listed_by_admin_id", "apartment_sales", ("listed_by_admin_id",)),
+    ("ix_rental_contracts_is_active_rent_end_date", "rental_contracts", ("is_active", "rent_end_date")),
+    ("ix_rental_contracts_part_dates", "rental_contracts", ("apartment_part_id", "rent_start_date", "rent_end_date")),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        if name not in existing_indexes(table):
+            create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        drop_index(name, table)
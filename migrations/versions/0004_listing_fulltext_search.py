@@ -0,0 +1,72 @@
+"""Full-text search over the rent and sale listings
+
+A FULLTEXT index on MySQL; on SQLite an external-content FTS5 table kept in
+sync by triggers, filled from the existing rows. The statements are those of
+models/fulltext.py at this revision, copied so later changes to that module
+need a revision of their own.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 05:22:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from migrations.online import existing_indexes, has_table
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("apartment_rents", "apartment_sales")
+
+# InnoDB cannot build a FULLTEXT index with LOCK=NONE: writes to the table
+# wait while it is built (reads continue), so run this one off-peak
+MYSQL_STATEMENTS = {
+    'apartment_rents': 'CREATE FULLTEXT INDEX ft_apartment_rents_text ON apartment_rents (name, location, address, description, facilities_amenities)',
+    'apartment_sales': 'CREATE FULLTEXT INDEX ft_apartment_sales_text ON apartment_sales (name, location, address, description, facilities_amenities)',
+}
+SQLITE_STATEMENTS = {
+    'apartment_rents': [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS apartment_rents_fts USING fts5(name, location, address, description, facilities_amenities, content='apartment_rents', content_rowid='id')",
+        'CREATE TRIGGER IF NOT EXISTS apartment_rents_fts_ai AFTER INSERT ON apartment_rents BEGIN INSERT INTO apartment_rents_fts(rowid, name, location, address, description, facilities_amenities) VALUES (new.id, new.name, new.location, new.address, new.description, new.facilities_amenities); END',
+        "CREATE TRIGGER IF NOT EXISTS apartment_rents_fts_ad AFTER DELETE ON apartment_rents BEGIN INSERT INTO apartment_rents_fts(apartment_rents_fts, rowid, name, location, address, description, facilities_amenities) VALUES ('delete', old.id, old.name, old.location, old.address, old.description, old.facilities_amenities); END",
+        "CREATE TRIGGER IF NOT EXISTS apartment_rents_fts_au AFTER UPDATE ON apartment_rents BEGIN INSERT INTO apartment_rents_fts(apartment_rents_fts, rowid, name, location, address, description, facilities_amenities) VALUES ('delete', old.id, old.name, old.location, old.address, old.description, old.facilities_amenities); INSERT INTO apartment_rents_fts(rowid, name, location, address, description, facilities_amenities) VALUES (new.id, new.name, new.location, new.address, new.description, new.facilities_amenities); END",
+    ],
+    'apartment_sales': [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS apartment_sales_fts USING fts5(name, location, address, description, facilities_amenities, content='apartment_sales', content_rowid='id')",
+        'CREATE TRIGGER IF NOT EXISTS apartment_sales_fts_ai AFTER INSERT ON apartment_sales BEGIN INSERT INTO apartment_sales_fts(rowid, name, location, address, description, facilities_amenities) VALUES (new.id, new.name, new.location, new.address, new.description, new.facilities_amenities); END',
+        "CREATE TRIGGER IF NOT EXISTS apartment_sales_fts_ad AFTER DELETE ON apartment_sales BEGIN INSERT INTO apartment_sales_fts(apartment_sales_fts, rowid, name, location, address, description, facilities_amenities) VALUES ('delete', old.id, old.name, old.location, old.address, old.description, old.facilities_amenities); END",
+        "CREATE TRIGGER IF NOT EXISTS apartment_sales_fts_au AFTER UPDATE ON apartment_sales BEGIN INSERT INTO apartment_sales_fts(apartment_sales_fts, rowid, name, location, address, description, facilities_amenities) VALUES ('delete', old.id, old.name, old.location, old.address, old.description, old.facilities_amenities); INSERT INTO apartment_sales_fts(rowid, name, location, address, description, facilities_amenities) VALUES (new.id, new.name, new.location, new.address, new.description, new.facilities_amenities); END",
+    ],
+}
+
+
+def upgrade() -> None:
+    dialect = op.get_context().dialect.name
+    for table in TABLES:
+        if dialect == "mysql":
+            if f"ft_{table}_text" not in existing_indexes(table):
+                op.execute(MYSQL_STATEMENTS[table])
+        elif dialect == "sqlite":
+            # The triggers are created even when the FTS table exists, in case they were lost
+            created = not has_table(f"{table}_fts")
+            for statement in SQLITE_STATEMENTS[table]:
+                op.execute(statement)
+            if created:
+                op.execute(f"INSERT INTO {table}_fts({table}_fts) VALUES('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_context().dialect.name
+    for table in reversed(TABLES):
+        if dialect == "mysql":
+            op.execute(f"DROP INDEX ft_{table}_text ON {table}")
+        elif dialect == "sqlite":
+            for trigger in ("ai", "ad", "au"):
+                op.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{trigger}")
+            op.execute(f"DROP TABLE IF EXISTS {table}_fts")
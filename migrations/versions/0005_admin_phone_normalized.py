@@ -0,0 +1,41 @@
+"""Normalized admin phone numbers for login by phone
+
+Replaces migrate_admin_phone_normalized.py: adds admins.phone_normalized
+(INSTANT on MySQL), fills it from admins.phone with models.admin.normalize_phone
+and indexes it.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 05:23:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from migrations.online import add_column, backfill, create_index, drop_column, drop_index, existing_columns, existing_indexes
+from models.admin import normalize_phone
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _normalized(row):
+    value = normalize_phone(row.phone)
+    return {"phone_normalized": value} if value != row.phone_normalized else None
+
+
+def upgrade() -> None:
+    if "phone_normalized" not in existing_columns("admins"):
+        add_column("admins", sa.Column("phone_normalized", sa.String(length=20), nullable=True))
+    backfill("admins", ("phone", "phone_normalized"), _normalized)
+    if "ix_admins_phone_normalized" not in existing_indexes("admins"):
+        create_index("ix_admins_phone_normalized", "admins", ("phone_normalized",))
+
+
+def downgrade() -> None:
+    drop_index("ix_admins_phone_normalized", "admins")
+    drop_column("admins", "phone_normalized")
@@ -0,0 +1,35 @@
+"""Resized photo variants of the listings
+
+Replaces migrate_photo_srcsets.py: adds photo_srcsets (variants per photo
+URL, as JSON) to the apartment and studio tables. Revision 0008 moves them
+into the photos table, after which the column is no longer used.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 05:24:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from migrations.online import add_column, drop_column, existing_columns
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("apartment_rents", "apartment_sales", "apartment_parts")
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        if "photo_srcsets" not in existing_columns(table):
+            add_column(table, sa.Column("photo_srcsets", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        drop_column(table, "photo_srcsets")
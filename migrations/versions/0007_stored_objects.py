@@ -0,0 +1,47 @@
+"""Reference-counted uploaded files
+
+One row per distinct stored file, so identical uploads share a blob and
+gc_storage.py can delete the ones nothing uses any more.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 05:25:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.online import has_table
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, Sequence[str], None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if has_table('stored_objects'):
+        return
+    op.create_table('stored_objects',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('key', sa.String(length=255), nullable=False),
+    sa.Column('url', sa.String(length=500), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('variants', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('key'),
+    sa.UniqueConstraint('url')
+    )
+    op.create_index(op.f('ix_stored_objects_id'), 'stored_objects', ['id'], unique=False)
+    op.create_index('ix_stored_objects_ref_count_updated_at', 'stored_objects', ['ref_count', 'updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stored_objects_ref_count_updated_at', table_name='stored_objects')
+    op.drop_index(op.f('ix_stored_objects_id'), table_name='stored_objects')
+    op.drop_table('stored_objects')
@@ -0,0 +1,151 @@
+"""Photos in their own table
+
+Replaces migrate_photos_table.py: creates the photos table and copies each
+apartment's and studio's photos_url JSON list (with its photo_srcsets
+variants) into it, one row per photo in the original order. Entities that
+already have photos rows are skipped.
+
+The photos_url and photo_srcsets columns are left in place but no longer
+read or written (migrations/env.py ignores them); drop them in a later
+revision once the copy has been checked.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 05:26:00.000000
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.online import existing_columns, has_table, is_offline
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, Sequence[str], None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Legacy table -> entity_type used in the photos table
+TABLES = {
+    "apartment_rents": "rent",
+    "apartment_sales": "sale",
+    "apartment_parts": "part",
+}
+BATCH_SIZE = 500
+
+photos = sa.table(
+    'photos',
+    sa.column('entity_type', sa.String),
+    sa.column('entity_id', sa.Integer),
+    sa.column('position', sa.Integer),
+    sa.column('key', sa.String),
+    sa.column('url', sa.String),
+    sa.column('variants', sa.Text),
+)
+stored_objects = sa.table('stored_objects', sa.column('key', sa.String), sa.column('url', sa.String))
+
+
+def _load_list(value):
+    if not value:
+        return []
+    try:
+        parsed = json.loads(value)
+    except json.JSONDecodeError:
+        return [value]
+    if isinstance(parsed, str):
+        return [parsed]
+    return [str(url) for url in parsed if url] if isinstance(parsed, list) else []
+
+
+def _load_dict(value):
+    if not value:
+        return {}
+    try:
+        parsed = json.loads(value)
+    except json.JSONDecodeError:
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+def _copy_photos(connection, table: str, entity_type: str, keys: dict) -> int:
+    """Copy the photos of `table` in id batches, each committed on its own. Returns how many were copied."""
+    srcsets_column = "photo_srcsets" if "photo_srcsets" in existing_columns(table) else "NULL"
+    copied = 0
+    last_id = 0
+    while True:
+        rows = connection.execute(sa.text(
+            f"SELECT id, photos_url, {srcsets_column} FROM {table} "
+            f"WHERE id > :last_id AND photos_url IS NOT NULL ORDER BY id LIMIT {BATCH_SIZE}"
+        ), {"last_id": last_id}).all()
+        if not rows:
+            return copied
+        last_id = rows[-1][0]
+        migrated = {
+            entity_id for (entity_id,) in connection.execute(
+                sa.select(photos.c.entity_id).distinct().where(
+                    photos.c.entity_type == entity_type,
+                    photos.c.entity_id.in_([row[0] for row in rows]),
+                )
+            )
+        }
+        values = []
+        for entity_id, photos_url, photo_srcsets in rows:
+            if entity_id in migrated:
+                continue
+            srcsets = _load_dict(photo_srcsets)
+            seen = set()
+            for url in _load_list(photos_url):
+                if url in seen:
+                    continue
+                seen.add(url)
+                values.append({
+                    "entity_type": entity_type,
+                    "entity_id": entity_id,
+                    "position": len(seen) - 1,
+                    "key": keys.get(url),
+                    "url": url,
+                    "variants": json.dumps(srcsets[url]) if url in srcsets else None,
+                })
+        # Stored-object reference counts already include these URLs, so they are not retained again
+        if values:
+            connection.execute(photos.insert(), values)
+            copied += len(values)
+
+
+def upgrade() -> None:
+    if not has_table('photos'):
+        op.create_table('photos',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('entity_type', sa.String(length=20), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('key', sa.String(length=255), nullable=True),
+        sa.Column('url', sa.String(length=500), nullable=False),
+        sa.Column('content_type', sa.String(length=100), nullable=True),
+        sa.Column('size_bytes', sa.BigInteger(), nullable=True),
+        sa.Column('variants', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('entity_type', 'entity_id', 'url', name='uq_photos_entity_url')
+        )
+        op.create_index('ix_photos_entity_position', 'photos', ['entity_type', 'entity_id', 'position'], unique=False)
+        op.create_index(op.f('ix_photos_id'), 'photos', ['id'], unique=False)
+
+    if is_offline():
+        op.get_context().impl.static_output("-- photos: copied from photos_url/photo_srcsets online only")
+        return
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        keys = {url: key for key, url in connection.execute(sa.select(stored_objects.c.key, stored_objects.c.url))}
+        for table, entity_type in TABLES.items():
+            if "photos_url" in existing_columns(table):
+                _copy_photos(connection, table, entity_type, keys)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_photos_id'), table_name='photos')
+    op.drop_index('ix_photos_entity_position', table_name='photos')
+    op.drop_table('photos')
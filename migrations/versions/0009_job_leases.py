@@ -0,0 +1,39 @@
+"""Leases of the scheduled jobs
+
+One row per job; the worker holding an unexpired lease is the only one that
+runs it (see services/scheduler.py).
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 05:27:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.online import has_table
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, Sequence[str], None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if has_table('job_leases'):
+        return
+    op.create_table('job_leases',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('owner', sa.String(length=255), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('last_run_at', sa.DateTime(), nullable=True),
+    sa.Column('last_duration_ms', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('job_leases')
@@ -0,0 +1,98 @@
+"""Map coordinates of the rent and sale apartments
+
+Replaces migrate_geo_columns.py: adds latitude/longitude (INSTANT on MySQL)
+with their index and the spatial index of map search, then fills them from
+each apartment's location_on_map link with services.geo.parse_map_link.
+Apartments whose link has no coordinates (e.g. short links) keep empty ones
+until they are set through the update endpoints.
+
+The spatial statements are those of models/geo.py at this revision, copied
+so later changes to that module need a revision of their own.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 05:28:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.online import add_column, backfill, create_index, drop_column, drop_index, existing_columns, existing_indexes, has_table
+from services.geo import parse_map_link
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, Sequence[str], None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("apartment_rents", "apartment_sales")
+
+# A STORED generated column cannot be added in place: MySQL copies the table
+# and blocks writes to it meanwhile, so run this one off-peak
+MYSQL_STATEMENTS = {
+    'apartment_rents': 'ALTER TABLE apartment_rents ADD COLUMN geo_point POINT SRID 0 AS (POINT(IFNULL(longitude, 0), IFNULL(latitude, 0))) STORED NOT NULL, ADD SPATIAL INDEX sp_apartment_rents_geo_point (geo_point)',
+    'apartment_sales': 'ALTER TABLE apartment_sales ADD COLUMN geo_point POINT SRID 0 AS (POINT(IFNULL(longitude, 0), IFNULL(latitude, 0))) STORED NOT NULL, ADD SPATIAL INDEX sp_apartment_sales_geo_point (geo_point)',
+}
+SQLITE_STATEMENTS = {
+    'apartment_rents': [
+        'CREATE VIRTUAL TABLE IF NOT EXISTS apartment_rents_rtree USING rtree(id, min_lat, max_lat, min_lng, max_lng)',
+        'CREATE TRIGGER IF NOT EXISTS apartment_rents_rtree_ai AFTER INSERT ON apartment_rents BEGIN INSERT INTO apartment_rents_rtree(id, min_lat, max_lat, min_lng, max_lng) SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL; END',
+        'CREATE TRIGGER IF NOT EXISTS apartment_rents_rtree_ad AFTER DELETE ON apartment_rents BEGIN DELETE FROM apartment_rents_rtree WHERE id = old.id; END',
+        'CREATE TRIGGER IF NOT EXISTS apartment_rents_rtree_au AFTER UPDATE OF latitude, longitude ON apartment_rents BEGIN DELETE FROM apartment_rents_rtree WHERE id = old.id; INSERT INTO apartment_rents_rtree(id, min_lat, max_lat, min_lng, max_lng) SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL; END',
+    ],
+    'apartment_sales': [
+        'CREATE VIRTUAL TABLE IF NOT EXISTS apartment_sales_rtree USING rtree(id, min_lat, max_lat, min_lng, max_lng)',
+        'CREATE TRIGGER IF NOT EXISTS apartment_sales_rtree_ai AFTER INSERT ON apartment_sales BEGIN INSERT INTO apartment_sales_rtree(id, min_lat, max_lat, min_lng, max_lng) SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL; END',
+        'CREATE TRIGGER IF NOT EXISTS apartment_sales_rtree_ad AFTER DELETE ON apartment_sales BEGIN DELETE FROM apartment_sales_rtree WHERE id = old.id; END',
+        'CREATE TRIGGER IF NOT EXISTS apartment_sales_rtree_au AFTER UPDATE OF latitude, longitude ON apartment_sales BEGIN DELETE FROM apartment_sales_rtree WHERE id = old.id; INSERT INTO apartment_sales_rtree(id, min_lat, max_lat, min_lng, max_lng) SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL; END',
+    ],
+}
+
+
+def _coordinates(row):
+    coordinates = parse_map_link(row.location_on_map)
+    return {"latitude": coordinates[0], "longitude": coordinates[1]} if coordinates else None
+
+
+def upgrade() -> None:
+    dialect = op.get_context().dialect.name
+    for table in TABLES:
+        columns = existing_columns(table)
+        if "latitude" not in columns:
+            add_column(table, sa.Column("latitude", sa.Float(), nullable=True))
+            add_column(table, sa.Column("longitude", sa.Float(), nullable=True))
+        if f"ix_{table}_latitude_longitude" not in existing_indexes(table):
+            create_index(f"ix_{table}_latitude_longitude", table, ("latitude", "longitude"))
+        if dialect == "mysql" and "geo_point" not in columns:
+            op.execute(MYSQL_STATEMENTS[table])
+        elif dialect == "sqlite":
+            # The triggers are created even when the R*Tree table exists, in case they were lost
+            created = not has_table(f"{table}_rtree")
+            for statement in SQLITE_STATEMENTS[table]:
+                op.execute(statement)
+            if created:
+                op.execute(
+                    f"INSERT INTO {table}_rtree(id, min_lat, max_lat, min_lng, max_lng) "
+                    f"SELECT id, latitude, latitude, longitude, longitude FROM {table} "
+                    f"WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+                )
+    # Filled after the spatial indexes, so their triggers index the new coordinates
+    for table in TABLES:
+        backfill(table, ("location_on_map",), _coordinates, where="latitude IS NULL AND location_on_map IS NOT NULL", batch_size=500)
+
+
+def downgrade() -> None:
+    dialect = op.get_context().dialect.name
+    for table in reversed(TABLES):
+        if dialect == "mysql":
+            op.execute(f"ALTER TABLE {table} DROP INDEX sp_{table}_geo_point, DROP COLUMN geo_point")
+        elif dialect == "sqlite":
+            for trigger in ("ai", "ad", "au"):
+                op.execute(f"DROP TRIGGER IF EXISTS {table}_rtree_{trigger}")
+            op.execute(f"DROP TABLE IF EXISTS {table}_rtree")
+        drop_index(f"ix_{table}_latitude_longitude", table)
+        drop_column(table, "longitude")
+        drop_column(table, "latitude")
@@ -0,0 +1,69 @@
+"""One admin per normalized phone number
+
+Makes ix_admins_phone_normalized unique, so two admins cannot register the
+same number written differently (login by phone would pick either). Admins
+that already share a number are listed and the upgrade stops; change the
+phone of all but one of them, then upgrade again.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 05:29:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.online import create_index, drop_index, is_offline
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, Sequence[str], None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLLISIONS = (
+    "SELECT phone_normalized, COUNT(*) FROM admins WHERE phone_normalized IS NOT NULL "
+    "GROUP BY phone_normalized HAVING COUNT(*) > 1"
+)
+
+
+def _report_collisions() -> None:
+    if is_offline():
+        op.get_context().impl.static_output(f"-- The unique index fails if this lists any numbers: {COLLISIONS};")
+        return
+    connection = op.get_bind()
+    collisions = []
+    for phone, _ in connection.execute(sa.text(COLLISIONS)):
+        ids = connection.execute(
+            sa.text("SELECT id FROM admins WHERE phone_normalized = :phone ORDER BY id"), {"phone": phone}
+        ).scalars().all()
+        collisions.append(f"{phone} (admins {', '.join(str(admin_id) for admin_id in ids)})")
+    if collisions:
+        raise RuntimeError(
+            "Admins share a phone number: " + "; ".join(collisions)
+            + ". Change the phone of all but one admin of each number, then upgrade again."
+        )
+
+
+def _phone_index_is_unique() -> bool:
+    if is_offline():
+        return False
+    for index in sa.inspect(op.get_bind()).get_indexes("admins"):
+        if index["name"] == "ix_admins_phone_normalized":
+            return bool(index["unique"])
+    return False
+
+
+def upgrade() -> None:
+    if _phone_index_is_unique():
+        return
+    _report_collisions()
+    drop_index("ix_admins_phone_normalized", "admins")
+    create_index("ix_admins_phone_normalized", "admins", ("phone_normalized",), unique=True)
+
+
+def downgrade() -> None:
+    drop_index("ix_admins_phone_normalized", "admins")
+    create_index("ix_admins_phone_normalized", "admins", ("phone_normalized",))
@@ -1,7 +1,10 @@
 from .enums import PartStatusEnum, AdminRoleEnum
 
 from .admin import Admin
+from .photo import Photo
 from .apartment_sale import ApartmentSale
 from .apartment_rent import ApartmentRent
 from .apartment_part import ApartmentPart
 from .rental_contract import RentalContract
+from .stored_object import StoredObject
+from .job_lease import JobLease
@@ -1,18 +1,32 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, DateTime, Enum, Index
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 
 from database import Base
 from .enums import AdminRoleEnum
 
 
+def normalize_phone(phone: str) -> str:
+    """Reduce a phone number to its digits, keeping a leading '+'."""
+    phone = phone.strip()
+    digits = "".join(c for c in phone if c.isdigit())
+    return f"+{digits}" if phone.startswith("+") else digits
+
+
 class Admin(Base):
     __tablename__ = "admins"
+    __table_args__ = (
+        # Super admin lookups (WhatsApp contact, master admin setup)
+        Index("ix_admins_role", "role"),
+        # Login by phone regardless of spaces, dashes or brackets; one admin per number however it is written
+        Index("ix_admins_phone_normalized", "phone_normalized", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     full_name = Column(String(100), nullable=False)
     email = Column(String(100), unique=True, nullable=False)  # Required for all admins
     phone = Column(String(20), unique=True, nullable=False)  # Required for all admins
+    phone_normalized = Column(String(20), nullable=True)  # Kept in sync with phone, see normalize_phone
     role = Column(Enum(AdminRoleEnum), nullable=False)  # No default, must be specified
     password = Column(String(255), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -21,4 +35,9 @@ class Admin(Base):
     # Relationships
     created_apartment_parts = relationship("ApartmentPart", back_populates="created_by_admin")
 
+    @validates("phone")
+    def _sync_phone_normalized(self, key, phone):
+        self.phone_normalized = normalize_phone(phone) if phone is not None else None
+        return phone
+
 
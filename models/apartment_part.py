@@ -1,14 +1,23 @@
-from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Enum, Text
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Enum, Text, Index
 from sqlalchemy.types import Numeric
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from database import Base
+from .photo import PhotoListMixin, photos_relationship
 from .enums import PartStatusEnum, BathroomTypeEnum, FurnishedEnum, BalconyEnum
 
 
-class ApartmentPart(Base):
+class ApartmentPart(PhotoListMixin, Base):
     __tablename__ = "apartment_parts"
+    __table_args__ = (
+        # Parts of an apartment, optionally filtered by status
+        Index("ix_apartment_parts_apartment_id_status", "apartment_id", "status"),
+        # Catalog-wide status filter and studio search price ranges
+        Index("ix_apartment_parts_status_monthly_price", "status", "monthly_price"),
+        Index("ix_apartment_parts_bedrooms_monthly_price", "bedrooms", "monthly_price"),
+        Index("ix_apartment_parts_floor_monthly_price", "floor", "monthly_price"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     apartment_id = Column(Integer, ForeignKey("apartment_rents.id"), nullable=False)
@@ -22,12 +31,12 @@ class ApartmentPart(Base):
     furnished = Column(Enum(FurnishedEnum), nullable=False)
     balcony = Column(Enum(BalconyEnum), nullable=False)
     description = Column(Text, nullable=True)
-    photos_url = Column(Text, nullable=True)  # JSON string of photo URLs
     created_by_admin_id = Column(Integer, ForeignKey("admins.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
+    photos = photos_relationship("part", "ApartmentPart")
     apartment = relationship("ApartmentRent", back_populates="apartment_parts")
     created_by_admin = relationship("Admin", back_populates="created_apartment_parts")
     rental_contract = relationship("RentalContract", back_populates="apartment_part", uselist=False)
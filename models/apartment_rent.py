@@ -1,14 +1,25 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Enum, Index, Float
 from sqlalchemy.types import Numeric
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from database import Base
+from .photo import PhotoListMixin, photos_relationship
 from .enums import BathroomTypeEnum
+from .fulltext import fulltext_index, register_sqlite_fts
+from .geo import register_geo_index
 
 
-class ApartmentRent(Base):
+class ApartmentRent(PhotoListMixin, Base):
     __tablename__ = "apartment_rents"
+    __table_args__ = (
+        # Admin-scoped listings (my-content and ownership checks)
+        Index("ix_apartment_rents_listed_by_admin_id", "listed_by_admin_id"),
+        # Listing search (q=); SQLite uses the FTS5 table registered below
+        fulltext_index("apartment_rents"),
+        # Map searches (near=, bbox=) on other databases; MySQL and SQLite use the spatial index registered below
+        Index("ix_apartment_rents_latitude_longitude", "latitude", "longitude"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(200), nullable=False)
@@ -21,8 +32,9 @@ class ApartmentRent(Base):
     bathrooms = Column(Enum(BathroomTypeEnum), nullable=False)
     description = Column(Text, nullable=True)
     contact_number = Column(String(20), nullable=False)  # Auto-filled from admin
-    photos_url = Column(Text, nullable=True)  # JSON string of photo URLs
     location_on_map = Column(String(500), nullable=True)  # Google Maps or similar link
+    latitude = Column(Float, nullable=True)  # From location_on_map unless given explicitly
+    longitude = Column(Float, nullable=True)
     facilities_amenities = Column(Text, nullable=True)  # Facilities and amenities
     floor = Column(Integer, nullable=False)
     total_parts = Column(Integer, nullable=False)
@@ -31,7 +43,10 @@ class ApartmentRent(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
+    photos = photos_relationship("rent", "ApartmentRent")
     apartment_parts = relationship("ApartmentPart", back_populates="apartment", cascade="all, delete-orphan")
     listed_by_admin = relationship("Admin")
 
 
+register_sqlite_fts(ApartmentRent.__table__)
+register_geo_index(ApartmentRent.__table__)
@@ -0,0 +1,50 @@
+from typing import List
+
+from sqlalchemy import DDL, Index, Table, event
+
+
+# Listing columns covered by full-text search on rent and sale apartments
+FULLTEXT_COLUMNS = ("name", "location", "address", "description", "facilities_amenities")
+
+
+def fulltext_index(table_name: str) -> Index:
+    """MySQL FULLTEXT index over FULLTEXT_COLUMNS; skipped on other dialects."""
+    return Index(
+        f"ft_{table_name}_text",
+        *FULLTEXT_COLUMNS,
+        mysql_prefix="FULLTEXT",
+    ).ddl_if(dialect="mysql")
+
+
+def fts_table_name(table_name: str) -> str:
+    return f"{table_name}_fts"
+
+
+def sqlite_fts_statements(table_name: str) -> List[str]:
+    """An external-content FTS5 table mirroring `table_name`, with the triggers keeping it in sync (SQLite)."""
+    fts = fts_table_name(table_name)
+    columns = ", ".join(FULLTEXT_COLUMNS)
+    new_values = ", ".join(f"new.{column}" for column in FULLTEXT_COLUMNS)
+    old_values = ", ".join(f"old.{column}" for column in FULLTEXT_COLUMNS)
+
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columns}, content='{table_name}', content_rowid='id')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table_name} BEGIN "
+        f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table_name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table_name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values}); END",
+    ]
+
+
+def register_sqlite_fts(table: Table) -> None:
+    """Create an external-content FTS5 table mirroring `table` on SQLite.
+
+    Triggers keep the index in sync with inserts, updates and deletes so the
+    search code can query it exactly like the MySQL FULLTEXT index.
+    """
+    for statement in sqlite_fts_statements(table.name):
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    event.listen(table, "before_drop", DDL(f"DROP TABLE IF EXISTS {fts_table_name(table.name)}").execute_if(dialect="sqlite"))
@@ -0,0 +1,58 @@
+from typing import List
+
+from sqlalchemy import DDL, Table, event
+
+
+def geo_point_column(table_name: str) -> str:
+    return f"{table_name}.geo_point"
+
+
+def rtree_table_name(table_name: str) -> str:
+    return f"{table_name}_rtree"
+
+
+def mysql_spatial_statements(table_name: str) -> List[str]:
+    """A POINT generated from latitude/longitude with a SPATIAL index (MySQL).
+
+    SPATIAL indexes need a NOT NULL column with an SRID, so rows without
+    coordinates get POINT(0 0); searches also require latitude IS NOT NULL.
+    """
+    return [
+        f"ALTER TABLE {table_name} "
+        f"ADD COLUMN geo_point POINT SRID 0 AS (POINT(IFNULL(longitude, 0), IFNULL(latitude, 0))) STORED NOT NULL, "
+        f"ADD SPATIAL INDEX sp_{table_name}_geo_point (geo_point)",
+    ]
+
+
+def sqlite_rtree_statements(table_name: str) -> List[str]:
+    """An R*Tree table mirroring the coordinates of `table_name` (SQLite).
+
+    Triggers keep it in sync, like the FTS5 mirror of full-text search; rows
+    without coordinates are left out.
+    """
+    rtree = rtree_table_name(table_name)
+    insert = (
+        f"INSERT INTO {rtree}(id, min_lat, max_lat, min_lng, max_lng) "
+        f"SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude "
+        f"WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL;"
+    )
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {rtree} USING rtree(id, min_lat, max_lat, min_lng, max_lng)",
+        f"CREATE TRIGGER IF NOT EXISTS {rtree}_ai AFTER INSERT ON {table_name} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {rtree}_ad AFTER DELETE ON {table_name} BEGIN "
+        f"DELETE FROM {rtree} WHERE id = old.id; END",
+        f"CREATE TRIGGER IF NOT EXISTS {rtree}_au AFTER UPDATE OF latitude, longitude ON {table_name} BEGIN "
+        f"DELETE FROM {rtree} WHERE id = old.id; {insert} END",
+    ]
+
+
+def register_geo_index(table: Table) -> None:
+    """Create the spatial index of `table` along with it: SPATIAL on MySQL, an R*Tree table on SQLite.
+
+    Other databases search the plain (latitude, longitude) index.
+    """
+    for statement in mysql_spatial_statements(table.name):
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="mysql"))
+    for statement in sqlite_rtree_statements(table.name):
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    event.listen(table, "before_drop", DDL(f"DROP TABLE IF EXISTS {rtree_table_name(table.name)}").execute_if(dialect="sqlite"))
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, DateTime
+
+from database import Base
+
+
+class JobLease(Base):
+    """Which process may run a scheduled job, and until when.
+
+    Every API worker runs the scheduler; a worker only runs a job while it
+    holds the job's lease, so each run happens once across all workers. A
+    lease that is not renewed expires and another worker takes over. Times
+    are naive UTC.
+    """
+    __tablename__ = "job_leases"
+
+    name = Column(String(100), primary_key=True)
+    owner = Column(String(255), nullable=False)  # <hostname>:<pid>:<random> of the holding process
+    expires_at = Column(DateTime, nullable=False)
+    last_run_at = Column(DateTime, nullable=True)
+    last_duration_ms = Column(Integer, nullable=True)
@@ -0,0 +1,61 @@
+import json
+
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Text, Index, UniqueConstraint
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from database import Base
+
+
+class Photo(Base):
+    """One photo of an apartment (rent or sale) or studio, in display order.
+
+    `entity_type` is "rent", "sale" or "part", the same names used by the
+    upload endpoint. `key` is set for files in our storage (see StoredObject)
+    and empty for external URLs.
+    """
+    __tablename__ = "photos"
+    __table_args__ = (
+        # Photos of one entity in display order (also serves batch loads by entity_id)
+        Index("ix_photos_entity_position", "entity_type", "entity_id", "position"),
+        # An entity lists each URL at most once
+        UniqueConstraint("entity_type", "entity_id", "url", name="uq_photos_entity_url"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    entity_type = Column(String(20), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    position = Column(Integer, nullable=False, default=0)
+    key = Column(String(255), nullable=True)
+    url = Column(String(500), nullable=False)
+    content_type = Column(String(100), nullable=True)
+    size_bytes = Column(BigInteger, nullable=True)
+    variants = Column(Text, nullable=True)  # JSON object: variant -> derivative URL
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+def photos_relationship(entity_type: str, owner: str):
+    """Read-only relationship from an entity to its photos, ordered for display.
+
+    Photos are written through crud/photos.py, which keeps each change to
+    the affected rows, so the relationship is only used for (batch) loading.
+    """
+    return relationship(
+        Photo,
+        primaryjoin=f"and_(Photo.entity_type == '{entity_type}', foreign(Photo.entity_id) == {owner}.id)",
+        order_by=(Photo.position, Photo.id),
+        viewonly=True,
+    )
+
+
+class PhotoListMixin:
+    """`photos_url` and `photo_srcsets` in the shape the API has always returned."""
+
+    @property
+    def photos_url(self):
+        return [photo.url for photo in self.photos] or None
+
+    @property
+    def photo_srcsets(self):
+        srcsets = {photo.url: json.loads(photo.variants) for photo in self.photos if photo.variants}
+        return srcsets or None
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Boolean, Enum
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Boolean, Enum, Index
 from sqlalchemy.types import Numeric
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -9,6 +9,12 @@ from .enums import CustomerSourceEnum
 
 class RentalContract(Base):
     __tablename__ = "rental_contracts"
+    __table_args__ = (
+        # Active/inactive filter and expiry scans on active contracts
+        Index("ix_rental_contracts_is_active_rent_end_date", "is_active", "rent_end_date"),
+        # Date-range availability: contracts of a part overlapping the requested range
+        Index("ix_rental_contracts_part_dates", "apartment_part_id", "rent_start_date", "rent_end_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     apartment_part_id = Column(Integer, ForeignKey("apartment_parts.id"), nullable=False, unique=True)
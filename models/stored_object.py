@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
+from sqlalchemy.sql import func
+
+from database import Base
+
+
+class StoredObject(Base):
+    """A content-addressed file in storage.
+
+    Identical uploads share one object, so `ref_count` counts the entity fields
+    (photos_url entries, contract_url, customer_id_url) pointing at its URL.
+    Objects back at zero can be deleted by gc_storage.py.
+    """
+    __tablename__ = "stored_objects"
+    __table_args__ = (
+        # Garbage collection scan for unreferenced objects
+        Index("ix_stored_objects_ref_count_updated_at", "ref_count", "updated_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String(255), unique=True, nullable=False)  # objects/<sha256[:2]>/<sha256><ext>
+    url = Column(String(500), unique=True, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    variants = Column(Text, nullable=True)  # JSON object: variant -> derivative URL, once generated
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,11 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from database import get_db
 from models import Admin, AdminRoleEnum
 from schemas.admin import AdminCreate, AdminUpdate, AdminResponse
-from crud import get_admins, get_admin, create_admin, update_admin, delete_admin, get_admin_by_email
+from crud import get_admins, get_admin, create_admin, update_admin, delete_admin, get_admin_by_email, parse_cursor, cursor_headers
 from dependencies import get_current_super_admin, get_current_admin_or_super_admin
 
 router = APIRouter(
@@ -14,14 +14,17 @@ router = APIRouter(
 )
 
 @router.get("/", response_model=List[AdminResponse])
-async def list_admins(
+def list_admins(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Depends(parse_cursor),
     db: Session = Depends(get_db),
     current_admin: Admin = Depends(get_current_super_admin)
 ):
     """Get list of all admins (super admin only)."""
-    admins = get_admins(db, skip=skip, limit=limit)
+    admins = get_admins(db, skip=skip, limit=limit, cursor=cursor)
+    response.headers.update(cursor_headers(admins, limit))
     return admins
 
 @router.get("/me", response_model=AdminResponse)
@@ -32,7 +35,7 @@ async def get_current_admin_info(
     return current_admin
 
 @router.get("/{admin_id}", response_model=AdminResponse)
-async def get_admin_by_id(
+def get_admin_by_id(
     admin_id: int,
     db: Session = Depends(get_db),
     current_admin: Admin = Depends(get_current_super_admin)
@@ -44,7 +47,7 @@ async def get_admin_by_id(
     return admin
 
 @router.post("/", response_model=AdminResponse)
-async def create_new_admin(
+def create_new_admin(
     admin: AdminCreate,
     db: Session = Depends(get_db),
     current_admin: Admin = Depends(get_current_super_admin)
@@ -56,23 +59,29 @@ async def create_new_admin(
             status_code=400,
             detail="Email already registered"
         )
-    return create_admin(db=db, admin=admin)
+    try:
+        return create_admin(db=db, admin=admin)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.put("/{admin_id}", response_model=AdminResponse)
-async def update_admin_by_id(
+def update_admin_by_id(
     admin_id: int,
     admin: AdminUpdate,
     db: Session = Depends(get_db),
     current_admin: Admin = Depends(get_current_super_admin)
 ):
     """Update admin (super admin only)."""
-    db_admin = update_admin(db, admin_id=admin_id, admin=admin)
+    try:
+        db_admin = update_admin(db, admin_id=admin_id, admin=admin)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if db_admin is None:
         raise HTTPException(status_code=404, detail="Admin not found")
     return db_admin
 
 @router.put("/me", response_model=AdminResponse)
-async def update_current_admin(
+def update_current_admin(
     admin: AdminUpdate,
     db: Session = Depends(get_db),
     current_admin: Admin = Depends(get_current_admin_or_super_admin)
@@ -82,13 +91,16 @@ async def update_current_admin(
     if current_admin.role != AdminRoleEnum.super_admin:
         admin.role = None
     
-    db_admin = update_admin(db, admin_id=current_admin.id, admin=admin)
+    try:
+        db_admin = update_admin(db, admin_id=current_admin.id, admin=admin)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if db_admin is None:
         raise HTTPException(status_code=404, detail="Admin not found")
     return db_admin
 
 @router.delete("/{admin_id}", response_model=AdminResponse)
-async def delete_admin_by_id(
+def delete_admin_by_id(
     admin_id: int,
     db: Session = Depends(get_db),
     current_admin: Admin = Depends(get_current_super_admin)
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from datetime import date
 from typing import List, Optional
 import urllib.parse
 
-from database import get_db
+from database import get_db, get_async_db
 from models import Admin
 from schemas.apartment_sale import (
     ApartmentSaleCreate, ApartmentSaleUpdate, ApartmentSaleResponse
@@ -12,33 +14,63 @@ from schemas.apartment_rent import (
     ApartmentRentCreate, ApartmentRentUpdate, ApartmentRentResponse, ApartmentRentWithParts, AdminOwnContentResponse
 )
 from schemas.apartment_part import (
-    ApartmentPartCreate, ApartmentPartUpdate, ApartmentPartResponse
+    ApartmentPartCreate, ApartmentPartUpdate, ApartmentPartResponse,
+    ApartmentPartBulkCreate, ApartmentPartBulkUpdate,
+    ApartmentPartSearchFilters, ApartmentPartSearchResponse
 )
 from schemas.auth import WhatsAppLinkResponse
 from crud import (
-    get_apartments_sale, get_apartment_sale, create_apartment_sale, update_apartment_sale as crud_update_apartment_sale, delete_apartment_sale as crud_delete_apartment_sale, get_apartments_sale_by_admin,
-    get_apartments_rent, get_apartment_rent, create_apartment_rent, update_apartment_rent, delete_apartment_rent, get_apartments_rent_by_admin, get_apartments_with_parts_by_admin,
-    get_apartment_parts, get_apartment_part, create_apartment_part, update_apartment_part, delete_apartment_part,
-    get_admin_phone_for_whatsapp
+    create_apartment_sale, update_apartment_sale as crud_update_apartment_sale, delete_apartment_sale as crud_delete_apartment_sale, get_apartments_sale_by_admin,
+    get_apartment_rent, create_apartment_rent, update_apartment_rent, delete_apartment_rent, get_apartments_rent_by_admin, get_apartments_with_parts_by_admin,
+    create_apartment_part, update_apartment_part, delete_apartment_part,
+    create_apartment_parts_bulk, update_apartment_parts_bulk,
+    get_apartments_sale_async, get_apartment_sale_async, get_apartments_rent_async, get_apartment_rent_async, get_apartment_rent_with_parts_async,
+    get_apartment_parts_async, get_apartment_part_async, search_apartment_parts_async, search_available_apartment_parts_async, get_apartment_part_facets_async,
+    get_stats_overview_cached, get_admin_phone_for_whatsapp, parse_geo_query, parse_cursor, cursor_headers
 )
 from dependencies import get_current_admin_or_super_admin, get_current_super_admin
+from services.cache import get_cached_response, store_response
 
 router = APIRouter(prefix="/apartments", tags=["apartments"])
 
 # ----- Sale apartments -----
 @router.get("/sale", response_model=List[ApartmentSaleResponse])
-async def list_apartments_sale(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return get_apartments_sale(db, skip=skip, limit=limit)
+async def list_apartments_sale(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Depends(parse_cursor),
+    q: Optional[str] = Query(None, description="Full-text search over name, location, address, description and amenities"),
+    near: Optional[str] = Query(None, description="lat,lng: only listings with coordinates, nearest first (skip/limit paging only)"),
+    radius: Optional[float] = Query(None, description="With near: maximum distance in km"),
+    bbox: Optional[str] = Query(None, description="min_lng,min_lat,max_lng,max_lat: only listings inside this map viewport"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    cached = get_cached_response(request)
+    if cached is not None:
+        return cached
+    q = q.strip() if q else None
+    try:
+        geo = parse_geo_query(near, radius, bbox)
+        apartments = await get_apartments_sale_async(db, skip=skip, limit=limit, cursor=cursor, q=q, geo=geo)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Relevance- and distance-ordered results page with skip/limit only
+    headers = {} if q or near else cursor_headers(apartments, limit)
+    return store_response(request, apartments, List[ApartmentSaleResponse], tags=["sale"], headers=headers)
 
 @router.get("/sale/{apartment_id}", response_model=ApartmentSaleResponse)
-async def get_apartment_sale_details(apartment_id: int, db: Session = Depends(get_db)):
-    apartment = get_apartment_sale(db, apartment_id=apartment_id)
+async def get_apartment_sale_details(apartment_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    cached = get_cached_response(request)
+    if cached is not None:
+        return cached
+    apartment = await get_apartment_sale_async(db, apartment_id=apartment_id)
     if apartment is None:
         raise HTTPException(status_code=404, detail="Apartment not found")
-    return apartment
+    return store_response(request, apartment, ApartmentSaleResponse, tags=[f"sale:{apartment_id}"])
 
 @router.post("/sale", response_model=ApartmentSaleResponse)
-async def create_apartment_sale_endpoint(
+def create_apartment_sale_endpoint(
     apartment: ApartmentSaleCreate,
     db: Session = Depends(get_db),
     current_admin: Admin = Depends(get_current_admin_or_super_admin)
@@ -46,7 +78,7 @@ async def create_apartment_sale_endpoint(
     return create_apartment_sale(db=db, apartment=apartment, admin_id=current_admin.id, admin_phone=current_admin.phone)
 
 @router.put("/sale/{apartment_id}", response_model=ApartmentSaleResponse)
-async def update_apartment_sale_endpoint(
+def update_apartment_sale_endpoint(
     apartment_id: int,
     apartment: ApartmentSaleUpdate,
     db: Session = Depends(get_db),
@@ -70,7 +102,7 @@ async def update_apartment_sale_endpoint(
             raise HTTPException(status_code=400, detail=str(e))
 
 @router.delete("/sale/{apartment_id}", response_model=ApartmentSaleResponse)
-async def delete_apartment_sale(
+def delete_apartment_sale(
     apartment_id: int,
     db: Session = Depends(get_db),
     current_admin: Admin = Depends(get_current_admin_or_super_admin)
@@ -93,18 +125,43 @@ async def delete_apartment_sale(
 
 # ----- Rent (father) apartments -----
 @router.get("/rent", response_model=List[ApartmentRentResponse])
-async def list_apartments_rent(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return get_apartments_rent(db, skip=skip, limit=limit)
+async def list_apartments_rent(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Depends(parse_cursor),
+    q: Optional[str] = Query(None, description="Full-text search over name, location, address, description and amenities"),
+    near: Optional[str] = Query(None, description="lat,lng: only listings with coordinates, nearest first (skip/limit paging only)"),
+    radius: Optional[float] = Query(None, description="With near: maximum distance in km"),
+    bbox: Optional[str] = Query(None, description="min_lng,min_lat,max_lng,max_lat: only listings inside this map viewport"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    cached = get_cached_response(request)
+    if cached is not None:
+        return cached
+    q = q.strip() if q else None
+    try:
+        geo = parse_geo_query(near, radius, bbox)
+        apartments = await get_apartments_rent_async(db, skip=skip, limit=limit, cursor=cursor, q=q, geo=geo)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Relevance- and distance-ordered results page with skip/limit only
+    headers = {} if q or near else cursor_headers(apartments, limit)
+    return store_response(request, apartments, List[ApartmentRentResponse], tags=["rent"], headers=headers)
 
 @router.get("/rent/{apartment_id}", response_model=ApartmentRentWithParts)
-async def get_apartment_rent_details(apartment_id: int, db: Session = Depends(get_db)):
-    apartment = get_apartment_rent(db, apartment_id=apartment_id)
+async def get_apartment_rent_details(apartment_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    cached = get_cached_response(request)
+    if cached is not None:
+        return cached
+    apartment = await get_apartment_rent_with_parts_async(db, apartment_id=apartment_id)
     if apartment is None:
         raise HTTPException(status_code=404, detail="Apartment not found")
-    return apartment
+    # Embeds the apartment's parts, so part writes invalidate it through the rent tag
+    return store_response(request, apartment, ApartmentRentWithParts, tags=[f"rent:{apartment_id}"])
 
 @router.post("/rent", response_model=ApartmentRentResponse)
-async def create_apartment_rent_endpoint(
+def create_apartment_rent_endpoint(
     apartment: ApartmentRentCreate,
     db: Session = Depends(get_db),
     current_admin: Admin = Depends(get_current_admin_or_super_admin)
@@ -112,7 +169,7 @@ async def create_apartment_rent_endpoint(
     return create_apartment_rent(db=db, apartment=apartment, listed_by_admin_id=current_admin.id, admin_phone=current_admin.phone)
 
 @router.put("/rent/{apartment_id}", response_model=ApartmentRentResponse)
-async def update_apartment_rent_endpoint(
+def update_apartment_rent_endpoint(
     apartment_id: int,
     apartment: ApartmentRentUpdate,
     db: Session = Depends(get_db),
@@ -136,7 +193,7 @@ async def update_apartment_rent_endpoint(
             raise HTTPException(status_code=400, detail=str(e))
 
 @router.delete("/rent/{apartment_id}", response_model=ApartmentRentResponse)
-async def delete_apartment_rent_endpoint(
+def delete_apartment_rent_endpoint(
     apartment_id: int,
     db: Session = Depends(get_db),
     current_admin: Admin = Depends(get_current_admin_or_super_admin)
@@ -161,18 +218,23 @@ async def delete_apartment_rent_endpoint(
 @router.get("/rent/{apartment_id}/parts", response_model=List[ApartmentPartResponse])
 async def list_apartment_parts(
     apartment_id: int,
+    request: Request,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Depends(parse_cursor),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    apartment = get_apartment_rent(db, apartment_id=apartment_id)
+    cached = get_cached_response(request)
+    if cached is not None:
+        return cached
+    apartment = await get_apartment_rent_async(db, apartment_id=apartment_id)
     if apartment is None:
         raise HTTPException(status_code=404, detail="Apartment not found")
-    parts = get_apartment_parts(db, apartment_id=apartment_id, skip=skip, limit=limit)
-    return parts
+    parts = await get_apartment_parts_async(db, apartment_id=apartment_id, skip=skip, limit=limit, cursor=cursor)
+    return store_response(request, parts, List[ApartmentPartResponse], tags=["part", f"rent:{apartment_id}"], headers=cursor_headers(parts, limit))
 
 @router.post("/rent/{apartment_id}/parts", response_model=ApartmentPartResponse)
-async def create_apartment_part_for_apartment(
+def create_apartment_part_for_apartment(
     apartment_id: int,
     part: ApartmentPartCreate,
     db: Session = Depends(get_db),
@@ -197,8 +259,32 @@ async def create_apartment_part_for_apartment(
         else:
             raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/rent/{apartment_id}/parts/bulk", response_model=List[ApartmentPartResponse])
+def create_apartment_parts_bulk_for_apartment(
+    apartment_id: int,
+    bulk: ApartmentPartBulkCreate,
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_admin_or_super_admin)
+):
+    """Create many apartment parts in one request and one transaction (admin only). Same permissions as creating a single part."""
+    try:
+        return create_apartment_parts_bulk(
+            db=db,
+            parts=bulk.parts,
+            admin_id=current_admin.id,
+            apartment_id=apartment_id,
+            current_admin_role=current_admin.role.value
+        )
+    except ValueError as e:
+        if "Only the admin who created the apartment" in str(e):
+            raise HTTPException(status_code=403, detail=str(e))
+        elif "not found" in str(e):
+            raise HTTPException(status_code=404, detail="Apartment not found")
+        else:
+            raise HTTPException(status_code=400, detail=str(e))
+
 @router.put("/rent/{apartment_id}/parts/{part_id}", response_model=ApartmentPartResponse)
-async def update_apartment_part_details(
+def update_apartment_part_details(
     apartment_id: int,
     part_id: int,
     part: ApartmentPartUpdate,
@@ -236,7 +322,7 @@ async def update_apartment_part_details(
             raise HTTPException(status_code=400, detail=str(e))
 
 @router.delete("/rent/{apartment_id}/parts/{part_id}", response_model=ApartmentPartResponse)
-async def delete_apartment_part_by_id(
+def delete_apartment_part_by_id(
     apartment_id: int,
     part_id: int,
     db: Session = Depends(get_db),
@@ -265,7 +351,7 @@ async def delete_apartment_part_by_id(
             raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/rent/{apartment_id}/whatsapp", response_model=WhatsAppLinkResponse)
-async def get_whatsapp_contact(
+def get_whatsapp_contact(
     apartment_id: int,
     db: Session = Depends(get_db)
 ):
@@ -295,23 +381,109 @@ async def get_whatsapp_contact(
 
 @router.get("/parts", response_model=List[ApartmentPartResponse])
 async def list_all_apartment_parts(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Depends(parse_cursor),
+    near: Optional[str] = Query(None, description="lat,lng: only parts of apartments with coordinates, nearest first (skip/limit paging only)"),
+    radius: Optional[float] = Query(None, description="With near: maximum distance in km"),
+    bbox: Optional[str] = Query(None, description="min_lng,min_lat,max_lng,max_lat: only parts of apartments inside this map viewport"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List all apartment parts across all apartments, optionally around a point or in a map viewport."""
+    cached = get_cached_response(request)
+    if cached is not None:
+        return cached
+    try:
+        geo = parse_geo_query(near, radius, bbox)
+        parts = await get_apartment_parts_async(db, apartment_id=None, skip=skip, limit=limit, cursor=cursor, geo=geo)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {} if near else cursor_headers(parts, limit)
+    # Map searches filter on the apartments' coordinates, which rent changes invalidate
+    tags = ["part", "rent"] if geo else ["part"]
+    return store_response(request, parts, List[ApartmentPartResponse], tags=tags, headers=headers)
+
+@router.get("/parts/search", response_model=ApartmentPartSearchResponse)
+async def search_apartment_parts_endpoint(
+    request: Request,
+    filters: ApartmentPartSearchFilters = Depends(),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Depends(parse_cursor),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """List all apartment parts across all apartments."""
-    return get_apartment_parts(db, apartment_id=None, skip=skip, limit=limit)
+    """Search studios by price, area, bedrooms, floor and amenities, with facet counts over all matches."""
+    cached = get_cached_response(request)
+    if cached is not None:
+        return cached
+    parts = await search_apartment_parts_async(db, filters, skip=skip, limit=limit, cursor=cursor)
+    facets = await get_apartment_part_facets_async(db, filters)
+    result = {"total": facets.pop("total"), "items": parts, "facets": facets}
+    return store_response(request, result, ApartmentPartSearchResponse, tags=["part"], headers=cursor_headers(parts, limit))
+
+@router.get("/parts/available", response_model=List[ApartmentPartResponse])
+async def list_available_apartment_parts(
+    request: Request,
+    available_from: date = Query(..., alias="from", description="First day of the stay (YYYY-MM-DD)"),
+    available_to: date = Query(..., alias="to", description="Last day of the stay (YYYY-MM-DD)"),
+    filters: ApartmentPartSearchFilters = Depends(),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Depends(parse_cursor),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Studios with no active rental contract overlapping the date range, combined with the search filters."""
+    cached = get_cached_response(request)
+    if cached is not None:
+        return cached
+    try:
+        parts = await search_available_apartment_parts_async(
+            db, available_from, available_to, filters, skip=skip, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Contract date changes only invalidate the "contract" tag
+    return store_response(request, parts, List[ApartmentPartResponse], tags=["part", "contract"], headers=cursor_headers(parts, limit))
 
 @router.get("/parts/{part_id}", response_model=ApartmentPartResponse)
-async def get_apartment_part_details(part_id: int, db: Session = Depends(get_db)):
+async def get_apartment_part_details(part_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
     """Get specific apartment part by ID."""
-    part = get_apartment_part(db, part_id=part_id)
+    cached = get_cached_response(request)
+    if cached is not None:
+        return cached
+    part = await get_apartment_part_async(db, part_id=part_id)
     if part is None:
         raise HTTPException(status_code=404, detail="Apartment part not found")
-    return part
+    return store_response(request, part, ApartmentPartResponse, tags=[f"part:{part_id}", f"rent:{part.apartment_id}"])
+
+@router.patch("/parts/bulk", response_model=List[ApartmentPartResponse])
+def update_apartment_parts_bulk_endpoint(
+    bulk: ApartmentPartBulkUpdate,
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_admin_or_super_admin)
+):
+    """Update many apartment parts by ID in one request and one transaction (admin only).
+
+    Each item carries the part `id` and only the fields to change. Either every part is updated or none is.
+    """
+    try:
+        return update_apartment_parts_bulk(
+            db,
+            parts=bulk.parts,
+            current_admin_id=current_admin.id,
+            current_admin_role=current_admin.role.value
+        )
+    except ValueError as e:
+        if "Only the admin who created the apartment" in str(e):
+            raise HTTPException(status_code=403, detail=str(e))
+        elif "not found" in str(e):
+            raise HTTPException(status_code=404, detail=str(e))
+        else:
+            raise HTTPException(status_code=400, detail=str(e))
 
 @router.put("/parts/{part_id}", response_model=ApartmentPartResponse)
-async def update_apartment_part_direct(
+def update_apartment_part_direct(
     part_id: int,
     part: ApartmentPartUpdate,
     db: Session = Depends(get_db),
@@ -336,7 +508,7 @@ async def update_apartment_part_direct(
             raise HTTPException(status_code=400, detail=str(e))
 
 @router.delete("/parts/{part_id}", response_model=ApartmentPartResponse)
-async def delete_apartment_part_direct(
+def delete_apartment_part_direct(
     part_id: int,
     db: Session = Depends(get_db),
     current_admin: Admin = Depends(get_current_admin_or_super_admin)
@@ -360,7 +532,7 @@ async def delete_apartment_part_direct(
 
 
 @router.get("/my-content", response_model=AdminOwnContentResponse)
-async def get_admin_own_content(
+def get_admin_own_content(
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
@@ -373,15 +545,13 @@ async def get_admin_own_content(
     # Get sale apartments
     sale_apartments = get_apartments_sale_by_admin(db, current_admin.id, current_admin.role.value, skip=skip, limit=limit)
     
-    # Count total studios
-    total_studios = 0
-    for apartment in rent_apartments_data:
-        total_studios += len(apartment.get("apartment_parts", []))
+    # Totals over all of the admin's content, not just this page
+    stats = get_stats_overview_cached(db, current_admin)
     
     return AdminOwnContentResponse(
         rent_apartments=rent_apartments_data,
         sale_apartments=sale_apartments,
-        total_rent_apartments=len(rent_apartments_data),
-        total_sale_apartments=len(sale_apartments),
-        total_studios=total_studios
+        total_rent_apartments=stats.rent_apartments,
+        total_sale_apartments=stats.sale_apartments,
+        total_studios=stats.studios.total
     )
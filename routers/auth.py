@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import timedelta
 
-from database import get_db
+from database import get_db, get_async_db
 from schemas.admin import AdminCreate, AdminResponse, MasterAdminCreate, MasterAdminCreateData
 from schemas.auth import Token
-from crud import authenticate_admin, get_admin_by_email, get_admin_by_phone, create_admin
+from crud import authenticate_admin_async, get_admin_by_email, get_admin_by_phone, create_admin
 from dependencies import (
     create_access_token, get_current_super_admin, 
     ACCESS_TOKEN_EXPIRE_MINUTES
@@ -20,10 +21,10 @@ router = APIRouter(
 @router.post("/login", response_model=Token)
 async def login_admin(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Login admin with email or phone and return JWT token."""
-    admin = authenticate_admin(db, form_data.username, form_data.password)
+    admin = await authenticate_admin_async(db, form_data.username, form_data.password)
     if not admin:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -37,7 +38,7 @@ async def login_admin(
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/register", response_model=AdminResponse)
-async def register_admin(
+def register_admin(
     admin: AdminCreate,
     db: Session = Depends(get_db),
     current_super_admin = Depends(get_current_super_admin)
@@ -59,11 +60,14 @@ async def register_admin(
             detail="Phone number already registered"
         )
     
-    return create_admin(db=db, admin=admin)
+    try:
+        return create_admin(db=db, admin=admin)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/create-master-admin", response_model=AdminResponse)
-async def create_master_admin(
+def create_master_admin(
     admin: MasterAdminCreate,
     db: Session = Depends(get_db)
 ):
@@ -111,4 +115,7 @@ async def create_master_admin(
         role="super_admin"  # Force super_admin role
     )
     
-    return create_admin(db=db, admin=admin_data)
+    try:
+        return create_admin(db=db, admin=admin_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+
+from database import get_engine
+from dependencies import get_current_admin_or_super_admin
+from models import Admin, PartStatusEnum
+from crud.exports import EXPORT_MODELS, build_export_statement
+from services.exporter import EXPORT_FORMATS, stream_export
+
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+@router.get("/{entity_type}.{fmt}")
+def export_listings_endpoint(
+    entity_type: str,
+    fmt: str,
+    q: Optional[str] = Query(None, description="sale and rent: full-text search, as on the list endpoints"),
+    apartment_id: Optional[int] = Query(None, description="part and contract: only this rent apartment"),
+    status: Optional[PartStatusEnum] = Query(None, description="part: only parts with this status"),
+    is_active: Optional[bool] = Query(None, description="contract: only active or inactive contracts"),
+    current_admin: Admin = Depends(get_current_admin_or_super_admin),
+):
+    """Export every sale apartment, rent apartment, part (studio) or rental contract as CSV or NDJSON (admin only).
+
+    e.g. `/export/contract.csv?is_active=true`. Rows are streamed from the
+    database as they are written, so exports of any size use the same memory.
+    CSV exports can be imported back with `POST /import/{entity_type}`.
+    """
+    entity_type = entity_type.strip().lower()
+    if entity_type not in EXPORT_MODELS:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown export; use one of: {', '.join(sorted(EXPORT_MODELS))}"
+        )
+    fmt = fmt.strip().lower()
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=404, detail=f"Unknown format; use one of: {', '.join(EXPORT_FORMATS)}")
+
+    q = q.strip() if q else None
+    try:
+        stmt = build_export_statement(
+            entity_type, get_engine().dialect.name, q=q, apartment_id=apartment_id, status=status, is_active=is_active
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(
+        stream_export(entity_type, fmt, stmt),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{entity_type}.{fmt}"'},
+    )
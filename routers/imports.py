@@ -0,0 +1,47 @@
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from database import get_db
+from dependencies import get_current_admin_or_super_admin
+from models import Admin
+from services.importer import IMPORT_SCHEMAS, IMPORT_FORMATS, detect_format, import_listings
+
+
+router = APIRouter(prefix="/import", tags=["import"])
+
+
+@router.post("/{entity_type}")
+def import_listings_endpoint(
+    entity_type: str,
+    file: UploadFile = File(..., description="CSV (with a header row) or JSONL file, one listing per row"),
+    format: Optional[str] = Form(None, description="'csv' or 'jsonl'. Defaults to the file extension."),
+    start_row: int = Form(0, description="Skip rows up to this one, e.g. rows_processed of an interrupted import"),
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_admin_or_super_admin),
+):
+    """Import sale apartments, rent apartments or parts (studios) from a file (admin only).
+
+    Rows are validated like the create endpoints and inserted in batches; each
+    batch is committed on its own. Listings are owned by the importing admin.
+    Part rows also need an `apartment_id` of an apartment the admin may add
+    parts to. The response lists the rows that failed and `rows_processed`,
+    which resumes the import when sent back as `start_row`.
+    """
+    entity_type = entity_type.strip().lower()
+    if entity_type not in IMPORT_SCHEMAS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"entity_type must be one of: {', '.join(sorted(IMPORT_SCHEMAS))}"
+        )
+    fmt = (format or detect_format(file.filename) or "").strip().lower()
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(IMPORT_FORMATS)}")
+    if start_row < 0:
+        raise HTTPException(status_code=400, detail="start_row must not be negative")
+
+    # The multipart parser has already spooled the upload to a temporary file; rows are read from it one at a time
+    try:
+        return import_listings(db, entity_type, file.file, fmt, current_admin, start_row=start_row)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File must be UTF-8 encoded")
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
@@ -10,7 +10,8 @@ from schemas.rental_contract import (
 from crud import (
     get_rental_contract, get_rental_contract_by_part, get_rental_contracts,
     get_rental_contracts_by_studio_ordered, create_rental_contract, 
-    update_rental_contract, delete_rental_contract
+    update_rental_contract, delete_rental_contract,
+    parse_cursor, cursor_headers
 )
 from dependencies import get_current_admin_or_super_admin, get_current_super_admin
 
@@ -20,9 +21,11 @@ router = APIRouter(
 )
 
 @router.get("/", response_model=List[RentalContractResponse])
-async def list_rental_contracts(
+def list_rental_contracts(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Depends(parse_cursor),
     apartment_id: Optional[int] = Query(None, description="Filter by apartment ID"),
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
     db: Session = Depends(get_db),
@@ -34,12 +37,14 @@ async def list_rental_contracts(
         apartment_id=apartment_id,
         is_active=is_active,
         skip=skip,
-        limit=limit
+        limit=limit,
+        cursor=cursor
     )
+    response.headers.update(cursor_headers(contracts, limit))
     return contracts
 
 @router.get("/by-studio", response_model=List[RentalContractResponse])
-async def list_rental_contracts_by_studio(
+def list_rental_contracts_by_studio(
     skip: int = 0,
     limit: int = 100,
     apartment_id: Optional[int] = Query(None, description="Filter by apartment ID"),
@@ -58,7 +63,7 @@ async def list_rental_contracts_by_studio(
     return contracts
 
 @router.get("/{contract_id}", response_model=RentalContractResponse)
-async def get_rental_contract_by_id(
+def get_rental_contract_by_id(
     contract_id: int,
     db: Session = Depends(get_db),
     current_admin: Admin = Depends(get_current_admin_or_super_admin)
@@ -70,7 +75,7 @@ async def get_rental_contract_by_id(
     return contract
 
 @router.post("/", response_model=RentalContractResponse)
-async def create_new_rental_contract(
+def create_new_rental_contract(
     contract: RentalContractCreate,
     db: Session = Depends(get_db),
     current_admin: Admin = Depends(get_current_admin_or_super_admin)
@@ -92,7 +97,7 @@ async def create_new_rental_contract(
             raise HTTPException(status_code=400, detail=str(e))
 
 @router.put("/{contract_id}", response_model=RentalContractResponse)
-async def update_rental_contract_details(
+def update_rental_contract_details(
     contract_id: int,
     contract: RentalContractUpdate,
     db: Session = Depends(get_db),
@@ -105,7 +110,7 @@ async def update_rental_contract_details(
     return db_contract
 
 @router.delete("/{contract_id}", response_model=RentalContractResponse)
-async def delete_rental_contract_by_id(
+def delete_rental_contract_by_id(
     contract_id: int,
     db: Session = Depends(get_db),
     current_admin: Admin = Depends(get_current_admin_or_super_admin)
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from database import get_db
+from models import Admin
+from schemas.stats import StatsOverviewResponse
+from crud import get_stats_overview_cached
+from dependencies import get_current_admin_or_super_admin
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+
+@router.get("/overview", response_model=StatsOverviewResponse)
+def get_stats_overview_endpoint(
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_admin_or_super_admin)
+):
+    """Listing, studio and contract totals for the dashboard (admin only).
+
+    Admins see their own content; the super admin sees everything, broken
+    down by owning admin. Cached for STATS_CACHE_TTL_SECONDS, and dropped
+    sooner by any listing, studio or contract write.
+    """
+    return get_stats_overview_cached(db, current_admin)
@@ -1,14 +1,18 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends, BackgroundTasks
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import os
-import json
 
 from database import get_db
 from dependencies import get_current_admin_or_super_admin
 from models import Admin
-from services.storage import get_storage_from_env
+from services.storage import get_storage, FileTooLargeError, SaveFilesError, MAX_UPLOAD_FILE_BYTES
+from services.cache import invalidate_sale, invalidate_rent, invalidate_part
+from services.images import generate_photo_variants
+from crud.stored_objects import register_objects, replace_object_references
+from crud.photos import PHOTO_ENTITY_TYPES, append_photos, get_photos, get_photo, reorder_photos, delete_photos
+from schemas.photo import PhotoResponse, PhotoReorder
 from models.apartment_rent import ApartmentRent
 from models.apartment_sale import ApartmentSale
 from models.apartment_part import ApartmentPart
@@ -19,7 +23,8 @@ router = APIRouter(prefix="/uploads", tags=["uploads"])
 
 
 @router.post("/photos")
-async def upload_photos(
+def upload_photos(
+    background_tasks: BackgroundTasks,
     entity_id: int = Form(..., description="ID of the target entity (apartment, part, or contract ID)"),
     entity_type: str = Form(..., description="Type: one of 'part', 'rent', 'sale', 'rental_contract'"),
     document_type: Optional[str] = Form(None, description="For rental_contract: 'contract' or 'customer_id'. Optional for other types."),
@@ -51,15 +56,22 @@ async def upload_photos(
     else:
         document_type_normalized = None
 
-    storage = get_storage_from_env()
+    storage = get_storage()
 
-    # Read all files
-    payload: List[tuple[str, bytes]] = []
+    # The multipart parser has already spooled each file to a temporary file;
+    # storage streams from those instead of reading them into memory.
+    payload: List[tuple] = []
+    uploads: List[UploadFile] = []
     for file in files:
         if not file.filename:
             continue
-        content = await file.read()
-        payload.append((file.filename, content))
+        if file.size is not None and file.size > MAX_UPLOAD_FILE_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File '{file.filename}' exceeds the {MAX_UPLOAD_FILE_BYTES} byte upload limit"
+            )
+        payload.append((file.filename, file.file))
+        uploads.append(file)
 
     if not payload:
         raise HTTPException(status_code=400, detail="No valid files provided")
@@ -67,14 +79,24 @@ async def upload_photos(
     # Save files to storage
     try:
         saved = storage.save_files(entity_type_normalized, entity_id, payload)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to save uploaded files: {str(e)}")
+    except SaveFilesError as e:
+        # Track the files stored before the failure at zero references, so gc_storage.py removes them
+        register_objects(db, e.saved)
+        db.commit()
+        if isinstance(e.error, FileTooLargeError):
+            raise HTTPException(status_code=413, detail=str(e.error))
+        raise HTTPException(status_code=500, detail=f"Failed to save uploaded files: {str(e.error)}")
 
     if not saved:
         raise HTTPException(status_code=500, detail="No files were saved")
 
     new_urls = [url for _, url in saved]
 
+    # Track the stored objects right away; an object no entity ends up
+    # referencing stays at zero references and is removed by gc_storage.py
+    register_objects(db, saved)
+    db.commit()
+
     # Handle different entity types
     if entity_type_normalized == "rental_contract":
         # For rental contracts, update contract_url or customer_id_url with first file's URL
@@ -84,10 +106,12 @@ async def upload_photos(
         
         # Use first file's URL for the single URL field
         first_url = new_urls[0]
+        old_documents = [instance.contract_url, instance.customer_id_url]
         if document_type_normalized == "contract":
             instance.contract_url = first_url
         elif document_type_normalized == "customer_id":
             instance.customer_id_url = first_url
+        replace_object_references(db, old_documents, [instance.contract_url, instance.customer_id_url])
         
         db.add(instance)
         db.commit()
@@ -110,7 +134,7 @@ async def upload_photos(
             }
         )
     else:
-        # For apartments and parts, update photos_url (JSON array)
+        # For apartments and parts, append rows to the photos table
         model_map = {
             "rent": ApartmentRent,
             "sale": ApartmentSale,
@@ -122,31 +146,19 @@ async def upload_photos(
         if not instance:
             raise HTTPException(status_code=404, detail="Target entity not found")
 
-        # Get existing URLs
-        existing_urls: List[str] = []
-        if getattr(instance, "photos_url", None):
-            try:
-                parsed = json.loads(instance.photos_url)
-                if isinstance(parsed, list):
-                    existing_urls = [str(u) for u in parsed]
-                elif isinstance(parsed, str):
-                    existing_urls = [parsed]
-            except Exception:
-                existing_urls = []
-
-        # Combine and deduplicate
-        combined = existing_urls + new_urls
-        seen = set()
-        deduped: List[str] = []
-        for u in combined:
-            if u not in seen:
-                seen.add(u)
-                deduped.append(u)
-
-        instance.photos_url = json.dumps(deduped)
-        db.add(instance)
+        # `saved` follows the order of the uploaded files
+        append_photos(db, entity_type_normalized, entity_id, [
+            {"key": key, "url": url, "content_type": file.content_type, "size_bytes": file.size}
+            for (key, url), file in zip(saved, uploads)
+        ])
         db.commit()
-        db.refresh(instance)
+
+        _invalidate_entity(entity_type_normalized, instance)
+        # get_db only closes the session after the background task below; return its connection to the pool now
+        db.close()
+
+        # Resized variants are built after the response is sent and show up in photo_srcsets
+        background_tasks.add_task(generate_photo_variants, saved)
 
         return JSONResponse(
             {
@@ -163,3 +175,78 @@ async def upload_photos(
         )
 
 
+def _get_photo_owner(db: Session, entity_type: str, entity_id: int):
+    model_map = {
+        "rent": ApartmentRent,
+        "sale": ApartmentSale,
+        "part": ApartmentPart,
+    }
+    if entity_type not in PHOTO_ENTITY_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"entity_type must be one of: {', '.join(sorted(PHOTO_ENTITY_TYPES))}"
+        )
+    Model = model_map[entity_type]
+    instance = db.query(Model).filter(Model.id == entity_id).first()
+    if not instance:
+        raise HTTPException(status_code=404, detail="Target entity not found")
+    return instance
+
+
+def _invalidate_entity(entity_type: str, instance) -> None:
+    if entity_type == "rent":
+        invalidate_rent(instance.id)
+    elif entity_type == "sale":
+        invalidate_sale(instance.id)
+    else:
+        invalidate_part(instance.apartment_id, instance.id)
+
+
+@router.get("/photos/{entity_type}/{entity_id}", response_model=List[PhotoResponse])
+def list_photos(
+    entity_type: str,
+    entity_id: int,
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_admin_or_super_admin),
+):
+    """List the photos of an apartment or studio in display order, with their ids."""
+    _get_photo_owner(db, entity_type, entity_id)
+    return get_photos(db, entity_type, entity_id)
+
+
+@router.put("/photos/{entity_type}/{entity_id}/order", response_model=List[PhotoResponse])
+def reorder_entity_photos(
+    entity_type: str,
+    entity_id: int,
+    order: PhotoReorder,
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_admin_or_super_admin),
+):
+    """Reorder photos; `photo_ids` must list every photo of the entity once."""
+    instance = _get_photo_owner(db, entity_type, entity_id)
+    try:
+        photos = reorder_photos(db, entity_type, entity_id, order.photo_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    db.commit()
+    _invalidate_entity(entity_type, instance)
+    return photos
+
+
+@router.delete("/photos/{entity_type}/{entity_id}/{photo_id}")
+def delete_entity_photo(
+    entity_type: str,
+    entity_id: int,
+    photo_id: int,
+    db: Session = Depends(get_db),
+    current_admin: Admin = Depends(get_current_admin_or_super_admin),
+):
+    """Remove one photo from an apartment or studio."""
+    instance = _get_photo_owner(db, entity_type, entity_id)
+    photo = get_photo(db, entity_type, entity_id, photo_id)
+    if not photo:
+        raise HTTPException(status_code=404, detail="Photo not found")
+    delete_photos(db, [photo])
+    db.commit()
+    _invalidate_entity(entity_type, instance)
+    return {"message": "Photo deleted successfully"}
@@ -30,7 +30,13 @@ from .apartment_part import (
     ApartmentPartBase,
     ApartmentPartCreate,
     ApartmentPartUpdate,
+    ApartmentPartBulkCreate,
+    ApartmentPartBulkUpdateItem,
+    ApartmentPartBulkUpdate,
     ApartmentPartResponse,
+    ApartmentPartSearchFilters,
+    ApartmentPartFacets,
+    ApartmentPartSearchResponse,
 )
 
 from .rental_contract import (
@@ -40,6 +46,18 @@ from .rental_contract import (
     RentalContractResponse,
 )
 
+from .photo import (
+    PhotoResponse,
+    PhotoReorder,
+)
+
+from .stats import (
+    StudioStatusCounts,
+    StatsSummary,
+    AdminStats,
+    StatsOverviewResponse,
+)
+
 
 from .auth import (
     Token,
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, field_validator
-from typing import Optional, List, Union
+from typing import Optional, List, Dict, Union
 from datetime import datetime
 from decimal import Decimal
 import json
@@ -61,6 +61,18 @@ class ApartmentPartUpdate(BaseModel):
     photos_url: Optional[List[str]] = None
 
 
+class ApartmentPartBulkCreate(BaseModel):
+    parts: List[ApartmentPartCreate]
+
+
+class ApartmentPartBulkUpdateItem(ApartmentPartUpdate):
+    id: int
+
+
+class ApartmentPartBulkUpdate(BaseModel):
+    parts: List[ApartmentPartBulkUpdateItem]
+
+
 class ApartmentPartResponse(ApartmentPartBase):
     id: int
     apartment_id: int
@@ -68,6 +80,19 @@ class ApartmentPartResponse(ApartmentPartBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
     
+    # Resized WebP variants per photo URL, e.g. {"320w": url, "640w": url, "placeholder": url}
+    photo_srcsets: Optional[Dict[str, Dict[str, str]]] = None
+
+    @field_validator('photo_srcsets', mode='before')
+    @classmethod
+    def parse_photo_srcsets(cls, v):
+        if isinstance(v, str):
+            try:
+                return json.loads(v)
+            except json.JSONDecodeError:
+                return None
+        return v
+
     @field_validator('photos_url', mode='after')
     @classmethod
     def serialize_photos_url(cls, v):
@@ -79,3 +104,37 @@ class ApartmentPartResponse(ApartmentPartBase):
     
     class Config:
         from_attributes = True
+
+
+class ApartmentPartSearchFilters(BaseModel):
+    """Query filters accepted by the studio search endpoint."""
+    status: Optional[PartStatusEnum] = None
+    min_price: Optional[Decimal] = None
+    max_price: Optional[Decimal] = None
+    min_area: Optional[Decimal] = None
+    max_area: Optional[Decimal] = None
+    bedrooms: Optional[int] = None
+    floor: Optional[int] = None
+    furnished: Optional[FurnishedEnum] = None
+    balcony: Optional[BalconyEnum] = None
+    bathrooms: Optional[BathroomTypeEnum] = None
+
+
+class PriceBucketFacet(BaseModel):
+    min_price: Decimal
+    max_price: Optional[Decimal] = None  # None for the open-ended top bucket
+    count: int
+
+
+class ApartmentPartFacets(BaseModel):
+    furnished: Dict[str, int] = {}
+    balcony: Dict[str, int] = {}
+    bathrooms: Dict[str, int] = {}
+    price_buckets: List[PriceBucketFacet] = []
+
+
+class ApartmentPartSearchResponse(BaseModel):
+    """Response model for studio search: one page of parts plus facet counts over all matches."""
+    total: int = 0
+    items: List[ApartmentPartResponse] = []
+    facets: ApartmentPartFacets
@@ -1,11 +1,11 @@
-from pydantic import BaseModel, field_validator
-from typing import Optional, List, Union
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Optional, List, Dict, Union
 from datetime import datetime
 from decimal import Decimal
 import json
 
 from .apartment_part import ApartmentPartResponse
-from .apartment_sale import ApartmentSaleResponse
+from .apartment_sale import ApartmentSaleResponse, check_coordinates
 from .enums import BathroomTypeEnum
 
 
@@ -21,6 +21,9 @@ class ApartmentRentBase(BaseModel):
     description: Optional[str] = None
     photos_url: Optional[List[str]] = None
     location_on_map: Optional[str] = None
+    # Taken from location_on_map when not given
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     facilities_amenities: Optional[str] = None
     floor: int
     total_parts: int
@@ -39,7 +42,7 @@ class ApartmentRentBase(BaseModel):
 
 
 class ApartmentRentCreate(ApartmentRentBase):
-    pass
+    _coordinates = model_validator(mode="after")(check_coordinates)
 
 
 class ApartmentRentUpdate(BaseModel):
@@ -54,10 +57,15 @@ class ApartmentRentUpdate(BaseModel):
     description: Optional[str] = None
     photos_url: Optional[List[str]] = None
     location_on_map: Optional[str] = None
+    # Taken from location_on_map when not given
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     facilities_amenities: Optional[str] = None
     floor: Optional[int] = None
     total_parts: Optional[int] = None
 
+    _coordinates = model_validator(mode="after")(check_coordinates)
+
 
 class ApartmentRentResponse(ApartmentRentBase):
     id: int
@@ -66,6 +74,19 @@ class ApartmentRentResponse(ApartmentRentBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
     
+    # Resized WebP variants per photo URL, e.g. {"320w": url, "640w": url, "placeholder": url}
+    photo_srcsets: Optional[Dict[str, Dict[str, str]]] = None
+
+    @field_validator('photo_srcsets', mode='before')
+    @classmethod
+    def parse_photo_srcsets(cls, v):
+        if isinstance(v, str):
+            try:
+                return json.loads(v)
+            except json.JSONDecodeError:
+                return None
+        return v
+
     @field_validator('photos_url', mode='after')
     @classmethod
     def serialize_photos_url(cls, v):
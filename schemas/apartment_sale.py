@@ -1,5 +1,5 @@
-from pydantic import BaseModel, field_validator
-from typing import Optional, List, Union
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Optional, List, Dict, Union
 from datetime import datetime
 from decimal import Decimal
 import json
@@ -7,6 +7,13 @@ import json
 from .enums import BathroomTypeEnum
 
 
+def check_coordinates(model):
+    """latitude and longitude are given together or not at all."""
+    if (model.latitude is None) != (model.longitude is None):
+        raise ValueError("latitude and longitude must be given together")
+    return model
+
+
 class ApartmentSaleBase(BaseModel):
     name: str
     location: str
@@ -19,6 +26,9 @@ class ApartmentSaleBase(BaseModel):
     description: Optional[str] = None
     photos_url: Optional[List[str]] = None
     location_on_map: Optional[str] = None
+    # Taken from location_on_map when not given
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     facilities_amenities: Optional[str] = None
 
     @field_validator('photos_url', mode='before')
@@ -35,7 +45,7 @@ class ApartmentSaleBase(BaseModel):
 
 
 class ApartmentSaleCreate(ApartmentSaleBase):
-    pass
+    _coordinates = model_validator(mode="after")(check_coordinates)
 
 
 class ApartmentSaleUpdate(BaseModel):
@@ -50,8 +60,13 @@ class ApartmentSaleUpdate(BaseModel):
     description: Optional[str] = None
     photos_url: Optional[List[str]] = None
     location_on_map: Optional[str] = None
+    # Taken from location_on_map when not given
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     facilities_amenities: Optional[str] = None
 
+    _coordinates = model_validator(mode="after")(check_coordinates)
+
 
 class ApartmentSaleResponse(ApartmentSaleBase):
     id: int
@@ -60,6 +75,19 @@ class ApartmentSaleResponse(ApartmentSaleBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
     
+    # Resized WebP variants per photo URL, e.g. {"320w": url, "640w": url, "placeholder": url}
+    photo_srcsets: Optional[Dict[str, Dict[str, str]]] = None
+
+    @field_validator('photo_srcsets', mode='before')
+    @classmethod
+    def parse_photo_srcsets(cls, v):
+        if isinstance(v, str):
+            try:
+                return json.loads(v)
+            except json.JSONDecodeError:
+                return None
+        return v
+
     @field_validator('photos_url', mode='after')
     @classmethod
     def serialize_photos_url(cls, v):
@@ -0,0 +1,36 @@
+from pydantic import BaseModel, field_validator
+from typing import Optional, List, Dict
+from datetime import datetime
+import json
+
+
+class PhotoResponse(BaseModel):
+    id: int
+    entity_type: str
+    entity_id: int
+    position: int
+    key: Optional[str] = None
+    url: str
+    content_type: Optional[str] = None
+    size_bytes: Optional[int] = None
+    created_at: Optional[datetime] = None
+
+    # Resized WebP variants, e.g. {"320w": url, "640w": url, "placeholder": url}
+    variants: Optional[Dict[str, str]] = None
+
+    @field_validator('variants', mode='before')
+    @classmethod
+    def parse_variants(cls, v):
+        if isinstance(v, str):
+            try:
+                return json.loads(v)
+            except json.JSONDecodeError:
+                return None
+        return v
+
+    class Config:
+        from_attributes = True
+
+
+class PhotoReorder(BaseModel):
+    photo_ids: List[int]
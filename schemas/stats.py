@@ -0,0 +1,31 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from decimal import Decimal
+
+
+class StudioStatusCounts(BaseModel):
+    total: int = 0
+    available: int = 0
+    rented: int = 0
+    upcoming_end: int = 0
+
+
+class StatsSummary(BaseModel):
+    rent_apartments: int = 0
+    sale_apartments: int = 0
+    studios: StudioStatusCounts = StudioStatusCounts()
+    # Share of studios that are rented or upcoming_end, 0..1
+    occupancy_rate: float = 0.0
+    active_contracts: int = 0
+    # Sum of rent_price over active contracts
+    active_contracts_rent: Decimal = Decimal("0")
+
+
+class AdminStats(StatsSummary):
+    admin_id: int
+    admin_name: Optional[str] = None
+
+
+class StatsOverviewResponse(StatsSummary):
+    """Totals over everything the requesting admin owns (everything for the super admin), then per owning admin."""
+    by_admin: List[AdminStats] = []
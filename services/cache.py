@@ -0,0 +1,206 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, Set
+
+from decouple import config
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    headers: Dict[str, str]
+    tags: frozenset
+    expires_at: float
+
+
+class ResponseCache:
+    """TTL + LRU cache of serialized response bodies with tag-based invalidation.
+
+    Every entry is tagged with the entities it was built from (e.g. "sale" for
+    sale lists, "sale:5" for one sale apartment), so writes only evict the
+    responses they can actually change.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 60.0, enabled: bool = True):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._keys_by_tag: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(
+        self,
+        key: str,
+        body: bytes,
+        tags: Iterable[str],
+        headers: Optional[Dict[str, str]] = None,
+        ttl_seconds: Optional[float] = None,
+    ) -> None:
+        if not self.enabled:
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        entry = CachedResponse(body, dict(headers or {}), frozenset(tags), time.monotonic() + ttl)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            for tag in entry.tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, *tags: str) -> None:
+        """Drop every entry carrying any of `tags`."""
+        with self._lock:
+            for tag in tags:
+                for key in list(self._keys_by_tag.get(tag, ())):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_tag.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry.tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+
+response_cache = ResponseCache(
+    max_entries=config("RESPONSE_CACHE_MAX_ENTRIES", default=1024, cast=int),
+    ttl_seconds=config("RESPONSE_CACHE_TTL_SECONDS", default=60, cast=float),
+    enabled=config("RESPONSE_CACHE_ENABLED", default=True, cast=bool),
+)
+# Dashboard aggregates change with every write anywhere, so they are kept for less time
+STATS_CACHE_TTL_SECONDS = config("STATS_CACHE_TTL_SECONDS", default=15, cast=float)
+
+
+@lru_cache(maxsize=None)
+def _type_adapter(response_model) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+
+def cache_key(request: Request) -> str:
+    """Route path plus query parameters in a canonical order."""
+    params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    return f"{request.url.path}?{params}"
+
+
+def get_cached_response(request: Request) -> Optional[Response]:
+    """Return the cached response for this request, or None on a miss."""
+    if not response_cache.enabled:
+        return None
+    entry = response_cache.get(cache_key(request))
+    if entry is None:
+        return None
+    return Response(
+        content=entry.body,
+        media_type="application/json",
+        headers={**entry.headers, "X-Cache": "HIT"},
+    )
+
+
+def store_response(
+    request: Request,
+    content: Any,
+    response_model,
+    tags: Iterable[str],
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """Serialize `content` through `response_model`, cache the bytes under `tags` and return them."""
+    adapter = _type_adapter(response_model)
+    body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+    response_cache.set(cache_key(request), body, tags, headers)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={**(headers or {}), "X-Cache": "MISS"},
+    )
+
+
+def get_or_build(key: str, response_model, tags: Iterable[str], build: Callable[[], Any], ttl_seconds: Optional[float] = None):
+    """Return the value cached under `key` as `response_model`, or build, cache and return it.
+
+    For values that are reused by several routes (e.g. the stats aggregates),
+    where the cache key cannot be the request URL.
+    """
+    adapter = _type_adapter(response_model)
+    entry = response_cache.get(key) if response_cache.enabled else None
+    if entry is not None:
+        return adapter.validate_json(entry.body)
+    value = adapter.validate_python(build(), from_attributes=True)
+    response_cache.set(key, adapter.dump_json(value), tags, ttl_seconds=ttl_seconds)
+    return value
+
+
+# Invalidation helpers called by the write paths. Tags used by the cached routes:
+#   "sale" / "rent" / "part"  -> list and search responses of that entity
+#   "sale:<id>" / "rent:<id>" -> detail responses (rent details embed their parts)
+#   "part:<id>"               -> part detail responses
+#   "contract"                -> stats aggregates (which also carry the tags above)
+
+def invalidate_sale(apartment_id: Optional[int] = None) -> None:
+    tags = ["sale"]
+    if apartment_id is not None:
+        tags.append(f"sale:{apartment_id}")
+    response_cache.invalidate(*tags)
+
+
+def invalidate_rent(apartment_id: Optional[int] = None) -> None:
+    tags = ["rent"]
+    if apartment_id is not None:
+        tags.append(f"rent:{apartment_id}")
+    response_cache.invalidate(*tags)
+
+
+def invalidate_part(apartment_id: int, part_id: Optional[int] = None) -> None:
+    tags = ["part", f"rent:{apartment_id}"]
+    if part_id is not None:
+        tags.append(f"part:{part_id}")
+    response_cache.invalidate(*tags)
+
+
+def invalidate_contract() -> None:
+    response_cache.invalidate("contract")
@@ -0,0 +1,74 @@
+import csv
+import enum
+import io
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterator
+
+# Media type per export format
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+# Rows fetched from the database per round trip
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+# Bytes collected before a chunk is sent, so the response is not written one row at a time
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+
+def _plain(value):
+    """Turn a column value into what json.dumps writes."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _csv_cell(value):
+    # Empty for missing values and JSON for photo lists, the same as the importer reads them
+    value = _plain(value)
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, list):
+        return json.dumps(value)
+    return value
+
+
+def stream_export(entity_type: str, fmt: str, stmt, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """Yield the rows selected by `stmt` (see crud.exports.build_export_statement) as CSV or NDJSON chunks.
+
+    Runs on sessions of its own because the response is sent after the
+    endpoint, and its request session, have returned.
+    """
+    from database import SessionLocal
+    from crud.exports import get_export_columns, iter_export_rows
+
+    columns = get_export_columns(entity_type)
+    db = SessionLocal()
+    photos_db = SessionLocal()
+    try:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if fmt == "csv":
+            writer.writerow(columns)
+        for row in iter_export_rows(db, photos_db, entity_type, stmt, batch_size):
+            if fmt == "csv":
+                writer.writerow([_csv_cell(row.get(column)) for column in columns])
+            else:
+                buffer.write(json.dumps({column: _plain(row.get(column)) for column in columns}) + "\n")
+            if buffer.tell() >= EXPORT_CHUNK_BYTES:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+    finally:
+        db.close()
+        photos_db.close()
@@ -0,0 +1,74 @@
+import re
+import urllib.parse
+from typing import Dict, Optional, Tuple
+
+_NUMBER = r"(-?\d{1,3}(?:\.\d+)?)"
+_PAIR = re.compile(rf"^\s*{_NUMBER}\s*,\s*{_NUMBER}\s*$")
+# Google Maps place links carry the pin as !3d<lat>!4d<lng> and the viewport as /@<lat>,<lng>,<zoom>z
+_PIN = re.compile(rf"!3d{_NUMBER}!4d{_NUMBER}")
+_VIEWPORT = re.compile(rf"@{_NUMBER},{_NUMBER}")
+# Query parameters holding "lat,lng" in Google, Apple and OpenStreetMap links
+_PAIR_PARAMS = ("q", "query", "ll", "destination", "daddr", "center")
+
+
+def _valid(lat: float, lng: float) -> Optional[Tuple[float, float]]:
+    if -90 <= lat <= 90 and -180 <= lng <= 180:
+        return lat, lng
+    return None
+
+
+def parse_map_link(link: Optional[str]) -> Optional[Tuple[float, float]]:
+    """Extract (latitude, longitude) from a map link or a plain "lat,lng" string.
+
+    Understands Google Maps (/@lat,lng, !3d..!4d.., ?q=/query=/ll=), Apple Maps
+    (?ll=, ?q=) and OpenStreetMap (?mlat=&mlon=, #map=zoom/lat/lng) links.
+    Short links such as maps.app.goo.gl cannot be read without fetching them
+    and give None, as does anything without coordinates.
+    """
+    if not link:
+        return None
+    link = link.strip()
+    match = _PAIR.match(link)
+    if match:
+        return _valid(float(match.group(1)), float(match.group(2)))
+
+    # The pin is more precise than the viewport centre, so it wins when both are present
+    match = _PIN.search(link)
+    if match:
+        return _valid(float(match.group(1)), float(match.group(2)))
+
+    parsed = urllib.parse.urlparse(link)
+    params = urllib.parse.parse_qs(parsed.query)
+    if "mlat" in params and "mlon" in params:
+        try:
+            return _valid(float(params["mlat"][0]), float(params["mlon"][0]))
+        except ValueError:
+            pass
+    for name in _PAIR_PARAMS:
+        for value in params.get(name, ()):
+            match = _PAIR.match(value)
+            if match:
+                return _valid(float(match.group(1)), float(match.group(2)))
+
+    match = _VIEWPORT.search(parsed.path) or _VIEWPORT.search(link)
+    if match:
+        return _valid(float(match.group(1)), float(match.group(2)))
+
+    fragment = re.match(rf"map=\d+(?:\.\d+)?/{_NUMBER}/{_NUMBER}", parsed.fragment)
+    if fragment:
+        return _valid(float(fragment.group(1)), float(fragment.group(2)))
+    return None
+
+
+def fill_coordinates(data: Dict) -> Dict:
+    """Set latitude/longitude in create or update `data` from its location_on_map link.
+
+    Coordinates sent explicitly win. Otherwise they are taken from the link
+    whenever the link is (re)set; a link without coordinates clears them.
+    """
+    if data.get("latitude") is not None and data.get("longitude") is not None:
+        return data
+    if "location_on_map" in data:
+        coordinates = parse_map_link(data["location_on_map"])
+        data["latitude"], data["longitude"] = coordinates if coordinates else (None, None)
+    return data
@@ -0,0 +1,151 @@
+import asyncio
+import io
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Widths of the resized WebP variants generated for every uploaded photo
+VARIANT_WIDTHS = (320, 640, 1280)
+# Width of the blurred-up placeholder shown while the real image loads
+PLACEHOLDER_WIDTH = 24
+WEBP_QUALITY = 80
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def render_variants(content: bytes) -> Dict[str, bytes]:
+    """Resize an image to VARIANT_WIDTHS plus a placeholder, all encoded as WebP.
+
+    Widths larger than the original are skipped (the original width is used
+    instead when it is below the smallest one). Returns {} for content Pillow
+    cannot read, such as PDFs uploaded as contract documents. Runs in the
+    image worker processes.
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        image = Image.open(io.BytesIO(content))
+        image = ImageOps.exif_transpose(image)
+    except (UnidentifiedImageError, OSError):
+        return {}
+    image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+    widths = [width for width in VARIANT_WIDTHS if width < image.width] or [image.width]
+    variants: Dict[str, bytes] = {}
+    for width in widths:
+        variants[f"{width}w"] = _encode(image, width)
+    variants["placeholder"] = _encode(image, min(PLACEHOLDER_WIDTH, image.width), quality=30)
+    return variants
+
+
+def _encode(image, width: int, quality: int = WEBP_QUALITY) -> bytes:
+    height = max(1, round(image.height * width / image.width))
+    buffer = io.BytesIO()
+    image.resize((width, height)).save(buffer, format="WEBP", quality=quality)
+    return buffer.getvalue()
+
+
+def derivative_key(key: str, variant: str) -> str:
+    """'objects/ab/abc.jpg' + '320w' -> 'objects/ab/abc_320w.webp'"""
+    stem, _ = os.path.splitext(key)
+    return f"{stem}_{variant}.webp"
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: the API process runs threads (DB pool, uploads), which fork does not copy safely
+        _pool = ProcessPoolExecutor(max_workers=IMAGE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def shutdown_image_workers() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def generate_photo_variants(saved: List[Tuple[str, str]]) -> None:
+    """Background task run after `upload_photos`: build the variants of each saved
+    original, store them next to it and record them on the photos showing it.
+
+    Uploads are content-addressed, so a photo stored before already has its
+    variants; those are reused instead of rendered again.
+    """
+    from services.storage import get_storage
+
+    storage = get_storage()
+    loop = asyncio.get_running_loop()
+    srcsets = await loop.run_in_executor(None, _known_variants, [url for _, url in saved])
+    rendered: Dict[str, Dict[str, str]] = {}
+    for key, url in saved:
+        if url in srcsets:
+            continue
+        try:
+            content = await loop.run_in_executor(None, storage.read_file, key)
+            variants = await loop.run_in_executor(_get_pool(), render_variants, content)
+            del content
+            urls = {}
+            for variant, data in variants.items():
+                urls[variant] = await loop.run_in_executor(None, storage.save_bytes, derivative_key(key, variant), data)
+            if urls:
+                rendered[url] = urls
+        except Exception:
+            logger.exception("Failed to generate variants for %s", key)
+
+    srcsets.update(rendered)
+    if srcsets:
+        await loop.run_in_executor(None, register_photo_srcsets, srcsets, rendered)
+
+
+def _known_variants(urls: List[str]) -> Dict[str, Dict[str, str]]:
+    from database import SessionLocal
+    from crud.stored_objects import get_object_variants
+
+    db = SessionLocal()
+    try:
+        return get_object_variants(db, urls)
+    finally:
+        db.close()
+
+
+def register_photo_srcsets(
+    srcsets: Dict[str, Dict[str, str]],
+    rendered: Optional[Dict[str, Dict[str, str]]] = None,
+) -> None:
+    """Record `srcsets` on the photo rows showing these URLs and drop the cached responses of their entities.
+
+    Newly `rendered` variants are also recorded on their stored objects for reuse.
+    """
+    from database import SessionLocal
+    from crud.photos import set_photo_variants
+    from crud.stored_objects import set_object_variants
+    from models import ApartmentPart
+    from services.cache import invalidate_sale, invalidate_rent, invalidate_part
+
+    db = SessionLocal()
+    try:
+        if rendered:
+            set_object_variants(db, rendered)
+        owners = set_photo_variants(db, srcsets)
+        db.commit()
+
+        part_ids = [entity_id for entity_type, entity_id in owners if entity_type == "part"]
+        apartment_ids = dict(
+            db.query(ApartmentPart.id, ApartmentPart.apartment_id).filter(ApartmentPart.id.in_(part_ids)).all()
+        ) if part_ids else {}
+        for entity_type, entity_id in owners:
+            if entity_type == "rent":
+                invalidate_rent(entity_id)
+            elif entity_type == "sale":
+                invalidate_sale(entity_id)
+            elif entity_id in apartment_ids:
+                invalidate_part(apartment_ids[entity_id], entity_id)
+    finally:
+        db.close()
@@ -0,0 +1,159 @@
+import csv
+import io
+import json
+import os
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from models import Admin
+from schemas.apartment_sale import ApartmentSaleCreate
+from schemas.apartment_rent import ApartmentRentCreate
+from schemas.apartment_part import ApartmentPartCreate
+
+IMPORT_SCHEMAS = {
+    "sale": ApartmentSaleCreate,
+    "rent": ApartmentRentCreate,
+    "part": ApartmentPartCreate,
+}
+IMPORT_FORMATS = ("csv", "jsonl")
+# Rows validated and inserted per transaction
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "500"))
+# Row errors returned in the report; further ones are only counted
+MAX_REPORTED_ERRORS = 100
+
+
+def detect_format(filename: Optional[str]) -> Optional[str]:
+    """'listings.csv' -> 'csv', 'listings.jsonl' / '.ndjson' -> 'jsonl', anything else -> None."""
+    _, ext = os.path.splitext((filename or "").lower())
+    return {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}.get(ext)
+
+
+def iter_records(stream: BinaryIO, fmt: str) -> Iterator[Tuple[int, object]]:
+    """Yield (row number, record) from a CSV or JSONL byte stream, one row at a time.
+
+    Rows are numbered from 1, not counting the CSV header. A JSONL line that
+    is not valid JSON is yielded as its error message (a str) so the caller
+    can report it without stopping the import.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "csv":
+            for number, row in enumerate(csv.DictReader(text), start=1):
+                # Empty cells are missing values, so schema defaults and required-field errors apply
+                yield number, {field: value for field, value in row.items() if field and value not in ("", None)}
+        else:
+            number = 0
+            for line in text:
+                if not line.strip():
+                    continue
+                number += 1
+                try:
+                    yield number, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield number, f"invalid JSON: {e}"
+    finally:
+        # Leave the underlying file open for its owner
+        text.detach()
+
+
+def _parse_record(entity_type: str, record) -> Tuple[Optional[int], object]:
+    """Validate one raw record. Returns (apartment id for parts, schema instance) or raises ValueError."""
+    if isinstance(record, str):
+        raise ValueError([record])
+    if not isinstance(record, dict):
+        raise ValueError(["row must be a JSON object"])
+    record = dict(record)
+
+    photos = record.get("photos_url")
+    if isinstance(photos, str):
+        # Same rule as parse_photos_url: a JSON array, or a single URL
+        try:
+            record["photos_url"] = json.loads(photos)
+        except json.JSONDecodeError:
+            record["photos_url"] = [photos]
+
+    apartment_id = None
+    if entity_type == "part":
+        try:
+            apartment_id = int(record.pop("apartment_id"))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(["apartment_id: a numeric apartment_id is required"])
+
+    try:
+        return apartment_id, IMPORT_SCHEMAS[entity_type].model_validate(record)
+    except ValidationError as e:
+        raise ValueError([
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+        ])
+
+
+def import_listings(
+    db: Session,
+    entity_type: str,
+    stream: BinaryIO,
+    fmt: str,
+    admin: Admin,
+    start_row: int = 0,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    on_batch: Optional[Callable[[int], None]] = None,
+) -> Dict:
+    """Stream listings from `stream` into the database in batches.
+
+    Each row is validated with the same schema as the create endpoint and the
+    valid rows of a batch are inserted together and committed. Rows up to
+    `start_row` are skipped, so an interrupted import resumes from the
+    `rows_processed` of its last report (or the `on_batch` checkpoint, called
+    after every committed batch). Memory use does not grow with the file size.
+    """
+    from crud.imports import import_listings_batch
+
+    if entity_type not in IMPORT_SCHEMAS:
+        raise ValueError(f"entity_type must be one of: {', '.join(sorted(IMPORT_SCHEMAS))}")
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(IMPORT_FORMATS)}")
+
+    report = {
+        "entity_type": entity_type,
+        "start_row": start_row,
+        "rows_processed": start_row,
+        "imported": 0,
+        "failed": 0,
+        "errors": [],
+    }
+
+    def add_errors(errors: List[Dict]) -> None:
+        report["failed"] += len(errors)
+        room = MAX_REPORTED_ERRORS - len(report["errors"])
+        report["errors"].extend(errors[:max(room, 0)])
+
+    def flush(batch, last_row: int) -> None:
+        if batch:
+            errors = import_listings_batch(db, entity_type, batch, admin)
+            add_errors(errors)
+            report["imported"] += len(batch) - len(errors)
+        report["rows_processed"] = last_row
+        if on_batch:
+            on_batch(last_row)
+
+    batch = []
+    pending_errors: List[Dict] = []
+    last_row = start_row
+    for number, record in iter_records(stream, fmt):
+        if number <= start_row:
+            continue
+        last_row = number
+        try:
+            apartment_id, parsed = _parse_record(entity_type, record)
+            batch.append((number, apartment_id, parsed))
+        except ValueError as e:
+            pending_errors.append({"row": number, "errors": e.args[0]})
+        if len(batch) + len(pending_errors) >= batch_size:
+            add_errors(pending_errors)
+            flush(batch, last_row)
+            batch, pending_errors = [], []
+    add_errors(pending_errors)
+    flush(batch, last_row)
+    report["errors"].sort(key=lambda error: error["row"])
+    return report
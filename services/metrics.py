@@ -0,0 +1,334 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+# Requests that matched no route share one label, so unknown paths cannot grow the series
+UNMATCHED_ROUTE = "unmatched"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class Counter:
+    """A monotonically increasing value per label set, counted here or read from `callback` at scrape time."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Tuple[str, ...] = (),
+        callback: Optional[Callable[[], Iterable[Tuple[Tuple, float]]]] = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.callback = callback
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def collect(self) -> List[str]:
+        if self.callback is not None:
+            values = sorted(self.callback())
+        else:
+            with self._lock:
+                values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in values:
+            lines.append(f"{self.name}{_format_labels(self.labels, labels)} {_format_value(value)}")
+        return lines
+
+
+class Gauge:
+    """A value that goes up and down, either set directly or read from `callback` at scrape time."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Tuple[str, ...] = (),
+        callback: Optional[Callable[[], Iterable[Tuple[Tuple, float]]]] = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.callback = callback
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, labels: Tuple = (), amount: float = 1.0) -> None:
+        self.inc(labels, -amount)
+
+    def collect(self) -> List[str]:
+        if self.callback is not None:
+            values = sorted(self.callback())
+        else:
+            with self._lock:
+                values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        for labels, value in values:
+            lines.append(f"{self.name}{_format_labels(self.labels, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Observations counted into cumulative `le` buckets per label set, with their sum and count."""
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (last one is +Inf)..., sum]
+        self._values: Dict[Tuple, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            values = sorted((labels, list(series)) for labels, series in self._values.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, series in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                bucket_labels = _format_labels(self.labels, labels, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, labels)} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+class RequestCost:
+    """Database work done on behalf of one HTTP request."""
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+# Set by the middleware for the duration of a request. Thread pool calls (sync
+# routes, sync streaming generators) and SQLAlchemy's async greenlets run in a
+# copy of the request's context, so they all add to the same RequestCost.
+_request_cost: ContextVar[Optional[RequestCost]] = ContextVar("request_cost", default=None)
+
+
+def current_request_cost() -> Optional[RequestCost]:
+    return _request_cost.get()
+
+
+def _pool_values(attribute: str) -> List[Tuple[Tuple, float]]:
+    """`attribute` of each connection pool created so far (sync, async), for pools that report it."""
+    import database
+
+    pools = []
+    if database._engine is not None:
+        pools.append(("sync", database._engine.pool))
+    if database._async_engine is not None:
+        pools.append(("async", database._async_engine.sync_engine.pool))
+    values = []
+    for name, pool in pools:
+        method = getattr(pool, attribute, None)
+        if callable(method):
+            values.append(((name,), float(method())))
+    return values
+
+
+def _cache_values(key: str) -> List[Tuple[Tuple, float]]:
+    from services.cache import response_cache
+
+    return [((), float(response_cache.stats()[key]))]
+
+
+registry = MetricsRegistry()
+
+http_requests_total = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route template and status code.", ("method", "route", "status"),
+))
+http_request_duration_seconds = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency, including streamed bodies.", ("method", "route"),
+))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served.", ("method",),
+))
+http_request_db_queries = registry.register(Histogram(
+    "http_request_db_queries", "Database queries run per HTTP request.", ("method", "route"), QUERY_COUNT_BUCKETS,
+))
+http_request_db_seconds_total = registry.register(Counter(
+    "http_request_db_seconds_total", "Time spent in database queries by HTTP requests.", ("method", "route"),
+))
+db_queries_total = registry.register(Counter(
+    "db_queries_total", "Database queries run, in requests or background jobs.",
+))
+db_query_duration_seconds = registry.register(Histogram(
+    "db_query_duration_seconds", "Database query latency.",
+))
+registry.register(Gauge(
+    "db_pool_size", "Configured size of the connection pool.", ("engine",), lambda: _pool_values("size"),
+))
+registry.register(Gauge(
+    "db_pool_checked_out", "Connections currently checked out of the pool.", ("engine",), lambda: _pool_values("checkedout"),
+))
+registry.register(Gauge(
+    "db_pool_checked_in", "Idle connections in the pool.", ("engine",), lambda: _pool_values("checkedin"),
+))
+registry.register(Gauge(
+    "db_pool_overflow", "Connections open beyond the pool size (negative while the pool is not full).", ("engine",),
+    lambda: _pool_values("overflow"),
+))
+registry.register(Gauge(
+    "response_cache_entries", "Entries in the public catalog response cache.", (), lambda: _cache_values("entries"),
+))
+registry.register(Counter(
+    "response_cache_hits_total", "Response cache hits.", (), lambda: _cache_values("hits"),
+))
+registry.register(Counter(
+    "response_cache_misses_total", "Response cache misses.", (), lambda: _cache_values("misses"),
+))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_started")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    db_queries_total.inc()
+    db_query_duration_seconds.observe((), elapsed)
+    cost = _request_cost.get()
+    if cost is not None:
+        cost.queries += 1
+        cost.db_seconds += elapsed
+
+
+def install_query_hooks() -> None:
+    """Time every query of every engine (the async engine runs its queries through a sync Engine too)."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def route_template(scope) -> Optional[str]:
+    """The path template of the route that served `scope`, e.g. /api/v1/apartments/rent/{apartment_id}.
+
+    Newer FastAPI versions leave the route of an included router with its own
+    template, without the include_router prefix; the prefix is then taken back
+    from the request path. None when no route matched.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    regex = getattr(route, "path_regex", None)
+    path = scope.get("path", "")
+    if template and regex is not None and not regex.match(path):
+        for index, char in enumerate(path):
+            if char == "/" and index and regex.match(path[index:]):
+                return path[:index] + template
+    return template
+
+
+def _route_label(scope) -> str:
+    return route_template(scope) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and database cost per route.
+
+    Timing ends when the last body chunk is sent, so streamed exports are
+    measured in full.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        cost = RequestCost()
+        token = _request_cost.set(cost)
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc((method,))
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_flight.dec((method,))
+            _request_cost.reset(token)
+            route = _route_label(scope)
+            http_requests_total.inc((method, route, str(status)))
+            http_request_duration_seconds.observe((method, route), elapsed)
+            http_request_db_queries.observe((method, route), cost.queries)
+            http_request_db_seconds_total.inc((method, route), cost.db_seconds)
+
+
+def render_metrics() -> str:
+    return registry.render()
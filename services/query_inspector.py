@@ -0,0 +1,222 @@
+import logging
+import os
+import re
+import sys
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from services.metrics import route_template
+
+try:
+    import greenlet
+except ImportError:  # only installed along with the async drivers
+    greenlet = None
+
+logger = logging.getLogger(__name__)
+
+INSPECTOR_MODES = ("off", "log", "raise")
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_mode = "off"
+_repeat_threshold = 5
+_slow_query_seconds = 0.2
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|:\w+)"
+# IN (?, ?, ?) lists vary with the number of ids; collapse them so the shape does not
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SELECT_LIST = re.compile(r"^SELECT .+? FROM ", re.IGNORECASE)
+MAX_LOGGED_STATEMENT = 400
+
+
+class QueryInspectionError(RuntimeError):
+    """Raised with QUERY_INSPECTOR=raise when a request runs the same statement shape too often."""
+
+
+def statement_shape(statement: str) -> str:
+    """`statement` with literals and placeholder lists collapsed, so per-row variants compare equal."""
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+def _abbreviate(shape: str) -> str:
+    """A shape short enough to log: the column list elided, the rest cut off."""
+    shape = _SELECT_LIST.sub("SELECT ... FROM ", shape, count=1)
+    if len(shape) > MAX_LOGGED_STATEMENT:
+        shape = shape[:MAX_LOGGED_STATEMENT] + " ..."
+    return shape
+
+
+class RequestInspection:
+    """Statements run on behalf of one HTTP request, by shape."""
+    __slots__ = ("scope", "total", "counts", "sites")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.total = 0
+        self.counts: Dict[str, int] = {}
+        self.sites: Dict[str, str] = {}
+
+    def describe(self) -> str:
+        route = route_template(self.scope) or self.scope.get("path", "?")
+        return f"{self.scope.get('method', '?')} {route}"
+
+
+_inspection: ContextVar[Optional[RequestInspection]] = ContextVar("query_inspection", default=None)
+
+
+def _frames() -> Iterator:
+    """Frames of the current call stack, innermost first.
+
+    AsyncSession runs the ORM in a greenlet whose stack ends at greenlet_spawn;
+    the awaiting crud function is on the parent greenlet, so continue there.
+    """
+    frame = sys._getframe(1)
+    current = greenlet.getcurrent() if greenlet is not None else None
+    while True:
+        while frame is not None:
+            yield frame
+            frame = frame.f_back
+        if current is None or current.parent is None:
+            return
+        current = current.parent
+        frame = current.gr_frame
+
+
+def call_site() -> str:
+    """The innermost line of this project's code that led to the current query.
+
+    Lazy loads during response serialization have no project frame on the
+    stack; the innermost library frame outside SQLAlchemy is given instead.
+    """
+    fallback = None
+    for frame in _frames():
+        filename = frame.f_code.co_filename
+        if filename == __file__:
+            continue
+        location = f":{frame.f_lineno} in {frame.f_code.co_name}"
+        if "site-packages" not in filename and filename.startswith(PROJECT_ROOT):
+            return os.path.relpath(filename, PROJECT_ROOT) + location
+        if fallback is None and "sqlalchemy" not in filename and "site-packages" in filename:
+            fallback = filename.split("site-packages" + os.sep, 1)[1] + location
+    return fallback or "unknown"
+
+
+def _explain(conn, statement: str, parameters, context, executemany: bool) -> Optional[str]:
+    """The plan of a slow SELECT, run on the same connection. None for statements that cannot be explained."""
+    if executemany or not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+    if context is not None and context.execution_options.get("stream_results"):
+        # A server-side cursor is still reading results on this connection
+        return None
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    conn.info["query_inspector_explaining"] = True
+    try:
+        rows = conn.exec_driver_sql(prefix + statement, parameters or None).fetchall()
+    except Exception as e:
+        return f"(EXPLAIN failed: {e})"
+    finally:
+        conn.info["query_inspector_explaining"] = False
+    return "\n".join("    " + " | ".join(str(value) for value in row) for row in rows)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if conn.info.get("query_inspector_explaining"):
+        return
+    # Kept on the statement's execution context, so a failed statement leaves nothing behind
+    context.query_inspector_started = time.perf_counter()
+
+    inspection = _inspection.get()
+    if inspection is None:
+        return
+    inspection.total += 1
+    shape = statement_shape(statement)
+    count = inspection.counts.get(shape, 0) + 1
+    inspection.counts[shape] = count
+    if count == _repeat_threshold:
+        inspection.sites[shape] = call_site()
+        if _mode == "raise":
+            raise QueryInspectionError(
+                f"{inspection.describe()} ran the same statement {count} times "
+                f"(from {inspection.sites[shape]}): {_abbreviate(shape)}"
+            )
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if conn.info.get("query_inspector_explaining"):
+        return
+    started = getattr(context, "query_inspector_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    if elapsed < _slow_query_seconds:
+        return
+    inspection = _inspection.get()
+    origin = inspection.describe() if inspection is not None else "outside a request"
+    plan = _explain(conn, statement, parameters, context, executemany)
+    logger.warning(
+        f"Slow query ({elapsed * 1000:.0f} ms) in {origin} from {call_site()}:\n  {_abbreviate(statement_shape(statement))}"
+        + (f"\n  plan:\n{plan}" if plan else "")
+    )
+
+
+def install_query_inspector(mode: str, repeat_threshold: int, slow_query_ms: float) -> None:
+    """Watch every query of every engine: repeated statement shapes per request, and slow queries."""
+    global _mode, _repeat_threshold, _slow_query_seconds
+    if mode not in INSPECTOR_MODES:
+        raise ValueError(f"QUERY_INSPECTOR must be one of {', '.join(INSPECTOR_MODES)}")
+    _mode = mode
+    _repeat_threshold = max(2, repeat_threshold)
+    _slow_query_seconds = slow_query_ms / 1000
+    if mode == "off":
+        return
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    logger.warning(
+        f"Query inspector enabled ({mode}): statements repeated {_repeat_threshold}+ times per request "
+        f"and queries over {slow_query_ms:.0f} ms are reported"
+    )
+
+
+def inspector_enabled() -> bool:
+    return _mode != "off"
+
+
+class QueryInspectorMiddleware:
+    """ASGI middleware giving the query hooks the request they run for, and reporting its repeated statements."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not inspector_enabled():
+            await self.app(scope, receive, send)
+            return
+
+        inspection = RequestInspection(scope)
+        token = _inspection.set(inspection)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _inspection.reset(token)
+            repeated = [
+                (count, shape) for shape, count in inspection.counts.items() if count >= _repeat_threshold
+            ]
+            if repeated and _mode == "log":
+                lines = [
+                    f"  {count}x from {inspection.sites.get(shape, 'unknown')}: {_abbreviate(shape)}"
+                    for count, shape in sorted(repeated, reverse=True)
+                ]
+                logger.warning(
+                    f"Possible N+1 in {inspection.describe()}: {inspection.total} statements, repeated:\n"
+                    + "\n".join(lines)
+                )
@@ -0,0 +1,113 @@
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").strip().lower() in ("1", "true", "yes", "on")
+# How often the contract lifecycle job runs (across all workers)
+CONTRACT_JOB_INTERVAL_SECONDS = float(os.getenv("CONTRACT_JOB_INTERVAL_SECONDS", "3600"))
+# Studios whose contract ends within this many days are marked upcoming_end
+CONTRACT_UPCOMING_END_DAYS = int(os.getenv("CONTRACT_UPCOMING_END_DAYS", "30"))
+# Wait after startup before the first attempt, so a restarting fleet does not stampede the lease
+SCHEDULER_START_DELAY_SECONDS = float(os.getenv("SCHEDULER_START_DELAY_SECONDS", "30"))
+
+CONTRACT_LIFECYCLE_JOB = "contract_lifecycle"
+
+# Identifies this process as a lease owner
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def run_contract_lifecycle(upcoming_days: int = CONTRACT_UPCOMING_END_DAYS) -> Dict:
+    """One run of the contract lifecycle job. Returns the transition counts and the time taken."""
+    from database import SessionLocal
+    from crud.rental_contracts import apply_contract_lifecycle
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        report = apply_contract_lifecycle(db, upcoming_days=upcoming_days)
+        report["duration_ms"] = round((time.perf_counter() - started) * 1000)
+        return report
+    finally:
+        db.close()
+
+
+def run_leased(name: str, interval_seconds: float, job: Callable[[], Dict], owner: str = WORKER_ID) -> Optional[Dict]:
+    """Run `job` if this process holds (or can take) the lease `name`. Returns its report, or None if skipped.
+
+    The lease is held for `interval_seconds` and renewed by the holder on its
+    next tick, so only one worker runs the job per interval. If the holder
+    dies, its lease runs out and another worker takes over.
+    """
+    from database import SessionLocal
+    from crud.leases import acquire_lease, record_lease_run
+
+    db = SessionLocal()
+    try:
+        if not acquire_lease(db, name, owner, interval_seconds):
+            return None
+        started_at = datetime.utcnow()
+        report = job()
+        record_lease_run(db, name, owner, started_at, report.get("duration_ms", 0))
+        logger.info(f"Job {name} finished: {report}")
+        return report
+    finally:
+        db.close()
+
+
+class Scheduler:
+    """Runs leased jobs periodically in a background thread of each worker."""
+
+    def __init__(self):
+        self._jobs: List[tuple] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_job(self, name: str, interval_seconds: float, job: Callable[[], Dict]) -> None:
+        self._jobs.append((name, interval_seconds, job))
+
+    def start(self, delay_seconds: float = SCHEDULER_START_DELAY_SECONDS) -> None:
+        if self._thread is not None or not self._jobs:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(delay_seconds,), name="scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+
+    def _run(self, delay_seconds: float) -> None:
+        due = {name: time.monotonic() + delay_seconds for name, _, _ in self._jobs}
+        while not self._stop.is_set():
+            for name, interval, job in self._jobs:
+                if time.monotonic() < due[name]:
+                    continue
+                due[name] = time.monotonic() + interval
+                try:
+                    run_leased(name, interval, job)
+                except Exception as e:
+                    # Keep the thread alive; the next interval tries again
+                    logger.error(f"Job {name} failed: {e}")
+            self._stop.wait(max(0.0, min(due.values()) - time.monotonic()))
+
+
+scheduler = Scheduler()
+scheduler.add_job(CONTRACT_LIFECYCLE_JOB, CONTRACT_JOB_INTERVAL_SECONDS, run_contract_lifecycle)
+
+
+def start_scheduler() -> None:
+    if SCHEDULER_ENABLED:
+        scheduler.start()
+
+
+def stop_scheduler() -> None:
+    scheduler.stop()
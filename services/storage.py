@@ -1,17 +1,98 @@
+import hashlib
+import io
 import os
-from typing import List, Tuple
-from uuid import uuid4
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import BinaryIO, List, Optional, Tuple, Union
+
+# Files are copied to storage in chunks of this size, so memory use per upload stays flat
+CHUNK_SIZE = 1024 * 1024
+# S3 requires every part but the last to be at least 5 MB
+S3_PART_SIZE = 8 * 1024 * 1024
+# Per-file upload cap
+MAX_UPLOAD_FILE_BYTES = int(os.getenv("MAX_UPLOAD_FILE_BYTES", str(10 * 1024 * 1024)))
+# Files of one upload request sent to S3 in parallel (each holds up to two parts in memory)
+S3_UPLOAD_CONCURRENCY = int(os.getenv("S3_UPLOAD_CONCURRENCY", "4"))
+
+FileSource = Union[bytes, BinaryIO]
+
+
+class FileTooLargeError(ValueError):
+    def __init__(self, filename: str, max_bytes: int):
+        super().__init__(f"File '{filename}' exceeds the {max_bytes} byte upload limit")
+        self.filename = filename
+        self.max_bytes = max_bytes
+
+
+class SaveFilesError(Exception):
+    """A file of a `save_files` batch failed. `error` is what went wrong and
+    `saved` the (key, url) of the files of the batch stored anyway."""
+
+    def __init__(self, error: Exception, saved: List[Tuple[str, str]]):
+        super().__init__(str(error))
+        self.error = error
+        self.saved = saved
+
+
+def iter_chunks(source: FileSource, filename: str, max_bytes: Optional[int], chunk_size: int = CHUNK_SIZE):
+    """Yield `source` in chunks, raising FileTooLargeError once it grows past `max_bytes`."""
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    total = 0
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            return
+        total += len(chunk)
+        if max_bytes is not None and total > max_bytes:
+            raise FileTooLargeError(filename, max_bytes)
+        yield chunk
+
+
+def content_key(sha256_hex: str, filename: Optional[str]) -> str:
+    """Storage key of a file's content: identical bytes always map to the same key."""
+    _, ext = os.path.splitext(filename or "")
+    return f"objects/{sha256_hex[:2]}/{sha256_hex}{ext.lower()}"
 
 
 class StorageBackend:
-    def save_files(self, entity_type: str, entity_id: int, filenames_and_bytes: List[Tuple[str, bytes]]) -> List[Tuple[str, str]]:
+    def save_files(
+        self,
+        entity_type: str,
+        entity_id: int,
+        files: List[Tuple[str, FileSource]],
+        max_bytes: Optional[int] = MAX_UPLOAD_FILE_BYTES,
+    ) -> List[Tuple[str, str]]:
         """
         Save multiple files.
 
+        Each file is given as (original name, bytes or binary file object) and is
+        streamed to storage chunk by chunk while its SHA-256 is computed. Files
+        are stored under `content_key`, so content that is already stored is not
+        written again. If a file fails (e.g. FileTooLargeError when it is
+        larger than `max_bytes`) SaveFilesError is raised, listing the files
+        stored anyway so the caller can track them.
+
+        `entity_type` and `entity_id` are kept for callers and no longer affect
+        the key; reference counting of shared objects lives in crud/stored_objects.py.
+
         Returns list of (key, url) for each saved file.
         """
         raise NotImplementedError
 
+    def delete(self, key: str) -> None:
+        """Remove the object stored under `key`, if any."""
+        raise NotImplementedError
+
+    def read_file(self, key: str) -> bytes:
+        """Return the content stored under `key`."""
+        raise NotImplementedError
+
+    def save_bytes(self, key: str, content: bytes) -> str:
+        """Store `content` under an exact `key` (e.g. a derivative of an upload). Returns its URL."""
+        raise NotImplementedError
+
 
 class LocalStorage(StorageBackend):
     def __init__(self, base_dir: str = "uploads", public_base_path: str = "/uploads"):
@@ -21,55 +102,205 @@ class LocalStorage(StorageBackend):
     def _ensure_dir(self, path: str) -> None:
         os.makedirs(path, exist_ok=True)
 
-    def _safe_name(self, original: str) -> str:
-        _, ext = os.path.splitext(original)
-        return f"{uuid4().hex}{ext.lower()}"
-
-    def save_files(self, entity_type: str, entity_id: int, filenames_and_bytes: List[Tuple[str, bytes]]) -> List[Tuple[str, str]]:
-        target_dir = os.path.join(self.base_dir, entity_type, str(entity_id))
-        self._ensure_dir(target_dir)
+    def save_files(
+        self,
+        entity_type: str,
+        entity_id: int,
+        files: List[Tuple[str, FileSource]],
+        max_bytes: Optional[int] = MAX_UPLOAD_FILE_BYTES,
+    ) -> List[Tuple[str, str]]:
+        incoming_dir = os.path.join(self.base_dir, ".incoming")
+        self._ensure_dir(incoming_dir)
 
         results: List[Tuple[str, str]] = []
-        for original_name, content in filenames_and_bytes:
-            safe_name = self._safe_name(original_name or "file")
-            disk_path = os.path.join(target_dir, safe_name)
-            with open(disk_path, "wb") as f:
-                f.write(content)
-            key = f"{entity_type}/{entity_id}/{safe_name}"
+        for original_name, source in files:
+            try:
+                key = self._save_file(incoming_dir, original_name, source, max_bytes)
+            except Exception as e:
+                raise SaveFilesError(e, results) from e
             url = f"{self.public_base_path}/{key}"
             results.append((key, url))
         return results
 
+    def _save_file(self, incoming_dir: str, filename: str, source: FileSource, max_bytes: Optional[int]) -> str:
+        # The key depends on the content, so write to a temporary file while hashing
+        fd, temp_path = tempfile.mkstemp(dir=incoming_dir)
+        try:
+            digest = hashlib.sha256()
+            with os.fdopen(fd, "wb") as f:
+                for chunk in iter_chunks(source, filename, max_bytes):
+                    digest.update(chunk)
+                    f.write(chunk)
+            key = content_key(digest.hexdigest(), filename)
+            disk_path = os.path.join(self.base_dir, key)
+            if os.path.exists(disk_path):
+                os.remove(temp_path)  # identical bytes are already stored
+            else:
+                self._ensure_dir(os.path.dirname(disk_path))
+                os.replace(temp_path, disk_path)
+        except BaseException:
+            # Do not leave a truncated file behind
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return key
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(os.path.join(self.base_dir, key))
+        except FileNotFoundError:
+            pass
+
+    def read_file(self, key: str) -> bytes:
+        with open(os.path.join(self.base_dir, key), "rb") as f:
+            return f.read()
+
+    def save_bytes(self, key: str, content: bytes) -> str:
+        disk_path = os.path.join(self.base_dir, key)
+        self._ensure_dir(os.path.dirname(disk_path))
+        with open(disk_path, "wb") as f:
+            f.write(content)
+        return f"{self.public_base_path}/{key}"
+
 
 class S3Storage(StorageBackend):
-    def __init__(self, bucket: str, region: str | None = None, public_base_url: str | None = None):
+    """S3 backend. Build it once per process (see `get_storage`): the boto3 client
+    and its connection pool are shared by all requests, and files of a batch
+    upload in parallel on a bounded thread pool."""
+
+    def __init__(
+        self,
+        bucket: str,
+        region: str | None = None,
+        public_base_url: str | None = None,
+        endpoint_url: str | None = None,
+        max_concurrency: int = S3_UPLOAD_CONCURRENCY,
+    ):
         try:
             import boto3  # type: ignore
+            from botocore.config import Config  # type: ignore
         except Exception as e:  # pragma: no cover
             raise RuntimeError("boto3 is required for S3Storage. Please install boto3.") from e
         self._boto3 = boto3
         self.bucket = bucket
         self.region = region
         self.public_base_url = public_base_url.rstrip("/") if public_base_url else None
-        self.client = boto3.client("s3", region_name=region) if region else boto3.client("s3")
+        # boto3 clients are thread-safe; size the pool so every upload thread gets a connection
+        client_config = Config(max_pool_connections=max(10, max_concurrency))
+        self.client = boto3.client("s3", region_name=region, endpoint_url=endpoint_url, config=client_config)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="s3-upload")
 
-    def _safe_name(self, original: str) -> str:
-        _, ext = os.path.splitext(original)
-        return f"{uuid4().hex}{ext.lower()}"
+    def _url(self, key: str) -> str:
+        if self.public_base_url:
+            return f"{self.public_base_url}/{key}"
+        return f"s3://{self.bucket}/{key}"
 
-    def save_files(self, entity_type: str, entity_id: int, filenames_and_bytes: List[Tuple[str, bytes]]) -> List[Tuple[str, str]]:
-        results: List[Tuple[str, str]] = []
-        for original_name, content in filenames_and_bytes:
-            key_name = self._safe_name(original_name or "file")
-            key = f"{entity_type}/{entity_id}/{key_name}"
-            self.client.put_object(Bucket=self.bucket, Key=key, Body=content, ContentType=_guess_mime_from_name(original_name))
-            if self.public_base_url:
-                url = f"{self.public_base_url}/{key}"
-            else:
-                url = f"s3://{self.bucket}/{key}"
-            results.append((key, url))
+    def save_files(
+        self,
+        entity_type: str,
+        entity_id: int,
+        files: List[Tuple[str, FileSource]],
+        max_bytes: Optional[int] = MAX_UPLOAD_FILE_BYTES,
+    ) -> List[Tuple[str, str]]:
+        futures = [
+            self._executor.submit(self._save_file, original_name, source, max_bytes)
+            for original_name, source in files
+        ]
+        # Let every upload finish before reporting the first failure, in input order
+        wait(futures)
+        results = [(future.result(), self._url(future.result())) for future in futures if future.exception() is None]
+        errors = [future.exception() for future in futures if future.exception() is not None]
+        if errors:
+            raise SaveFilesError(errors[0], results) from errors[0]
         return results
 
+    def _save_file(self, filename: str, source: FileSource, max_bytes: Optional[int]) -> str:
+        """Hash `source`, then upload it unless the bucket already has it.
+
+        A seekable source (bytes, or the temporary file the multipart parser
+        spooled the upload to) is read twice, once to hash it and once to
+        upload it. Any other stream is copied to a small spooled buffer first.
+        """
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+        if not _is_seekable(source):
+            with tempfile.SpooledTemporaryFile(max_size=CHUNK_SIZE) as spool:
+                for chunk in iter_chunks(source, filename, max_bytes):
+                    spool.write(chunk)
+                spool.seek(0)
+                return self._save_file(filename, spool, None)
+
+        start = source.tell()
+        digest = hashlib.sha256()
+        for chunk in iter_chunks(source, filename, max_bytes):
+            digest.update(chunk)
+        key = content_key(digest.hexdigest(), filename)
+        if not self._exists(key):
+            source.seek(start)
+            self._upload(key, source, filename, None)
+        return key
+
+    def _exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError  # type: ignore
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def read_file(self, key: str) -> bytes:
+        return self.client.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+
+    def save_bytes(self, key: str, content: bytes) -> str:
+        self.client.put_object(Bucket=self.bucket, Key=key, Body=content, ContentType=_guess_mime_from_name(key))
+        return self._url(key)
+
+    def _upload(self, key: str, source: FileSource, filename: str, max_bytes: Optional[int]) -> None:
+        """Upload one file without reading it into memory as a whole.
+
+        A file that fits in one S3_PART_SIZE part is sent with a single
+        put_object call. Larger files use a multipart upload, which is aborted
+        if anything fails midway.
+        """
+        content_type = _guess_mime_from_name(filename)
+        chunks = iter_chunks(source, filename, max_bytes, chunk_size=S3_PART_SIZE)
+        first = next(chunks, b"")
+        body = next(chunks, None)
+        if body is None:
+            self.client.put_object(Bucket=self.bucket, Key=key, Body=first, ContentType=content_type)
+            return
+
+        upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=key, ContentType=content_type)["UploadId"]
+        try:
+            parts = [self._upload_part(key, upload_id, 1, first)]
+            del first
+            while body is not None:
+                parts.append(self._upload_part(key, upload_id, len(parts) + 1, body))
+                body = next(chunks, None)
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+            )
+        except BaseException:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+            raise
+
+    def _upload_part(self, key: str, upload_id: str, number: int, body: bytes) -> dict:
+        response = self.client.upload_part(Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=body)
+        return {"ETag": response["ETag"], "PartNumber": number}
+
+
+def _is_seekable(source: BinaryIO) -> bool:
+    try:
+        return source.seekable()
+    except (AttributeError, ValueError):
+        return False
+
 
 def _guess_mime_from_name(filename: str | None) -> str:
     if not filename:
@@ -86,6 +317,12 @@ def _guess_mime_from_name(filename: str | None) -> str:
     return "application/octet-stream"
 
 
+@lru_cache(maxsize=None)
+def get_storage() -> StorageBackend:
+    """Process-wide storage backend, built from the environment on first use."""
+    return get_storage_from_env()
+
+
 def get_storage_from_env() -> StorageBackend:
     backend = os.getenv("STORAGE_BACKEND", "local").strip().lower()
     if backend == "s3":
@@ -94,7 +331,8 @@ def get_storage_from_env() -> StorageBackend:
             raise RuntimeError("S3_BUCKET env var is required when STORAGE_BACKEND=s3")
         region = os.getenv("S3_REGION")
         public_base = os.getenv("S3_PUBLIC_BASE_URL")
-        return S3Storage(bucket=bucket, region=region, public_base_url=public_base)
+        endpoint_url = os.getenv("S3_ENDPOINT_URL")  # e.g. MinIO or another S3-compatible service
+        return S3Storage(bucket=bucket, region=region, public_base_url=public_base, endpoint_url=endpoint_url)
     # default local
     base_dir = os.getenv("UPLOADS_DIR", "uploads")
     public_path = os.getenv("UPLOADS_PUBLIC_BASE_PATH", "/uploads")
@@ -74,17 +74,19 @@ def _clear_sample_domain_data():
     """Delete all domain sample data (contracts, parts, apartments) while preserving admins."""
     db = SessionLocal()
     try:
-        from models import ApartmentRent, ApartmentSale, ApartmentPart, RentalContract
-        # 1) Delete contracts -> 2) parts -> 3) apartments (rent, sale)
+        from models import ApartmentRent, ApartmentSale, ApartmentPart, RentalContract, Photo
+        # 1) Delete contracts -> 2) photos -> 3) parts -> 4) apartments (rent, sale)
         db.query(RentalContract).delete(synchronize_session=False)
         db.commit()
+        db.query(Photo).delete(synchronize_session=False)
+        db.commit()
         db.query(ApartmentPart).delete(synchronize_session=False)
         db.commit()
         db.query(ApartmentRent).delete(synchronize_session=False)
         db.commit()
         db.query(ApartmentSale).delete(synchronize_session=False)
         db.commit()
-        print("Cleared existing sample domain data (contracts, parts, apartments). Admins preserved.")
+        print("Cleared existing sample domain data (contracts, photos, parts, apartments). Admins preserved.")
     except Exception as e:
         print(f"Error clearing sample data: {e}")
         db.rollback()
@@ -98,7 +100,7 @@ def setup_sample_data(super_admin: Admin):
     try:
         from models import ApartmentRent, ApartmentSale, ApartmentPart, RentalContract
         from models.enums import BathroomTypeEnum, FurnishedEnum, BalconyEnum, PartStatusEnum, CustomerSourceEnum
-        import json
+        from crud.photos import set_photo_urls
         from datetime import date, timedelta
 
         # Always reset domain data before seeding, keep admins intact
@@ -119,10 +121,6 @@ def setup_sample_data(super_admin: Admin):
                 bedrooms=1,
                 bathrooms=BathroomTypeEnum.private,
                 description="Luxury studio with modern amenities",
-                photos_url=json.dumps([
-                    "https://example.com/photos/luxury-studio-1.jpg",
-                    "https://example.com/photos/luxury-studio-2.jpg"
-                ]),
                 location_on_map="https://maps.google.com/example3",
                 facilities_amenities="24/7 Security, Elevator, Balcony, Air Conditioning, Gym",
                 floor=8,
@@ -140,9 +138,6 @@ def setup_sample_data(super_admin: Admin):
                 bedrooms=1,
                 bathrooms=BathroomTypeEnum.private,
                 description="Affordable housing for students",
-                photos_url=json.dumps([
-                    "https://example.com/photos/student-1.jpg"
-                ]),
                 location_on_map="https://maps.google.com/example4",
                 facilities_amenities="Elevator, Security",
                 floor=5,
@@ -164,10 +159,6 @@ def setup_sample_data(super_admin: Admin):
                 bedrooms=3,
                 bathrooms=BathroomTypeEnum.private,
                 description="Beautiful family house perfect for investment",
-                photos_url=json.dumps([
-                    "https://example.com/photos/villa-exterior.jpg",
-                    "https://example.com/photos/villa-interior.jpg"
-                ]),
                 location_on_map="https://maps.google.com/example6",
                 facilities_amenities="Garden, Parking, Security, Air Conditioning",
                 listed_by_admin_id=admin_id,
@@ -186,6 +177,19 @@ def setup_sample_data(super_admin: Admin):
         for apartment in sample_rent_apartments:
             db.refresh(apartment)
 
+        set_photo_urls(db, "rent", sample_rent_apartments[0].id, [
+            "https://example.com/photos/luxury-studio-1.jpg",
+            "https://example.com/photos/luxury-studio-2.jpg"
+        ])
+        set_photo_urls(db, "rent", sample_rent_apartments[1].id, [
+            "https://example.com/photos/student-1.jpg"
+        ])
+        set_photo_urls(db, "sale", sample_sale_apartments[0].id, [
+            "https://example.com/photos/villa-exterior.jpg",
+            "https://example.com/photos/villa-interior.jpg"
+        ])
+        db.commit()
+
         # Create apartment parts for the first rent apartment
         primary_rent_apartment = sample_rent_apartments[0]
         parts = [
@@ -201,9 +205,6 @@ def setup_sample_data(super_admin: Admin):
                 furnished=FurnishedEnum.yes,
                 balcony=BalconyEnum.yes,
                 description="Cozy studio with balcony and AC",
-                photos_url=json.dumps([
-                    "https://example.com/photos/studio-a1.jpg"
-                ]),
                 created_by_admin_id=admin_id,
             ),
             ApartmentPart(
@@ -218,9 +219,6 @@ def setup_sample_data(super_admin: Admin):
                 furnished=FurnishedEnum.no,
                 balcony=BalconyEnum.no,
                 description="Bright studio, great value",
-                photos_url=json.dumps([
-                    "https://example.com/photos/studio-b1.jpg"
-                ]),
                 created_by_admin_id=admin_id,
             ),
         ]
@@ -231,6 +229,10 @@ def setup_sample_data(super_admin: Admin):
         for part in parts:
             db.refresh(part)
 
+        set_photo_urls(db, "part", parts[0].id, ["https://example.com/photos/studio-a1.jpg"])
+        set_photo_urls(db, "part", parts[1].id, ["https://example.com/photos/studio-b1.jpg"])
+        db.commit()
+
         # Create a rental contract for the rented part (second part)
         rented_part = parts[1]
         start_date = date.today().replace(day=1)
@@ -275,7 +277,7 @@ def setup_sample_parts_for_existing(super_admin: Admin, force: bool = False):
     try:
         from models import ApartmentRent, ApartmentPart, RentalContract
         from models.enums import BathroomTypeEnum, FurnishedEnum, BalconyEnum, PartStatusEnum, CustomerSourceEnum
-        import json
+        from crud.photos import set_photo_urls, delete_entity_photos
         from datetime import date, timedelta
 
         rent_apartment = db.query(ApartmentRent).order_by(ApartmentRent.id.asc()).first()
@@ -303,7 +305,6 @@ def setup_sample_parts_for_existing(super_admin: Admin, force: bool = False):
                 furnished=FurnishedEnum.yes,
                 balcony=BalconyEnum.yes,
                 description="Cozy studio with balcony and AC",
-                photos_url=json.dumps(["https://example.com/photos/studio-a1.jpg"]),
                 created_by_admin_id=admin_id,
             ),
             ApartmentPart(
@@ -318,7 +319,6 @@ def setup_sample_parts_for_existing(super_admin: Admin, force: bool = False):
                 furnished=FurnishedEnum.no,
                 balcony=BalconyEnum.no,
                 description="Bright studio, great value",
-                photos_url=json.dumps(["https://example.com/photos/studio-b1.jpg"]),
                 created_by_admin_id=admin_id,
             ),
         ]
@@ -333,6 +333,7 @@ def setup_sample_parts_for_existing(super_admin: Admin, force: bool = False):
                     RentalContract.apartment_part_id.in_(existing_part_ids)
                 ).delete(synchronize_session=False)
                 db.commit()
+                delete_entity_photos(db, "part", existing_part_ids)
                 db.query(ApartmentPart).filter(
                     ApartmentPart.id.in_(existing_part_ids)
                 ).delete(synchronize_session=False)
@@ -344,6 +345,10 @@ def setup_sample_parts_for_existing(super_admin: Admin, force: bool = False):
         for part in parts:
             db.refresh(part)
 
+        set_photo_urls(db, "part", parts[0].id, ["https://example.com/photos/studio-a1.jpg"])
+        set_photo_urls(db, "part", parts[1].id, ["https://example.com/photos/studio-b1.jpg"])
+        db.commit()
+
         rented_part = parts[1]
         start_date = date.today().replace(day=1)
         end_date = start_date + timedelta(days=365)
@@ -49,9 +49,8 @@ echo "🎉 Setup completed!"
 echo ""
 echo "Next steps:"
 echo "1. Edit .env file with your database credentials"
-echo "2. Create MySQL database: CREATE DATABASE real_estate_db;"
-echo "3. Run migrations: alembic upgrade head"
-echo "4. Create super admin: python create_super_admin.py"
-echo "5. Start the application: uvicorn main:app --reload"
+echo "2. Create the database and tables: python init_db.py"
+echo "3. Create super admin: python create_super_admin.py"
+echo "4. Start the application: uvicorn main:app --reload"
 echo ""
 echo "📖 API Documentation will be available at: http://localhost:8000/docs"
@@ -0,0 +1,147 @@
+"""Shared fixtures: the app on a temporary SQLite database built by the migrations.
+
+The environment is set before anything of the app is imported, since
+database.py and the services read their settings at import time.
+"""
+
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+WORKDIR = tempfile.mkdtemp(prefix="ao-tests-")
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{os.path.join(WORKDIR, 'test.db')}",
+    SCHEDULER_ENABLED="false",
+    RESPONSE_CACHE_ENABLED="false",
+    QUERY_INSPECTOR="off",
+    STORAGE_BACKEND="local",
+    UPLOADS_DIR=os.path.join(WORKDIR, "uploads"),
+)
+
+
+@pytest.fixture(scope="session")
+def app():
+    from migrate import upgrade
+
+    upgrade()
+    import main
+
+    return main.app
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    from fastapi.testclient import TestClient
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def db(app):
+    from database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def record_statements():
+    """Context manager collecting the (statement, parameters) run by every engine (sync and async) inside it."""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    @contextmanager
+    def recording():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+
+        event.listen(Engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(Engine, "before_cursor_execute", record)
+
+    return recording
+
+
+@pytest.fixture
+def response_cache(monkeypatch):
+    """The response cache, enabled and empty for one test (the suite runs with it disabled)."""
+    from services.cache import response_cache
+
+    monkeypatch.setattr(response_cache, "enabled", True)
+    response_cache.clear()
+    yield response_cache
+    response_cache.clear()
+
+
+_admins = iter(range(1, 1_000_000))
+
+
+@pytest.fixture
+def make_admin(db):
+    return lambda role=None: _make_admin(db, role)
+
+
+@pytest.fixture
+def make_rent_apartments(db):
+    return lambda admin, count, parts=2, photos=2: _make_rent_apartments(db, admin, count, parts, photos)
+
+
+def _make_admin(db, role=None):
+    """An admin with a unique email and phone, and the Authorization header of a token for it."""
+    from dependencies import create_access_token
+    from models import Admin, AdminRoleEnum
+
+    n = next(_admins)
+    admin = Admin(
+        full_name=f"Test Admin {n}",
+        email=f"admin{n}@example.com",
+        phone=f"+2010{n:08d}",
+        role=role or AdminRoleEnum.studio_rental,
+        password="not-a-real-hash",
+    )
+    db.add(admin)
+    db.commit()
+    return admin, {"Authorization": f"Bearer {create_access_token({'sub': admin.id})}"}
+
+
+def _make_rent_apartments(db, admin, count: int, parts: int = 2, photos: int = 2):
+    """`count` rent apartments of `admin`, each with `parts` studios; every listing gets `photos` photos."""
+    from models import ApartmentPart, ApartmentRent, Photo
+    from models.enums import BalconyEnum, BathroomTypeEnum, FurnishedEnum
+
+    apartments = []
+    for i in range(count):
+        apartment = ApartmentRent(
+            name=f"Apartment {i}", location="maadi", address="1 Test Street", area=80, number=f"A-{i}",
+            price=5000, bedrooms=2, bathrooms=BathroomTypeEnum.private, contact_number=admin.phone,
+            floor=i % 10, total_parts=parts, listed_by_admin_id=admin.id,
+        )
+        db.add(apartment)
+        db.flush()
+        apartments.append(apartment)
+        for n in range(parts):
+            part = ApartmentPart(
+                apartment_id=apartment.id, title=f"Studio {i}-{n}", area=25, floor=apartment.floor,
+                monthly_price=2000 + 100 * n, bedrooms=1, bathrooms=BathroomTypeEnum.private,
+                furnished=FurnishedEnum.yes, balcony=BalconyEnum.no, created_by_admin_id=admin.id,
+            )
+            db.add(part)
+            db.flush()
+            db.add_all(Photo(entity_type="part", entity_id=part.id, position=p, url=f"/uploads/part-{part.id}-{p}.jpg") for p in range(photos))
+        db.add_all(Photo(entity_type="rent", entity_id=apartment.id, position=p, url=f"/uploads/rent-{apartment.id}-{p}.jpg") for p in range(photos))
+    db.commit()
+    return apartments
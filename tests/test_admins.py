@@ -0,0 +1,59 @@
+"""Admin writes: phone numbers unique however written, and passwords hashed in the bounded password pool."""
+
+import threading
+
+import dependencies
+from models import AdminRoleEnum
+
+
+def _reformatted(phone: str) -> str:
+    """'+201000000001' -> '+20 100 000-0001'"""
+    return f"{phone[:3]} {phone[3:6]} {phone[6:9]}-{phone[9:]}"
+
+
+def test_create_rejects_a_phone_registered_in_another_format(client, make_admin):
+    existing, _ = make_admin()
+    _, headers = make_admin(AdminRoleEnum.super_admin)
+
+    response = client.post("/api/v1/admins/", json={
+        "full_name": "Duplicate", "email": "duplicate-phone@example.com", "phone": _reformatted(existing.phone),
+        "role": "studio_rental", "password": "secret123",
+    }, headers=headers)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Phone number already registered"
+
+
+def test_update_rejects_another_admins_phone(client, make_admin):
+    existing, _ = make_admin()
+    other, _ = make_admin()
+    _, headers = make_admin(AdminRoleEnum.super_admin)
+
+    response = client.put(f"/api/v1/admins/{other.id}", json={"phone": _reformatted(existing.phone)}, headers=headers)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Phone number already registered"
+
+
+def test_admin_passwords_are_hashed_in_the_password_pool(client, make_admin, monkeypatch):
+    _, headers = make_admin(AdminRoleEnum.super_admin)
+    hash_password = dependencies.pwd_context.hash
+    threads = []
+
+    def record_thread(password):
+        threads.append(threading.current_thread().name)
+        return hash_password(password)
+
+    monkeypatch.setattr(dependencies.pwd_context, "hash", record_thread)
+    response = client.post("/api/v1/admins/", json={
+        "full_name": "Pooled", "email": "pooled-hash@example.com", "phone": "+201099999001",
+        "role": "studio_rental", "password": "secret123",
+    }, headers=headers)
+    assert response.status_code == 200, response.text
+    response = client.put(f"/api/v1/admins/{response.json()['id']}", json={"password": "secret456"}, headers=headers)
+    assert response.status_code == 200, response.text
+
+    assert len(threads) == 2
+    assert all(name.startswith("password-hash") for name in threads)
+    login = client.post("/api/v1/auth/login", data={"username": "pooled-hash@example.com", "password": "secret456"})
+    assert login.status_code == 200, login.text
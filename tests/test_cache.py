@@ -0,0 +1,84 @@
+"""Writes drop the cached public responses they change, so the next read shows them."""
+
+from datetime import date
+
+from models import AdminRoleEnum
+
+
+def _get(client, url):
+    response = client.get(url)
+    assert response.status_code == 200, response.text
+    return response.headers["X-Cache"], response.json()
+
+
+def _part_id(db, apartment_id):
+    from models import ApartmentPart
+
+    return db.query(ApartmentPart.id).filter(ApartmentPart.apartment_id == apartment_id).scalar()
+
+
+def _by_id(items, item_id):
+    return next(item for item in items if item["id"] == item_id)
+
+
+def test_updating_a_rent_apartment_refreshes_the_cached_list(client, make_admin, make_rent_apartments, response_cache):
+    admin, headers = make_admin()
+    apartment_id = make_rent_apartments(admin, 1, parts=0, photos=0)[0].id
+    url = "/api/v1/apartments/rent?limit=10000"
+    _get(client, url)
+    assert _get(client, url)[0] == "HIT"
+
+    response = client.put(f"/api/v1/apartments/rent/{apartment_id}", json={"price": 7777}, headers=headers)
+    assert response.status_code == 200, response.text
+
+    cache, apartments = _get(client, url)
+    assert cache == "MISS"
+    assert float(_by_id(apartments, apartment_id)["price"]) == 7777
+
+
+def test_updating_a_part_refreshes_its_detail_and_its_apartment(client, db, make_admin, make_rent_apartments, response_cache):
+    admin, headers = make_admin()
+    apartment = make_rent_apartments(admin, 1, parts=1, photos=0)[0]
+    part_id = _part_id(db, apartment.id)
+    part_url, apartment_url = f"/api/v1/apartments/parts/{part_id}", f"/api/v1/apartments/rent/{apartment.id}"
+    for url in (part_url, apartment_url):
+        _get(client, url)
+        assert _get(client, url)[0] == "HIT"
+
+    response = client.put(part_url, json={"monthly_price": 3333}, headers=headers)
+    assert response.status_code == 200, response.text
+
+    assert float(_get(client, part_url)[1]["monthly_price"]) == 3333
+    assert float(_by_id(_get(client, apartment_url)[1]["apartment_parts"], part_id)["monthly_price"]) == 3333
+
+
+def test_moving_a_contract_refreshes_the_cached_availability(client, db, make_admin, make_rent_apartments, response_cache):
+    from crud.rental_contracts import create_rental_contract
+    from schemas.rental_contract import RentalContractCreate
+
+    admin, headers = make_admin()
+    part_id = _part_id(db, make_rent_apartments(admin, 1, parts=1, photos=0)[0].id)
+    contract = create_rental_contract(db, RentalContractCreate(
+        apartment_part_id=part_id, customer_name="Tenant", customer_phone="+201000000000", customer_id_number="1",
+        how_did_customer_find_us="facebook", paid_deposit=0, warrant_amount=0, commission=0, rent_price=4000,
+        rent_start_date=date(2041, 1, 1), rent_end_date=date(2041, 2, 28), rent_period=2,
+    ), created_by_admin_id=admin.id)
+    url = "/api/v1/apartments/parts/available?from=2041-06-01&to=2041-06-30&limit=10000"
+    assert part_id in {part["id"] for part in _get(client, url)[1]}
+    assert _get(client, url)[0] == "HIT"
+
+    response = client.put(f"/api/v1/rental-contracts/{contract.id}", json={
+        "rent_start_date": "2041-06-01", "rent_end_date": "2041-07-31",
+    }, headers=headers)
+    assert response.status_code == 200, response.text
+
+    assert part_id not in {part["id"] for part in _get(client, url)[1]}
+
+
+def test_cache_stats_are_for_super_admins(client, make_admin):
+    _, headers = make_admin()
+    _, super_headers = make_admin(AdminRoleEnum.super_admin)
+
+    assert client.get("/cache/stats").status_code == 401
+    assert client.get("/cache/stats", headers=headers).status_code == 403
+    assert client.get("/cache/stats", headers=super_headers).json().keys() >= {"hits", "misses", "entries"}
@@ -0,0 +1,70 @@
+"""The contract lifecycle job: its status transitions, and the lease that lets one worker at a time run it."""
+
+from datetime import date, datetime, timedelta
+
+from crud.leases import acquire_lease
+from crud.rental_contracts import apply_contract_lifecycle
+
+TODAY = date(2030, 6, 1)
+
+
+def _studio(db, admin, make_rent_apartments, status, rent_end_date, is_active=True):
+    """A studio with `status` and a contract ending on `rent_end_date`; returns (part, contract)."""
+    from models import ApartmentPart, RentalContract
+
+    apartment_id = make_rent_apartments(admin, 1, parts=1, photos=0)[0].id
+    part = db.query(ApartmentPart).filter(ApartmentPart.apartment_id == apartment_id).one()
+    part.status = status
+    contract = RentalContract(
+        apartment_part_id=part.id, customer_name="Tenant", customer_phone="+201000000000", customer_id_number="1",
+        how_did_customer_find_us="facebook", paid_deposit=0, warrant_amount=0, commission=0, rent_price=4000,
+        rent_start_date=rent_end_date - timedelta(days=180), rent_end_date=rent_end_date, rent_period=6,
+        is_active=is_active, created_by_admin_id=admin.id,
+    )
+    db.add(contract)
+    db.commit()
+    return part, contract
+
+
+def test_lifecycle_moves_studios_and_contracts_along(db, make_admin, make_rent_apartments):
+    from models import PartStatusEnum
+
+    # Settle the contracts of other tests first, so the report only counts the ones below
+    apply_contract_lifecycle(db, today=TODAY)
+    admin, _ = make_admin()
+    ending = _studio(db, admin, make_rent_apartments, PartStatusEnum.rented, TODAY + timedelta(days=19))
+    extended = _studio(db, admin, make_rent_apartments, PartStatusEnum.upcoming_end, TODAY + timedelta(days=200))
+    expired = _studio(db, admin, make_rent_apartments, PartStatusEnum.rented, TODAY - timedelta(days=1))
+    running = _studio(db, admin, make_rent_apartments, PartStatusEnum.rented, TODAY + timedelta(days=200))
+    ended = _studio(db, admin, make_rent_apartments, PartStatusEnum.available, TODAY - timedelta(days=90), is_active=False)
+
+    report = apply_contract_lifecycle(db, today=TODAY)
+
+    assert report == {"upcoming_end": 1, "extended": 1, "expired": 1}
+    db.expire_all()
+    assert [(part.status, contract.is_active) for part, contract in (ending, extended, expired, running, ended)] == [
+        (PartStatusEnum.upcoming_end, True),
+        (PartStatusEnum.rented, True),
+        (PartStatusEnum.available, False),
+        (PartStatusEnum.rented, True),
+        (PartStatusEnum.available, False),
+    ]
+    assert apply_contract_lifecycle(db, today=TODAY) == {"upcoming_end": 0, "extended": 0, "expired": 0}
+
+
+def test_a_held_lease_is_refused_to_another_worker(db):
+    now = datetime(2030, 6, 1, 12, 0)
+
+    assert acquire_lease(db, "held-lease", "worker-a", 60, now=now)
+    assert not acquire_lease(db, "held-lease", "worker-b", 60, now=now + timedelta(seconds=30))
+    # The holder renews it
+    assert acquire_lease(db, "held-lease", "worker-a", 60, now=now + timedelta(seconds=45))
+    assert not acquire_lease(db, "held-lease", "worker-b", 60, now=now + timedelta(seconds=90))
+
+
+def test_an_expired_lease_is_taken_over(db):
+    now = datetime(2030, 6, 1, 12, 0)
+    assert acquire_lease(db, "expired-lease", "worker-a", 60, now=now)
+
+    assert acquire_lease(db, "expired-lease", "worker-b", 60, now=now + timedelta(seconds=60))
+    assert not acquire_lease(db, "expired-lease", "worker-a", 60, now=now + timedelta(seconds=61))
@@ -0,0 +1,54 @@
+"""Full-text q= search on SQLite: FTS5 ranking, and the triggers keeping the FTS table in step with the listings."""
+
+from sqlalchemy import text
+
+
+def _search_rent(client, q):
+    response = client.get("/api/v1/apartments/rent", params={"q": q, "limit": 100})
+    assert response.status_code == 200, response.text
+    return [apartment["id"] for apartment in response.json()]
+
+
+def _fts_ids(db, terms):
+    return db.execute(
+        text("SELECT rowid FROM apartment_rents_fts WHERE apartment_rents_fts MATCH :terms"), {"terms": terms}
+    ).scalars().all()
+
+
+def test_q_returns_matching_listings_best_first(client, db, make_admin, make_rent_apartments):
+    admin, _ = make_admin()
+    strong, weak, other = make_rent_apartments(admin, 3, parts=0, photos=0)
+    strong.name, strong.description = "Zanzibarquay loft", "Zanzibarquay views from every room"
+    weak.description = "A quiet flat with many rooms, a large kitchen, two balconies and, further down the road, zanzibarquay"
+    other.description = "Nothing to see here"
+    db.commit()
+
+    assert _search_rent(client, "zanzibarquay") == [strong.id, weak.id]
+
+
+def test_q_matches_any_word_and_ignores_query_syntax(client, db, make_admin, make_rent_apartments):
+    admin, _ = make_admin()
+    first, second = make_rent_apartments(admin, 2, parts=0, photos=0)
+    first.location, second.facilities_amenities = "Quillmarsh", "Rooftop pool, quillpond gym"
+    db.commit()
+
+    assert set(_search_rent(client, "quillmarsh quillpond")) == {first.id, second.id}
+    assert _search_rent(client, 'quillmarsh" OR NOT (') == [first.id]
+    assert _search_rent(client, "*:-") == []
+
+
+def test_triggers_follow_updates_and_deletes(db, make_admin, make_rent_apartments):
+    admin, _ = make_admin()
+    apartment = make_rent_apartments(admin, 1, parts=0, photos=0)[0]
+    apartment.name = "Brindlecove studio"
+    db.commit()
+    assert _fts_ids(db, "brindlecove") == [apartment.id]
+
+    apartment.name = "Marrowgate studio"
+    db.commit()
+    assert _fts_ids(db, "brindlecove") == []
+    assert _fts_ids(db, "marrowgate") == [apartment.id]
+
+    db.delete(apartment)
+    db.commit()
+    assert _fts_ids(db, "marrowgate") == []
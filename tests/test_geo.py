@@ -0,0 +1,93 @@
+"""Map search: reading coordinates from map links, and near=/radius=/bbox= on the R*Tree mirror."""
+
+from itertools import count
+
+import pytest
+from sqlalchemy import text
+
+from services.geo import parse_map_link
+
+# Far from the coordinates of any other test, and two degrees apart per test, so only its own listings are in range
+CENTERS = ((12.0 + 2 * n, 34.0) for n in count())
+
+
+@pytest.mark.parametrize("link, expected", [
+    ("12.5, 34.25", (12.5, 34.25)),
+    ("https://www.google.com/maps/@30.0444,31.2357,15z", (30.0444, 31.2357)),
+    ("https://www.google.com/maps/place/Cairo/@30.05,31.24,14z/data=!3d30.0444!4d31.2357", (30.0444, 31.2357)),
+    ("https://www.google.com/maps/search/?api=1&query=30.0444,31.2357", (30.0444, 31.2357)),
+    ("https://maps.apple.com/?ll=30.0444,31.2357&q=Cairo", (30.0444, 31.2357)),
+    ("https://www.openstreetmap.org/?mlat=30.0444&mlon=31.2357#map=15/30.05/31.24", (30.0444, 31.2357)),
+    ("https://www.openstreetmap.org/#map=15/-33.8688/151.2093", (-33.8688, 151.2093)),
+    ("https://maps.app.goo.gl/AbCdEf123", None),
+    ("95, 31", None),
+    ("", None),
+    (None, None),
+])
+def test_parse_map_link(link, expected):
+    assert parse_map_link(link) == expected
+
+
+def _search_rent(client, **params):
+    response = client.get("/api/v1/apartments/rent", params={**params, "limit": 100})
+    assert response.status_code == 200, response.text
+    return [apartment["id"] for apartment in response.json()]
+
+
+@pytest.fixture
+def placed(db, make_admin, make_rent_apartments):
+    """A fresh centre and four listings about 1, 5, 20 and 200 km east of it."""
+    center = next(CENTERS)
+    admin, headers = make_admin()
+    apartments = make_rent_apartments(admin, 4, parts=0, photos=0)
+    for apartment, km in zip(apartments, (5, 1, 200, 20)):
+        apartment.latitude, apartment.longitude = center[0], center[1] + km / 109
+    db.commit()
+    east5, east1, east200, east20 = apartments
+    return center, headers, (east1, east5, east20, east200)
+
+
+def test_near_orders_by_distance_and_cuts_at_radius(client, placed):
+    (lat, lng), _, (east1, east5, east20, east200) = placed
+    near = f"{lat},{lng}"
+
+    assert _search_rent(client, near=near, radius=30) == [east1.id, east5.id, east20.id]
+    assert _search_rent(client, near=near, radius=3) == [east1.id]
+
+
+def test_bbox_keeps_listings_inside_the_viewport(client, placed):
+    (lat, lng), _, (east1, east5, east20, east200) = placed
+    bbox = f"{lng + 3 / 109},{lat - 0.1},{lng + 30 / 109},{lat + 0.1}"
+
+    assert set(_search_rent(client, bbox=bbox)) == {east5.id, east20.id}
+    assert _search_rent(client, bbox=bbox, near=f"{lat},{lng + 1}") == [east20.id, east5.id]
+
+
+@pytest.mark.parametrize("params", [{"radius": 5}, {"near": "12,abc"}, {"near": "12,34", "radius": 501}, {"bbox": "34,12,33,13"}])
+def test_invalid_geo_parameters_are_rejected(client, params):
+    assert client.get("/api/v1/apartments/rent", params=params).status_code == 400
+
+
+def test_an_update_moves_the_listing_in_the_rtree(client, db, placed):
+    (lat, lng), headers, (east1, *_) = placed
+
+    def rtree_row():
+        row = db.execute(
+            text("SELECT min_lat, min_lng FROM apartment_rents_rtree WHERE id = :id"), {"id": east1.id}
+        ).one_or_none()
+        return tuple(row) if row else None
+
+    assert rtree_row() == pytest.approx((lat, lng + 1 / 109), abs=1e-4)
+
+    link = f"https://www.google.com/maps/@{lat + 1},{lng},15z"
+    response = client.put(f"/api/v1/apartments/rent/{east1.id}", json={"location_on_map": link}, headers=headers)
+
+    assert response.status_code == 200, response.text
+    assert rtree_row() == pytest.approx((lat + 1, lng), abs=1e-4)
+    assert _search_rent(client, near=f"{lat + 1},{lng}", radius=1) == [east1.id]
+    assert east1.id not in _search_rent(client, near=f"{lat},{lng}", radius=30)
+
+    response = client.put(f"/api/v1/apartments/rent/{east1.id}", json={"location_on_map": "no coordinates"}, headers=headers)
+
+    assert response.status_code == 200, response.text
+    assert rtree_row() is None
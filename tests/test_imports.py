@@ -0,0 +1,135 @@
+"""Listing imports: the per-row error report, resuming with start_row, and the ids read back after bulk inserts."""
+
+import io
+import json
+
+import pytest
+
+from crud.bulk import insert_returning_ids
+from services.importer import import_listings
+
+PART_COLUMNS = "apartment_id,title,area,monthly_price,bedrooms,bathrooms,furnished,balcony"
+
+
+def _part_row(apartment_id, title, **overrides):
+    row = dict(
+        apartment_id=apartment_id, title=title, area="30", monthly_price="2500", bedrooms="1",
+        bathrooms="private", furnished="yes", balcony="no",
+    )
+    row.update(overrides)
+    return ",".join(str(row[column]) for column in PART_COLUMNS.split(","))
+
+
+def _part_titles(db, apartment_id):
+    from models import ApartmentPart
+
+    db.expire_all()
+    return [title for (title,) in db.query(ApartmentPart.title).filter(ApartmentPart.apartment_id == apartment_id).order_by(ApartmentPart.id)]
+
+
+def test_failed_rows_are_reported_and_the_rest_imported(client, db, make_admin, make_rent_apartments):
+    admin, headers = make_admin()
+    other, _ = make_admin()
+    apartment_id = make_rent_apartments(admin, 1, parts=0, photos=0)[0].id
+    foreign_id = make_rent_apartments(other, 1, parts=0, photos=0)[0].id
+    csv_file = "\n".join([
+        PART_COLUMNS,
+        _part_row(apartment_id, "Imported 1"),
+        _part_row(apartment_id, "", bedrooms="many"),
+        _part_row(999999, "Missing apartment"),
+        _part_row("abc", "No apartment id"),
+        _part_row(foreign_id, "Not my apartment"),
+        _part_row(apartment_id, "Imported 2"),
+    ])
+
+    response = client.post(
+        "/api/v1/import/part", files={"file": ("parts.csv", csv_file.encode(), "text/csv")}, headers=headers,
+    )
+
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert (report["imported"], report["failed"], report["rows_processed"]) == (2, 4, 6)
+    assert [error["row"] for error in report["errors"]] == [2, 3, 4, 5]
+    assert [message.split(":")[0] for message in report["errors"][0]["errors"]] == ["title", "bedrooms"]
+    assert report["errors"][1]["errors"] == ["apartment_id: apartment 999999 not found"]
+    assert report["errors"][2]["errors"] == ["apartment_id: a numeric apartment_id is required"]
+    assert report["errors"][3]["errors"] == ["apartment_id: only the admin who created the apartment can create parts for it"]
+    assert _part_titles(db, apartment_id) == ["Imported 1", "Imported 2"]
+    assert _part_titles(db, foreign_id) == []
+
+
+def test_invalid_jsonl_lines_are_reported(db, make_admin, make_rent_apartments):
+    admin, _ = make_admin()
+    apartment_id = make_rent_apartments(admin, 1, parts=0, photos=0)[0].id
+    valid = json.dumps(dict(apartment_id=apartment_id, title="From JSONL", area=30, monthly_price=2500, bedrooms=1,
+                            bathrooms="private", furnished="no", balcony="no"))
+    stream = io.BytesIO(f"{valid}\n{{not json\n[1, 2]\n".encode())
+
+    report = import_listings(db, "part", stream, "jsonl", admin)
+
+    assert (report["imported"], report["failed"]) == (1, 2)
+    assert report["errors"][0]["row"] == 2 and report["errors"][0]["errors"][0].startswith("invalid JSON")
+    assert report["errors"][1] == {"row": 3, "errors": ["row must be a JSON object"]}
+    assert _part_titles(db, apartment_id) == ["From JSONL"]
+
+
+def test_an_interrupted_import_resumes_from_its_checkpoint(db, make_admin, make_rent_apartments):
+    admin, _ = make_admin()
+    apartment_id = make_rent_apartments(admin, 1, parts=0, photos=0)[0].id
+    csv_file = "\n".join([PART_COLUMNS] + [_part_row(apartment_id, f"Studio {n}") for n in range(1, 8)]).encode()
+    checkpoints = []
+
+    def interrupt_after_two_batches(rows_processed):
+        checkpoints.append(rows_processed)
+        if len(checkpoints) == 2:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        import_listings(db, "part", io.BytesIO(csv_file), "csv", admin, batch_size=2, on_batch=interrupt_after_two_batches)
+    report = import_listings(db, "part", io.BytesIO(csv_file), "csv", admin, start_row=checkpoints[-1], batch_size=2)
+
+    assert checkpoints == [2, 4]
+    assert (report["start_row"], report["imported"], report["rows_processed"]) == (4, 3, 7)
+    assert _part_titles(db, apartment_id) == [f"Studio {n}" for n in range(1, 8)]
+
+
+def _part_rows(admin, apartment_ids):
+    from models.enums import BalconyEnum, BathroomTypeEnum, FurnishedEnum
+
+    return [
+        dict(apartment_id=apartment_id, title=f"Bulk {n}", area=30, floor=1, monthly_price=2500, bedrooms=1,
+             bathrooms=BathroomTypeEnum.private, furnished=FurnishedEnum.no, balcony=BalconyEnum.no, created_by_admin_id=admin.id)
+        for n, apartment_id in enumerate(apartment_ids)
+    ]
+
+
+def test_insert_returning_ids_reads_the_ids_back_in_row_order(db, make_admin, make_rent_apartments):
+    from models import ApartmentPart
+
+    admin, _ = make_admin()
+    apartment_id = make_rent_apartments(admin, 1, parts=2, photos=0)[0].id
+    rows = _part_rows(admin, [apartment_id] * 3)
+
+    ids = insert_returning_ids(db, ApartmentPart, rows, ApartmentPart.apartment_id == apartment_id)
+    db.commit()
+
+    assert [db.get(ApartmentPart, part_id).title for part_id in ids] == ["Bulk 0", "Bulk 1", "Bulk 2"]
+    assert len(_part_titles(db, apartment_id)) == 5
+
+
+def test_insert_returning_ids_falls_back_when_the_readback_does_not_match(db, make_admin, make_rent_apartments):
+    from models import ApartmentPart
+
+    admin, _ = make_admin()
+    first, second = (apartment.id for apartment in make_rent_apartments(admin, 2, parts=0, photos=0))
+    rows = _part_rows(admin, [first, second, first])
+
+    # The scope only covers `first`, so the readback finds two rows for three sent
+    ids = insert_returning_ids(db, ApartmentPart, rows, ApartmentPart.apartment_id == first)
+    db.commit()
+
+    assert [(db.get(ApartmentPart, part_id).apartment_id, db.get(ApartmentPart, part_id).title) for part_id in ids] == [
+        (first, "Bulk 0"), (second, "Bulk 1"), (first, "Bulk 2"),
+    ]
+    assert _part_titles(db, first) == ["Bulk 0", "Bulk 2"]
+    assert _part_titles(db, second) == ["Bulk 1"]
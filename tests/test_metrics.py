@@ -0,0 +1,85 @@
+"""Prometheus metrics: the /metrics text, and what MetricsMiddleware records per route."""
+
+import re
+import time
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from services.metrics import PROMETHEUS_CONTENT_TYPE, MetricsMiddleware, UNMATCHED_ROUTE, render_metrics
+
+RENT_DETAIL = "/api/v1/apartments/rent/{apartment_id}"
+
+
+def _sample(name, **labels):
+    """The value of the `name` sample with exactly `labels` in the current scrape, 0 when absent."""
+    wanted = ",".join(f'{label}="{value}"' for label, value in labels.items())
+    pattern = re.compile(rf"^{re.escape(name)}(?:\{{{re.escape(wanted)}\}})? (\S+)$", re.MULTILINE)
+    match = pattern.search(render_metrics())
+    return float(match.group(1)) if match else 0.0
+
+
+def test_metrics_endpoint_serves_the_prometheus_text(client):
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == PROMETHEUS_CONTENT_TYPE
+    for name in ("http_requests_total", "http_request_duration_seconds", "http_request_db_queries", "db_pool_checked_out"):
+        assert f"# TYPE {name} " in response.text
+
+
+def test_requests_are_counted_by_route_template_and_status(client, make_admin, make_rent_apartments):
+    admin, _ = make_admin()
+    apartment_id = make_rent_apartments(admin, 1, parts=0, photos=0)[0].id
+    found = _sample("http_requests_total", method="GET", route=RENT_DETAIL, status="200")
+    missing = _sample("http_requests_total", method="GET", route=RENT_DETAIL, status="404")
+    unmatched = _sample("http_requests_total", method="GET", route=UNMATCHED_ROUTE, status="404")
+
+    assert client.get(f"/api/v1/apartments/rent/{apartment_id}").status_code == 200
+    assert client.get("/api/v1/apartments/rent/999999").status_code == 404
+    assert client.get(f"/no-such-page/{apartment_id}").status_code == 404
+
+    assert _sample("http_requests_total", method="GET", route=RENT_DETAIL, status="200") == found + 1
+    assert _sample("http_requests_total", method="GET", route=RENT_DETAIL, status="404") == missing + 1
+    assert _sample("http_requests_total", method="GET", route=UNMATCHED_ROUTE, status="404") == unmatched + 1
+    assert f'route="/no-such-page/{apartment_id}"' not in render_metrics()
+
+
+def test_queries_are_counted_per_request(client, make_admin, make_rent_apartments, record_statements):
+    admin, _ = make_admin()
+    apartment_id = make_rent_apartments(admin, 1, parts=2, photos=1)[0].id
+    requests = _sample("http_request_db_queries_count", method="GET", route=RENT_DETAIL)
+    queries = _sample("http_request_db_queries_sum", method="GET", route=RENT_DETAIL)
+
+    with record_statements() as statements:
+        assert client.get(f"/api/v1/apartments/rent/{apartment_id}").status_code == 200
+
+    assert len(statements) > 0
+    assert _sample("http_request_db_queries_count", method="GET", route=RENT_DETAIL) == requests + 1
+    assert _sample("http_request_db_queries_sum", method="GET", route=RENT_DETAIL) == queries + len(statements)
+
+
+def test_streamed_responses_are_timed_until_the_last_chunk():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics-test/slow-stream")
+    def slow_stream():
+        def chunks():
+            for _ in range(3):
+                time.sleep(0.1)
+                yield b"chunk\n"
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    labels = dict(method="GET", route="/metrics-test/slow-stream")
+    count = _sample("http_request_duration_seconds_count", **labels)
+    total = _sample("http_request_duration_seconds_sum", **labels)
+
+    response = TestClient(app).get("/metrics-test/slow-stream")
+
+    assert response.text == "chunk\n" * 3
+    assert _sample("http_request_duration_seconds_count", **labels) == count + 1
+    assert _sample("http_request_duration_seconds_sum", **labels) - total >= 0.3
+    assert _sample("http_request_duration_seconds_bucket", **labels, le="0.25") == 0
@@ -0,0 +1,102 @@
+"""Adoption of databases created before migrations, and the revisions that bring them up to date."""
+
+import json
+
+import pytest
+from alembic import command
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.pool import NullPool
+
+import database
+from migrate import alembic_config, upgrade
+
+
+@pytest.fixture
+def database_url(tmp_path, monkeypatch):
+    """Point the migrations at an empty SQLite database of their own."""
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    monkeypatch.setattr(database, "DATABASE_URL", url)
+    return url
+
+
+def _execute(url, *statements):
+    engine = create_engine(url, poolclass=NullPool)
+    with engine.begin() as connection:
+        for statement in statements:
+            connection.execute(text(statement))
+    engine.dispose()
+
+
+def _query(url, statement):
+    engine = create_engine(url, poolclass=NullPool)
+    with engine.connect() as connection:
+        rows = connection.execute(text(statement)).all()
+    engine.dispose()
+    return rows
+
+
+def _pre_migration_database(url, *statements):
+    """The baseline schema with `statements` run on it, no longer stamped, like a database created by the API on startup."""
+    upgrade("0001")
+    _execute(url, *statements, "DROP TABLE alembic_version")
+
+
+def test_pre_migration_database_is_adopted_and_backfilled(database_url):
+    _pre_migration_database(
+        database_url,
+        "INSERT INTO admins (id, full_name, email, phone, role, password) "
+        "VALUES (1, 'Admin', 'a@example.com', '+971 (50) 123-4567', 'super_admin', 'x')",
+        "INSERT INTO apartment_rents (id, name, location, address, area, number, price, bedrooms, bathrooms, "
+        "contact_number, photos_url, location_on_map, floor, total_parts, listed_by_admin_id) "
+        "VALUES (1, 'Marina View', 'Dubai Marina', 'Street 1', 80, '101', 5000, 2, 'private', '+971', "
+        f"'{json.dumps(['/a.jpg', '/b.jpg', '/a.jpg'])}', 'https://maps.google.com/?q=25.08,55.14', 3, 2, 1)",
+    )
+
+    upgrade()
+
+    assert _query(database_url, "SELECT phone_normalized FROM admins") == [("+971501234567",)]
+    assert _query(database_url, "SELECT url, position FROM photos WHERE entity_type = 'rent' ORDER BY position") == [
+        ("/a.jpg", 0), ("/b.jpg", 1),
+    ]
+    assert _query(database_url, "SELECT latitude, longitude FROM apartment_rents") == [(25.08, 55.14)]
+    assert _query(database_url, "SELECT id FROM apartment_rents_rtree") == [(1,)]
+    assert _query(database_url, "SELECT rowid FROM apartment_rents_fts WHERE apartment_rents_fts MATCH 'marina'") == [(1,)]
+    command.check(alembic_config())
+
+
+def test_adoption_recreates_missing_indexes_and_triggers(database_url):
+    upgrade()
+    _execute(
+        database_url,
+        "DROP INDEX ix_admins_role",
+        "DROP INDEX ix_apartment_parts_status_monthly_price",
+        "DROP TRIGGER apartment_rents_fts_ai",
+        "DROP TABLE alembic_version",
+    )
+
+    upgrade()
+
+    inspector = inspect(create_engine(database_url, poolclass=NullPool))
+    assert "ix_admins_role" in {index["name"] for index in inspector.get_indexes("admins")}
+    assert "ix_apartment_parts_status_monthly_price" in {index["name"] for index in inspector.get_indexes("apartment_parts")}
+    assert _query(database_url, "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name = 'apartment_rents_fts_ai'")
+
+
+def test_database_lacking_baseline_columns_is_not_adopted(database_url):
+    _pre_migration_database(database_url, "ALTER TABLE apartment_parts DROP COLUMN balcony")
+
+    with pytest.raises(RuntimeError, match="apartment_parts.balcony"):
+        upgrade()
+
+
+def test_admins_sharing_a_normalized_phone_are_reported(database_url):
+    upgrade("0010")
+    _execute(
+        database_url,
+        "INSERT INTO admins (full_name, email, phone, phone_normalized, role, password) "
+        "VALUES ('A', 'a@example.com', '+20 100 123 4567', '+201001234567', 'studio_rental', 'x'), "
+        "('B', 'b@example.com', '+20-100-123-4567', '+201001234567', 'studio_rental', 'x')",
+    )
+
+    with pytest.raises(RuntimeError, match=r"\+201001234567 \(admins 1, 2\)"):
+        upgrade()
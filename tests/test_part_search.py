@@ -0,0 +1,104 @@
+"""Studio search: facet counts describe every match of the filters, and availability leaves out booked studios."""
+
+from collections import Counter
+from datetime import date
+
+import pytest
+
+from crud.apartment_parts import search_available_apartment_parts
+from schemas.apartment_part import ApartmentPartSearchFilters
+
+
+def _make_parts(db, make_rent_apartments, admin, *specs):
+    """One part per spec (column values), in an apartment of `admin`; returns their ids.
+
+    Each test gives its parts an area (900 and up) no other test uses, so its
+    searches only match them.
+    """
+    from models import ApartmentPart
+
+    apartment_id = make_rent_apartments(admin, 1, parts=len(specs), photos=0)[0].id
+    parts = db.query(ApartmentPart).filter(ApartmentPart.apartment_id == apartment_id).order_by(ApartmentPart.id).all()
+    for part, spec in zip(parts, specs):
+        for column, value in spec.items():
+            setattr(part, column, value)
+    db.commit()
+    return [part.id for part in parts]
+
+
+def _search(client, **params):
+    response = client.get("/api/v1/apartments/parts/search", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_facets_count_every_match_of_the_filters(client, db, make_admin, make_rent_apartments):
+    from models.enums import BalconyEnum, BathroomTypeEnum, FurnishedEnum
+
+    admin, _ = make_admin()
+    specs = [
+        dict(furnished=FurnishedEnum.yes, balcony=BalconyEnum.yes, bathrooms=BathroomTypeEnum.private, monthly_price=1500, area=900),
+        dict(furnished=FurnishedEnum.yes, balcony=BalconyEnum.no, bathrooms=BathroomTypeEnum.shared, monthly_price=2500, area=901),
+        dict(furnished=FurnishedEnum.no, balcony=BalconyEnum.shared, bathrooms=BathroomTypeEnum.private, monthly_price=2999, area=902),
+        dict(furnished=FurnishedEnum.yes, balcony=BalconyEnum.yes, bathrooms=BathroomTypeEnum.private, monthly_price=12000, area=903),
+        # Outside the searched areas
+        dict(furnished=FurnishedEnum.yes, balcony=BalconyEnum.yes, bathrooms=BathroomTypeEnum.private, monthly_price=2500, area=904),
+    ]
+    _make_parts(db, make_rent_apartments, admin, *specs)
+
+    result = _search(client, min_area=900, max_area=903, limit=2)
+
+    assert result["total"] == 4
+    assert len(result["items"]) == 2
+    assert result["facets"]["furnished"] == {"yes": 3, "no": 1}
+    assert result["facets"]["balcony"] == {"yes": 2, "shared": 1, "no": 1}
+    assert result["facets"]["bathrooms"] == {"private": 3, "shared": 1}
+    buckets = {float(bucket["min_price"]): bucket["count"] for bucket in result["facets"]["price_buckets"]}
+    assert buckets == {0: 1, 2000: 2, 3000: 0, 4000: 0, 5000: 0, 7500: 0, 10000: 1}
+
+
+def test_facets_follow_an_added_filter(client, db, make_admin, make_rent_apartments):
+    from models.enums import FurnishedEnum
+
+    admin, _ = make_admin()
+    _make_parts(db, make_rent_apartments, admin, *(
+        dict(furnished=furnished, monthly_price=price, area=area)
+        for furnished, price, area in ((FurnishedEnum.yes, 2000, 910), (FurnishedEnum.no, 2100, 911), (FurnishedEnum.no, 2200, 912))
+    ))
+
+    result = _search(client, min_area=910, max_area=912, furnished="no", limit=100)
+
+    assert result["total"] == len(result["items"]) == 2
+    assert result["facets"]["furnished"] == {"yes": 0, "no": 2}
+    assert Counter(item["furnished"] for item in result["items"]) == {"no": 2}
+
+
+@pytest.mark.parametrize("start, end, is_active, free", [
+    (date(2042, 1, 1), date(2042, 5, 31), True, True),  # ends the day before the range
+    (date(2042, 1, 1), date(2042, 6, 1), True, False),  # ends on its first day
+    (date(2042, 6, 30), date(2042, 9, 30), True, False),  # starts on its last day
+    (date(2042, 6, 10), date(2042, 6, 20), True, False),  # inside it
+    (date(2042, 7, 1), date(2042, 9, 30), True, True),  # starts the day after
+    (date(2042, 1, 1), date(2042, 12, 31), False, True),  # overlaps, but no longer active
+])
+def test_availability_leaves_out_studios_booked_in_the_range(db, make_admin, make_rent_apartments, start, end, is_active, free):
+    from models import RentalContract
+
+    admin, _ = make_admin()
+    part_id = _make_parts(db, make_rent_apartments, admin, {"area": 920})[0]
+    db.add(RentalContract(
+        apartment_part_id=part_id, customer_name="Tenant", customer_phone="+201000000000", customer_id_number="1",
+        how_did_customer_find_us="facebook", paid_deposit=0, warrant_amount=0, commission=0, rent_price=4000,
+        rent_start_date=start, rent_end_date=end, rent_period=1, is_active=is_active, created_by_admin_id=admin.id,
+    ))
+    db.commit()
+
+    parts = search_available_apartment_parts(db, date(2042, 6, 1), date(2042, 6, 30), ApartmentPartSearchFilters(min_area=920, max_area=920), limit=10000)
+
+    assert (part_id in {part.id for part in parts}) == free
+
+
+def test_availability_rejects_a_reversed_range(client):
+    response = client.get("/api/v1/apartments/parts/available", params={"from": "2042-06-30", "to": "2042-06-01"})
+
+    assert response.status_code == 400
@@ -0,0 +1,66 @@
+"""Photo rows: appending them during concurrent uploads, and recording the variants of shared URLs."""
+
+import crud.photos
+from crud.photos import append_photos, get_photos
+
+
+def test_append_photos_skips_a_url_attached_meanwhile(db, make_admin, make_rent_apartments, monkeypatch):
+    from database import SessionLocal
+    from models import Photo
+
+    admin, _ = make_admin()
+    apartment_id = make_rent_apartments(admin, 1, parts=0, photos=1)[0].id
+    get_object_keys = crud.photos.get_object_keys
+
+    def attach_concurrently(session, urls):
+        # Another upload commits the same URL after this one read the entity's photos
+        other = SessionLocal()
+        other.add(Photo(entity_type="rent", entity_id=apartment_id, position=1, url="/uploads/same.jpg"))
+        other.commit()
+        other.close()
+        return get_object_keys(session, urls)
+
+    monkeypatch.setattr(crud.photos, "get_object_keys", attach_concurrently)
+    added = append_photos(db, "rent", apartment_id, [{"url": "/uploads/same.jpg"}, {"url": "/uploads/new.jpg"}])
+    db.commit()
+
+    assert [photo.url for photo in added] == ["/uploads/new.jpg"]
+    assert [photo.url for photo in get_photos(db, "rent", apartment_id)] == [
+        f"/uploads/rent-{apartment_id}-0.jpg", "/uploads/same.jpg", "/uploads/new.jpg",
+    ]
+
+
+def test_set_photo_variants_reports_every_entity_showing_the_url(db, make_admin, make_rent_apartments):
+    from crud.photos import set_photo_variants
+    from models import Photo
+
+    admin, _ = make_admin()
+    first, second = (apartment.id for apartment in make_rent_apartments(admin, 2, parts=0, photos=0))
+    db.add_all(Photo(entity_type="rent", entity_id=entity_id, position=0, url="/uploads/shared.jpg") for entity_id in (first, second))
+    db.commit()
+
+    owners = set_photo_variants(db, {"/uploads/shared.jpg": {"320w": "/uploads/shared_320w.webp"}})
+    db.commit()
+
+    assert owners == {("rent", first), ("rent", second)}
+
+
+def test_registering_srcsets_invalidates_every_entity_showing_the_url(db, make_admin, make_rent_apartments, response_cache):
+    from models import ApartmentPart, Photo
+    from services.images import register_photo_srcsets
+
+    admin, _ = make_admin()
+    first, second = make_rent_apartments(admin, 2, parts=1, photos=0)
+    part_id = db.query(ApartmentPart.id).filter(ApartmentPart.apartment_id == second.id).scalar()
+    db.add_all(
+        Photo(entity_type=entity_type, entity_id=entity_id, position=0, url="/uploads/shared.jpg")
+        for entity_type, entity_id in (("rent", first.id), ("rent", second.id), ("part", part_id))
+    )
+    db.commit()
+    for tag in (f"rent:{first.id}", f"rent:{second.id}", f"part:{part_id}", "sale:1"):
+        response_cache.set(tag, b"{}", [tag])
+
+    register_photo_srcsets({"/uploads/shared.jpg": {"320w": "/uploads/shared_320w.webp"}})
+
+    assert [tag for tag in (f"rent:{first.id}", f"rent:{second.id}", f"part:{part_id}") if response_cache.get(tag)] == []
+    assert response_cache.get("sale:1") is not None
@@ -0,0 +1,39 @@
+"""The number of statements a listing route runs must not grow with the number of apartments (no N+1)."""
+
+import pytest
+
+# The admin; the apartments, their photos, their parts and the parts' photos;
+# the sale apartments (none here, so no photo query); five stats aggregates
+MY_CONTENT_STATEMENTS = 11
+# The apartment, its photos, its parts and the parts' photos
+RENT_DETAILS_STATEMENTS = 4
+
+
+def _get(client, record_statements, url, headers=None):
+    """GET `url`; returns the JSON body and the statements the request ran."""
+    with record_statements() as statements:
+        response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json(), statements
+
+
+@pytest.mark.parametrize("count", [1, 10])
+def test_my_content_runs_a_fixed_number_of_statements(client, record_statements, make_admin, make_rent_apartments, count):
+    admin, headers = make_admin()
+    make_rent_apartments(admin, count)
+
+    content, statements = _get(client, record_statements, "/api/v1/apartments/my-content", headers)
+
+    assert len(content["rent_apartments"]) == count
+    assert len(statements) == MY_CONTENT_STATEMENTS, statements
+
+
+@pytest.mark.parametrize("parts", [1, 10])
+def test_rent_details_run_a_fixed_number_of_statements(client, record_statements, make_admin, make_rent_apartments, parts):
+    admin, _ = make_admin()
+    apartment = make_rent_apartments(admin, 1, parts=parts)[0]
+
+    details, statements = _get(client, record_statements, f"/api/v1/apartments/rent/{apartment.id}")
+
+    assert len(details["apartment_parts"]) == parts
+    assert len(statements) == RENT_DETAILS_STATEMENTS, statements
@@ -0,0 +1,80 @@
+"""The development query inspector: statement shapes, and QUERY_INSPECTOR=raise on an N+1 route."""
+
+import pytest
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+import services.query_inspector as query_inspector
+from database import get_db
+from services.query_inspector import QueryInspectionError, QueryInspectorMiddleware, install_query_inspector, statement_shape
+
+
+@pytest.mark.parametrize("first, second", [
+    ("SELECT * FROM photos WHERE entity_id IN (?, ?, ?)", "SELECT * FROM photos WHERE entity_id IN (?)"),
+    ("SELECT * FROM photos WHERE entity_id IN (%s, %s)", "SELECT * FROM photos WHERE entity_id IN (%s,%s,%s,%s)"),
+    ("SELECT * FROM parts WHERE id IN (:id_1, :id_2)", "SELECT * FROM parts WHERE id IN (:id_1)"),
+    ("SELECT * FROM parts WHERE id = 12 LIMIT 1", "SELECT * FROM parts WHERE id = 7 LIMIT 1"),
+    ("SELECT * FROM parts WHERE title = 'Studio 1'", "SELECT * FROM parts WHERE title = 'It''s studio 2'"),
+    ("SELECT *\n  FROM parts\n WHERE area > 30.5", "SELECT * FROM parts WHERE area > 45"),
+])
+def test_statement_shape_collapses_lists_and_literals(first, second):
+    assert statement_shape(first) == statement_shape(second)
+
+
+def test_statement_shape_keeps_what_differs():
+    assert statement_shape("SELECT * FROM parts WHERE id = ?") != statement_shape("SELECT * FROM photos WHERE id = ?")
+    assert statement_shape("SELECT * FROM apartments_v2 WHERE id = 1") == "SELECT * FROM apartments_v2 WHERE id = ?"
+
+
+@pytest.fixture
+def raising_inspector(monkeypatch):
+    """QUERY_INSPECTOR=raise with a threshold of 3 for the test; the settings and hooks are restored afterwards."""
+    for setting in ("_mode", "_repeat_threshold", "_slow_query_seconds"):
+        monkeypatch.setattr(query_inspector, setting, getattr(query_inspector, setting))
+    install_query_inspector("raise", 3, 60000)
+    yield
+    event.remove(Engine, "before_cursor_execute", query_inspector._before_cursor_execute)
+    event.remove(Engine, "after_cursor_execute", query_inspector._after_cursor_execute)
+
+
+@pytest.fixture
+def inspected_client():
+    """An app with a route loading each studio's photos one studio at a time (an N+1)."""
+    router = APIRouter(prefix="/inspector-test")
+
+    @router.get("/apartments/{apartment_id}/photo-counts")
+    def photo_counts(apartment_id: int, db: Session = Depends(get_db)):
+        from models import ApartmentPart
+
+        parts = db.query(ApartmentPart).filter(ApartmentPart.apartment_id == apartment_id).all()
+        return [len(part.photos) for part in parts]
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api/v1")
+    app.add_middleware(QueryInspectorMiddleware)
+    return TestClient(app)
+
+
+def test_raise_mode_fails_an_n_plus_one_route(raising_inspector, inspected_client, make_admin, make_rent_apartments):
+    admin, _ = make_admin()
+    apartment_id = make_rent_apartments(admin, 1, parts=4, photos=1)[0].id
+
+    with pytest.raises(QueryInspectionError) as error:
+        inspected_client.get(f"/api/v1/inspector-test/apartments/{apartment_id}/photo-counts")
+
+    message = str(error.value)
+    assert message.startswith("GET /api/v1/inspector-test/apartments/{apartment_id}/photo-counts ran the same statement 3 times")
+    assert "tests/test_query_inspector.py" in message and "photos" in message
+
+
+def test_raise_mode_lets_a_route_under_the_threshold_through(raising_inspector, inspected_client, make_admin, make_rent_apartments):
+    admin, _ = make_admin()
+    apartment_id = make_rent_apartments(admin, 1, parts=2, photos=1)[0].id
+
+    response = inspected_client.get(f"/api/v1/inspector-test/apartments/{apartment_id}/photo-counts")
+
+    assert response.status_code == 200
+    assert response.json() == [1, 1]
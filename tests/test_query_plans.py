@@ -0,0 +1,123 @@
+"""The hot CRUD queries must be answered from the indexes declared for them, not by scanning the table.
+
+Each case runs the real CRUD function, takes the statement it sent and asks
+SQLite for its plan (EXPLAIN QUERY PLAN); one step of the plan must start
+with the expected index search. Without the indexes of the table, the same
+statement must scan it instead.
+"""
+
+import re
+from datetime import date
+
+import pytest
+
+from crud.apartment_parts import get_apartment_parts, search_apartment_parts, search_available_apartment_parts
+from crud.apartments_rent import get_apartments_rent_by_admin
+from crud.apartments_sale import get_apartments_sale_by_admin
+from crud.rental_contracts import get_expiring_contracts
+from crud.utils import get_admin_phone_for_whatsapp
+from models import PartStatusEnum
+from schemas.apartment_part import ApartmentPartSearchFilters
+
+CASES = {
+    "parts of an apartment by status": (
+        lambda db: get_apartment_parts(db, apartment_id=1, status=PartStatusEnum.available),
+        "SEARCH apartment_parts USING INDEX ix_apartment_parts_apartment_id_status (apartment_id=? AND status=?)",
+    ),
+    "parts by status": (
+        lambda db: get_apartment_parts(db, status=PartStatusEnum.available),
+        "SEARCH apartment_parts USING INDEX ix_apartment_parts_status_monthly_price (status=?)",
+    ),
+    "studio search by bedrooms and price": (
+        lambda db: search_apartment_parts(db, ApartmentPartSearchFilters(bedrooms=1, min_price=2000, max_price=4000)),
+        "SEARCH apartment_parts USING INDEX ix_apartment_parts_bedrooms_monthly_price (bedrooms=? AND monthly_price>? AND monthly_price<?)",
+    ),
+    "studios free in a date range": (
+        lambda db: search_available_apartment_parts(db, date(2030, 3, 1), date(2030, 8, 31), ApartmentPartSearchFilters()),
+        # A part has at most one contract (apartment_part_id is unique), so either index answers the NOT EXISTS
+        "SEARCH rental_contracts USING INDEX",
+    ),
+    "rent apartments of an admin": (
+        lambda db: get_apartments_rent_by_admin(db, admin_id=1),
+        "SEARCH apartment_rents USING INDEX ix_apartment_rents_listed_by_admin_id (listed_by_admin_id=?)",
+    ),
+    "sale apartments of an admin": (
+        lambda db: get_apartments_sale_by_admin(db, admin_id=1),
+        "SEARCH apartment_sales USING INDEX ix_apartment_sales_listed_by_admin_id (listed_by_admin_id=?)",
+    ),
+    "active contracts ending soon": (
+        lambda db: get_expiring_contracts(db),
+        "SEARCH rental_contracts USING INDEX ix_rental_contracts_is_active_rent_end_date (is_active=? AND rent_end_date>? AND rent_end_date<?)",
+    ),
+    "super admin lookup": (
+        lambda db: get_admin_phone_for_whatsapp(db, admin_id=1),
+        "SEARCH admins USING INDEX ix_admins_role (role=?)",
+    ),
+}
+
+
+def query_plan(connection, statement, parameters) -> list:
+    """The `detail` column of each step of SQLite's plan for `statement`."""
+    return [row[3] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+
+
+def crud_statement(db, record_statements, run):
+    """The first (statement, parameters) `run` sends."""
+    with record_statements() as statements:
+        run(db)
+    return statements[0]
+
+
+@pytest.fixture
+def unindexed(db):
+    """Returns a function dropping the declared indexes of a table and giving a connection to plan with.
+
+    The connection is a new one: a pooled connection may answer EXPLAIN from a
+    statement it prepared before the drop. The indexes are recreated afterwards.
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import NullPool
+
+    engine = create_engine(db.get_bind().url, poolclass=NullPool)
+    connection = engine.connect()
+    definitions = []
+
+    def drop(table):
+        indexes = connection.exec_driver_sql(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (table,)
+        ).all()
+        for name, definition in indexes:
+            connection.exec_driver_sql(f"DROP INDEX {name}")
+            definitions.append(definition)
+        connection.commit()
+        return connection
+
+    yield drop
+    for definition in definitions:
+        connection.exec_driver_sql(definition)
+    connection.commit()
+    connection.close()
+    engine.dispose()
+
+
+@pytest.mark.parametrize("name", CASES)
+def test_crud_query_uses_its_index(db, record_statements, name):
+    run, expected = CASES[name]
+    statement, parameters = crud_statement(db, record_statements, run)
+
+    plan = query_plan(db.connection(), statement, parameters)
+
+    assert any(step.startswith(expected) for step in plan), "\n".join(plan)
+
+
+# The date range case names no index: the unique constraint on apartment_part_id answers it without the declared one
+@pytest.mark.parametrize("name", [name for name, (_, expected) in CASES.items() if re.search(r"USING INDEX \w", expected)])
+def test_crud_query_scans_without_its_index(db, record_statements, unindexed, name):
+    run, expected = CASES[name]
+    table = re.match(r"SEARCH (\w+)", expected).group(1)
+    statement, parameters = crud_statement(db, record_statements, run)
+
+    plan = query_plan(unindexed(table), statement, parameters)
+
+    assert not any(step.startswith(expected) for step in plan), "\n".join(plan)
+    assert any(step.startswith(f"SCAN {table}") for step in plan), "\n".join(plan)
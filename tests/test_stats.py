@@ -0,0 +1,125 @@
+"""Dashboard stats: the aggregates per owning admin, and their cached copy dropped by listing, studio and contract writes."""
+
+from datetime import date
+
+import pytest
+
+from models import AdminRoleEnum
+
+SALE = {
+    "name": "Stats sale", "location": "maadi", "address": "3 Test Street", "area": 100, "number": "S-2",
+    "price": 1000000, "bedrooms": 3, "bathrooms": "private",
+}
+
+
+def _overview(client, headers):
+    response = client.get("/api/v1/stats/overview", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _parts(db, apartment_id):
+    from models import ApartmentPart
+
+    return db.query(ApartmentPart).filter(ApartmentPart.apartment_id == apartment_id).order_by(ApartmentPart.id).all()
+
+
+def _contract(db, admin, part_id, is_active=True, rent_price=4000):
+    from models import RentalContract
+
+    contract = RentalContract(
+        apartment_part_id=part_id, customer_name="Tenant", customer_phone="+201000000000", customer_id_number="1",
+        how_did_customer_find_us="facebook", paid_deposit=0, warrant_amount=0, commission=0, rent_price=rent_price,
+        rent_start_date=date(2044, 1, 1), rent_end_date=date(2044, 12, 31), rent_period=12,
+        is_active=is_active, created_by_admin_id=admin.id,
+    )
+    db.add(contract)
+    db.commit()
+    return contract
+
+
+@pytest.fixture
+def owner(client, db, make_admin, make_rent_apartments):
+    """A studio admin with two rent apartments of three studios each, one sale apartment and three contracts."""
+    from models import PartStatusEnum
+
+    admin, headers = make_admin()
+    apartments = make_rent_apartments(admin, 2, parts=3, photos=0)
+    assert client.post("/api/v1/apartments/sale", json=SALE, headers=headers).status_code == 200
+    first, second, third = _parts(db, apartments[0].id)
+    first.status, second.status = PartStatusEnum.rented, PartStatusEnum.upcoming_end
+    db.commit()
+    _contract(db, admin, first.id, rent_price=4000)
+    _contract(db, admin, second.id, rent_price=3500)
+    _contract(db, admin, third.id, is_active=False)
+    return admin, headers, apartments
+
+
+def test_overview_counts_the_admins_content(client, owner):
+    admin, headers, _ = owner
+
+    overview = _overview(client, headers)
+
+    assert overview["rent_apartments"] == 2
+    assert overview["sale_apartments"] == 1
+    assert overview["studios"] == {"total": 6, "available": 4, "rented": 1, "upcoming_end": 1}
+    assert overview["occupancy_rate"] == round(2 / 6, 4)
+    assert overview["active_contracts"] == 2
+    assert float(overview["active_contracts_rent"]) == 7500
+    assert [row["admin_id"] for row in overview["by_admin"]] == [admin.id]
+
+
+def test_super_admin_totals_add_up_the_admins(client, db, owner, make_admin):
+    from models import ApartmentRent, ApartmentPart
+
+    _, super_headers = make_admin(AdminRoleEnum.super_admin)
+
+    overview = _overview(client, super_headers)
+
+    assert overview["rent_apartments"] == db.query(ApartmentRent).count()
+    assert overview["studios"]["total"] == db.query(ApartmentPart).count()
+    for field in ("rent_apartments", "sale_apartments", "active_contracts"):
+        assert overview[field] == sum(row[field] for row in overview["by_admin"])
+
+
+def _create_sale(client, db, headers, apartments):
+    assert client.post("/api/v1/apartments/sale", json=SALE, headers=headers).status_code == 200
+
+
+def _delete_rent(client, db, headers, apartments):
+    assert client.delete(f"/api/v1/apartments/rent/{apartments[1].id}", headers=headers).status_code == 200
+
+
+def _rent_a_studio(client, db, headers, apartments):
+    part_id = _parts(db, apartments[1].id)[0].id
+    assert client.put(f"/api/v1/apartments/parts/{part_id}", json={"status": "rented"}, headers=headers).status_code == 200
+
+
+def _end_a_contract(client, db, headers, apartments):
+    from models import RentalContract
+
+    contract_id = db.query(RentalContract.id).filter(
+        RentalContract.apartment_part_id == _parts(db, apartments[0].id)[0].id
+    ).scalar()
+    assert client.put(f"/api/v1/rental-contracts/{contract_id}", json={"is_active": False}, headers=headers).status_code == 200
+
+
+@pytest.mark.parametrize("write, field", [
+    (_create_sale, "sale_apartments"),
+    (_delete_rent, "rent_apartments"),
+    (_rent_a_studio, "occupancy_rate"),
+    (_end_a_contract, "active_contracts"),
+])
+def test_writes_drop_the_cached_overview(client, db, owner, response_cache, write, field):
+    from models import ApartmentSale
+
+    admin, headers, apartments = owner
+    before = _overview(client, headers)
+    # Written behind the API's back, so only a cache miss would show it
+    db.add(ApartmentSale(**SALE, contact_number=admin.phone, listed_by_admin_id=admin.id))
+    db.commit()
+    assert _overview(client, headers) == before
+
+    write(client, db, headers, apartments)
+
+    assert _overview(client, headers)[field] != before[field]
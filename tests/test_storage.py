@@ -0,0 +1,85 @@
+"""Storage streams uploads: memory stays near one chunk (one S3 part) however large the files are."""
+
+import os
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import services.storage
+from services.storage import CHUNK_SIZE, S3_PART_SIZE, LocalStorage, S3Storage
+
+
+def _large_files(tmp_path, count, size):
+    paths = []
+    for n in range(count):
+        path = tmp_path / f"large-{n}.jpg"
+        with open(path, "wb") as f:
+            for _ in range(size // CHUNK_SIZE):
+                f.write(os.urandom(CHUNK_SIZE))
+        paths.append(path)
+    return paths
+
+
+def _peak_memory_of_save_files(storage, paths):
+    files = [open(path, "rb") for path in paths]
+    try:
+        tracemalloc.start()
+        saved = storage.save_files("rent", 1, [(path.name, f) for path, f in zip(paths, files)], max_bytes=None)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        for f in files:
+            f.close()
+    return saved, peak
+
+
+class FakeS3Client:
+    def __init__(self):
+        self.sizes = {}
+
+    def put_object(self, Bucket, Key, Body, ContentType):
+        self.sizes[Key] = len(Body)
+
+    def create_multipart_upload(self, Bucket, Key, ContentType):
+        self.sizes[Key] = 0
+        return {"UploadId": Key}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.sizes[Key] += len(Body)
+        return {"ETag": str(PartNumber)}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        pass
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        pass
+
+
+def test_local_storage_keeps_one_chunk_in_memory(tmp_path):
+    paths = _large_files(tmp_path, 3, 8 * CHUNK_SIZE)
+
+    saved, peak = _peak_memory_of_save_files(LocalStorage(base_dir=str(tmp_path / "uploads")), paths)
+
+    assert len(saved) == 3
+    # The chunk being written and the next one read, against 24 MB uploaded
+    assert peak < 3 * CHUNK_SIZE
+
+
+def test_s3_storage_streams_seekable_files_without_spooling(tmp_path, monkeypatch):
+    def no_spooling(*args, **kwargs):
+        pytest.fail("a seekable upload was copied to a spooled file")
+
+    monkeypatch.setattr(services.storage.tempfile, "SpooledTemporaryFile", no_spooling)
+    storage = S3Storage.__new__(S3Storage)
+    storage.bucket, storage.public_base_url, storage.client = "photos", None, FakeS3Client()
+    storage._executor = ThreadPoolExecutor(max_workers=1)
+    storage._exists = lambda key: False
+    paths = _large_files(tmp_path, 2, 2 * S3_PART_SIZE + CHUNK_SIZE)
+
+    saved, peak = _peak_memory_of_save_files(storage, paths)
+
+    assert sorted(storage.client.sizes.values()) == [2 * S3_PART_SIZE + CHUNK_SIZE] * 2
+    assert {key for key, _ in saved} == set(storage.client.sizes)
+    # The part being sent and the next one read from the file
+    assert peak < 2 * S3_PART_SIZE + 2 * CHUNK_SIZE
@@ -0,0 +1,61 @@
+"""Garbage collection of stored objects never deletes one an upload has just registered."""
+
+from datetime import datetime
+
+import crud.stored_objects
+import gc_storage
+from crud.stored_objects import register_objects, retain_objects
+from services.storage import get_storage
+
+
+def _old_unreferenced_object(db, name):
+    from models import StoredObject
+
+    key = f"{name}.jpg"
+    obj = StoredObject(key=key, url=get_storage().save_bytes(key, b"photo"), ref_count=0, updated_at=datetime(2000, 1, 1))
+    db.add(obj)
+    db.commit()
+    return obj
+
+
+def _is_kept(db, obj):
+    from models import StoredObject
+
+    db.expire_all()
+    ref_count = db.query(StoredObject.ref_count).filter(StoredObject.url == obj.url).scalar()
+    return ref_count == 1 and get_storage().read_file(obj.key) == b"photo"
+
+
+def test_registering_an_existing_object_restarts_its_grace_period(db):
+    obj = _old_unreferenced_object(db, "registered-again")
+
+    register_objects(db, [(obj.key, obj.url)])
+    db.commit()
+    gc_storage.collect_garbage(grace_hours=1)
+    retain_objects(db, [obj.url])
+    db.commit()
+
+    assert _is_kept(db, obj)
+
+
+def test_an_object_registered_after_the_scan_is_kept(db, monkeypatch):
+    from database import SessionLocal
+
+    obj = _old_unreferenced_object(db, "registered-during-gc")
+    get_unreferenced_objects = crud.stored_objects.get_unreferenced_objects
+
+    def register_concurrently(session, older_than, after_id=0, limit=500):
+        batch = get_unreferenced_objects(session, older_than, after_id, limit)
+        # An upload of the same bytes registers the object between the scan and the DELETE
+        other = SessionLocal()
+        register_objects(other, [(obj.key, obj.url)])
+        other.commit()
+        other.close()
+        return batch
+
+    monkeypatch.setattr(gc_storage, "get_unreferenced_objects", register_concurrently)
+    gc_storage.collect_garbage(grace_hours=1)
+    retain_objects(db, [obj.url])
+    db.commit()
+
+    assert _is_kept(db, obj)
@@ -0,0 +1,29 @@
+"""Files stored before an upload fails are still tracked, so gc_storage.py can remove them."""
+
+import hashlib
+
+import routers.uploads
+from services.storage import MAX_UPLOAD_FILE_BYTES, content_key
+
+
+def test_files_saved_before_a_failure_are_tracked(client, db, make_admin, make_rent_apartments, monkeypatch):
+    from models import StoredObject
+
+    admin, headers = make_admin()
+    apartment_id = make_rent_apartments(admin, 1, parts=0, photos=0)[0].id
+    # Let the oversized file through the size check of the route, so storage rejects it midway
+    monkeypatch.setattr(routers.uploads, "MAX_UPLOAD_FILE_BYTES", 2 * MAX_UPLOAD_FILE_BYTES)
+
+    response = client.post(
+        "/api/v1/uploads/photos",
+        data={"entity_id": str(apartment_id), "entity_type": "rent"},
+        files=[
+            ("files", ("small.jpg", b"saved before the failure", "image/jpeg")),
+            ("files", ("large.jpg", b"x" * (MAX_UPLOAD_FILE_BYTES + 1), "image/jpeg")),
+        ],
+        headers=headers,
+    )
+
+    assert response.status_code == 413, response.text
+    key = content_key(hashlib.sha256(b"saved before the failure").hexdigest(), "small.jpg")
+    assert db.query(StoredObject.ref_count).filter(StoredObject.key == key).scalar() == 0